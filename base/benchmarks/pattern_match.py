@@ -0,0 +1,70 @@
+""" Benchmark containing, startingwith and endingwith (of flowtool.python)
+    against the former pattern-by-pattern filtering.
+
+    $ python benchmarks/pattern_match.py [names] [patterns]
+"""
+import sys
+import time
+import random
+import string
+
+from flowtool import python
+
+
+def naive_containing(parts, lst):
+    result = []
+    for part in parts:
+        result.extend(e for e in lst if part in e)
+    return result
+
+def naive_startingwith(prefixes, lst):
+    result = []
+    for prefix in prefixes:
+        result.extend(e for e in lst if e.startswith(prefix))
+    return result
+
+def naive_endingwith(suffixes, lst):
+    result = []
+    for suffix in suffixes:
+        result.extend(e for e in lst if e.endswith(suffix))
+    return result
+
+
+def random_word(rnd, low, high):
+    return ''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(low, high)))
+
+
+def timed(func, *args):
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 10000
+    pattern_count = int(argv[2]) if len(argv) > 2 else 100
+
+    rnd = random.Random(42)
+    names = [
+        '_flowtool_githooks.%s_%s.%s' % (random_word(rnd, 3, 8), random_word(rnd, 3, 8), rnd.choice(['py', 'sh', 'yaml']))
+        for _ in range(count)
+    ]
+    substrings = [random_word(rnd, 3, 5) for _ in range(pattern_count)]
+    samples = rnd.sample(names, pattern_count)
+    prefixes = [n[:rnd.randint(20, 24)] for n in samples]
+    suffixes = [n[-rnd.randint(4, 8):] for n in samples]
+
+    for name, naive, compiled, patterns in (
+            ('containing', naive_containing, python.containing, substrings),
+            ('startingwith', naive_startingwith, python.startingwith, prefixes),
+            ('endingwith', naive_endingwith, python.endingwith, suffixes)):
+        naive_time, naive_result = timed(naive, patterns, names)
+        compiled_time, compiled_result = timed(compiled, patterns, names)
+        assert set(naive_result) == set(compiled_result)
+        print('{:13} {} names x {} patterns: {:8.4f}s before, {:8.4f}s after, {} matches ({} unique)'.format(
+            name, count, len(patterns), naive_time, compiled_time,
+            len(naive_result), len(compiled_result),
+        ))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,40 @@
+""" Benchmark the rate of commands started by run_command (which is what
+    capture_command of the githooks uses) with subprocess and posix_spawn.
+
+    The modules a hook usually has loaded are imported first, since the
+    cost of forking grows with the size of the python process.
+
+    $ python benchmarks/spawn_rate.py [count] [command ...]
+"""
+import sys
+import time
+
+from flowtool import execute
+
+
+def spawn_rate(command, count, posix_spawn):
+    """ Run command count times, return the commands per second. """
+    execute.use_posix_spawn = posix_spawn
+    start = time.time()
+    for _ in range(count):
+        execute.run_command(command)
+    return count / (time.time() - start)
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 1000
+    command = argv[2:] or ['true']
+
+    import click, git  # pylint: disable=unused-import,multiple-imports
+
+    backends = [('subprocess', False)]
+    if execute.use_posix_spawn:
+        backends.append(('posix_spawn', True))
+
+    for name, posix_spawn in backends:
+        rate = spawn_rate(command, count, posix_spawn)
+        print('{:12} {:8.1f} commands/s  ({} x {})'.format(name, rate, count, ' '.join(command)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
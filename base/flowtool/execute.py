@@ -6,17 +6,269 @@
 
 print_all_executions = False
 
-import subprocess
+import os
+import time
+import errno
 import shlex
+import locale
+import signal
+import subprocess
 from collections import namedtuple
 
+try:
+    import selectors
+except ImportError:  # Python < 3.4
+    selectors = None
+
+try:
+    from shutil import which as _which
+except ImportError:  # Python 2
+    def _which(name, path=None):
+        """ A simple stand-in for shutil.which. """
+        if path is None:
+            path = os.environ.get('PATH', os.defpath)
+        candidates = [name] if os.sep in name else [
+            os.path.join(directory, name) for directory in path.split(os.pathsep)
+        ]
+        for candidate in candidates:
+            if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                return candidate
+
 CompletedCommand = namedtuple('CompletedCommand', ['command', 'returncode', 'stdout', 'stderr'])
 
-def run_command(command, debug=None, **kwd):
+# Start commands with os.posix_spawn (if there is one), instead of
+# forking the (big) python process. Commands that need more than
+# the default redirections and an environment use subprocess
+# (as do the pythons without posix_spawn, that is before 3.8).
+use_posix_spawn = hasattr(os, 'posix_spawn') and selectors is not None
+
+SPAWN_KWD = frozenset(['env'])
+PIPE_SIZE = 65536
+
+# python ignores these, subprocess resets them for the child
+RESTORE_SIGNALS = tuple(
+    getattr(signal, name) for name in ('SIGPIPE', 'SIGXFZ', 'SIGXFSZ')
+    if hasattr(signal, name)
+)
+
+_which_cache = {}
+def which(name, path=None):
+    """ The full path of an executable (or None), looked up once
+        per name and PATH, since PATH rarely changes while running.
+        Names with a directory part are not cached.
+
+        >>> which('true') == _which('true')
+        True
+        >>> which('_not_there_command_')
+    """
+    if os.sep in name:
+        return _which(name, path=path)
+    if path is None:
+        path = os.environ.get('PATH', os.defpath)
+    key = (name, path)
+    if key not in _which_cache:
+        _which_cache[key] = _which(name, path=path)
+    return _which_cache[key]
+
+
+def _decode(data):
+    """ Decode output like subprocess does with universal_newlines.
+
+        >>> _decode(b'a\\r\\nb\\rc\\n')
+        'a\\nb\\nc\\n'
+    """
+    text = data.decode(locale.getpreferredencoding(False))
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+LIMIT_RESOURCES = {
+    'cpu': 'RLIMIT_CPU',  # seconds of cpu time
+    'memory': 'RLIMIT_AS',  # bytes of address space
+    'files': 'RLIMIT_NOFILE',  # open file descriptors
+}
+
+def limits_setter(limits):
+    """ A function that sets resource limits (i.e. {'cpu': 60}, see
+        LIMIT_RESOURCES) for the current process, to be run in the child
+        before the command is executed. The hard limits are kept.
+
+        >>> limits_setter({'cpu': 60}).__name__
+        'set_limits'
+        >>> limits_setter({'fun': 1})
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown resource limit: 'fun'
+    """
+    import resource
+
+    settings = []
+    for name, value in sorted(limits.items()):
+        if name not in LIMIT_RESOURCES:
+            raise ValueError('Unknown resource limit: %r' % name)
+        settings.append((getattr(resource, LIMIT_RESOURCES[name]), int(value)))
+
+    def set_limits():
+        for which_limit, value in settings:
+            _, hard = resource.getrlimit(which_limit)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.setrlimit(which_limit, (value, hard))
+
+    return set_limits
+
+
+def kill_group(pid):
+    """ Kill the process group of a command (started in its own group). """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass  # already gone
+
+
+def _exitcode(status):
+    """ Convert a wait status to a returncode (like subprocess does). """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def spawn_command(command, input=None, env=None, timeout=None):
+    """ Run a command started with os.posix_spawn and gather stdout,
+        stderr and the returncode. The executable is looked up with
+        which(), and the environment is passed explicitly (the current
+        one if env is None). Raises an OSError if there is no such
+        command, like subprocess does.
+
+        With a timeout, the command runs in its own process group, which
+        is killed (with all children) when the timeout expires, and a
+        subprocess.TimeoutExpired is raised.
+
+        >>> spawn_command(['echo', 'spawned'])
+        CompletedCommand(command=['echo', 'spawned'], returncode=0, stdout='spawned\\n', stderr='')
+        >>> spawn_command(['cat'], input='meow').stdout
+        'meow'
+        >>> spawn_command(['sh', '-c', 'echo err >&2; exit 3'])[1:]
+        (3, '', 'err\\n')
+        >>> try:
+        ...     spawn_command(['_not_there_command_'])
+        ... except OSError as ex:
+        ...     print(ex.errno == errno.ENOENT)
+        True
+        >>> try:
+        ...     spawn_command(['sh', '-c', 'echo started; sleep 10 & wait'], timeout=0.2)
+        ... except subprocess.TimeoutExpired as ex:
+        ...     print(ex.output)
+        started
+        <BLANKLINE>
+    """
+    executable = which(command[0])
+    if executable is None:
+        raise OSError(errno.ENOENT, 'No such file or directory', command[0])
+    if env is None:
+        env = os.environ
+
+    stdin_read, stdin_write = os.pipe() if input is not None else (None, None)
+    stdout_read, stdout_write = os.pipe()
+    stderr_read, stderr_write = os.pipe()
+
+    file_actions = [
+        (os.POSIX_SPAWN_DUP2, stdout_write, 1),
+        (os.POSIX_SPAWN_DUP2, stderr_write, 2),
+    ]
+    if stdin_read is None:
+        file_actions.append((os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0))
+    else:
+        file_actions.append((os.POSIX_SPAWN_DUP2, stdin_read, 0))
+
+    spawn_kwd = {'setpgroup': 0} if timeout is not None else {}
+    try:
+        pid = os.posix_spawn(
+            executable, command, env,
+            file_actions=file_actions,
+            setsigdef=RESTORE_SIGNALS,
+            **spawn_kwd
+        )
+    except BaseException:
+        # the parent's ends, the child's ends are closed below
+        for fd in (stdin_write, stdout_read, stderr_read):
+            if fd is not None:
+                os.close(fd)
+        raise
+    finally:
+        for fd in (stdin_read, stdout_write, stderr_write):
+            if fd is not None:
+                os.close(fd)
+
+    output = {stdout_read: [], stderr_read: []}
+    pending = b''
+    with selectors.DefaultSelector() as selector:
+        for fd in output:
+            selector.register(fd, selectors.EVENT_READ)
+        if stdin_write is not None:
+            pending = input.encode(locale.getpreferredencoding(False))
+            if pending:
+                os.set_blocking(stdin_write, False)
+                selector.register(stdin_write, selectors.EVENT_WRITE)
+            else:
+                os.close(stdin_write)
+
+        deadline = None if timeout is None else time.time() + timeout
+        while selector.get_map():
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                kill_group(pid)
+                for key in list(selector.get_map().values()):
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                os.waitpid(pid, 0)
+                raise subprocess.TimeoutExpired(
+                    command, timeout,
+                    output=_decode(b''.join(output[stdout_read])),
+                    stderr=_decode(b''.join(output[stderr_read])),
+                )
+            for key, _ in selector.select(remaining):
+                fd = key.fd
+                if fd == stdin_write:
+                    try:
+                        written = os.write(fd, pending[:PIPE_SIZE])
+                    except BrokenPipeError:
+                        written = len(pending)
+                    pending = pending[written:]
+                    if not pending:
+                        selector.unregister(fd)
+                        os.close(fd)
+                    continue
+                chunk = os.read(fd, PIPE_SIZE)
+                if chunk:
+                    output[fd].append(chunk)
+                else:
+                    selector.unregister(fd)
+                    os.close(fd)
+
+    _, status = os.waitpid(pid, 0)
+    return CompletedCommand(
+        command,
+        _exitcode(status),
+        _decode(b''.join(output[stdout_read])),
+        _decode(b''.join(output[stderr_read])),
+    )
+
+
+def run_command(command, debug=None, input=None, timeout=None, limits=None, **kwd):
     """ Wrapper for python3.4 subprocess.Popen,
         that waits for the command to finish and
         then gathers stdout, stderr as well as
-        the returncode.
+        the returncode. If input is given, it is
+        fed to the commands stdin. Without other
+        keywords than env, the command is started
+        by spawn_command (see use_posix_spawn).
+
+        A command with a timeout runs in its own
+        process group, that is killed as a whole,
+        when a subprocess.TimeoutExpired is raised
+        (timeouts need python3.3 or newer).
+        Resource limits (see limits_setter) are set
+        in the child before the command starts.
 
         >>> run_command('true')
         CompletedCommand(command=['true'], returncode=0, stdout='', stderr='')
@@ -26,20 +278,45 @@ def run_command(command, debug=None, **kwd):
         CompletedCommand(command=['ls', '/bin/ls'], returncode=0, stdout='/bin/ls\\n', stderr='')
         >>> 'No such file or directory' in run_command(['ls', '_not_there_file_']).stderr
         True
+        >>> run_command('cat', input='meow').stdout
+        'meow'
+        >>> run_command(['sleep', '10'], cwd='/', timeout=0.1)
+        Traceback (most recent call last):
+        ...
+        subprocess.TimeoutExpired: Command '['sleep', '10']' timed out after 0.1 seconds
+        >>> run_command(['sh', '-c', 'ulimit -t'], limits={'cpu': 5}).stdout
+        '5\\n'
     """
     global print_all_executions
 
     if isinstance(command, str):
         command = shlex.split(command)
 
-    # fill in these kwd (only if not given)
-    kwd.setdefault('stdout', subprocess.PIPE)
-    kwd.setdefault('stderr', subprocess.PIPE)
-    kwd.setdefault('universal_newlines', True)
+    if use_posix_spawn and not limits and SPAWN_KWD.issuperset(kwd):
+        result = spawn_command(command, input=input, env=kwd.get('env'), timeout=timeout)
+    else:
+        # fill in these kwd (only if not given)
+        kwd.setdefault('stdout', subprocess.PIPE)
+        kwd.setdefault('stderr', subprocess.PIPE)
+        kwd.setdefault('universal_newlines', True)
+        if input is not None:
+            kwd.setdefault('stdin', subprocess.PIPE)
+        if timeout is not None:
+            kwd.setdefault('start_new_session', True)
+        if limits:
+            kwd.setdefault('preexec_fn', limits_setter(limits))
 
-    process = subprocess.Popen(command, **kwd)
-    stdout, stderr = process.communicate()
-    result = CompletedCommand(command, process.returncode, stdout, stderr)
+        process = subprocess.Popen(command, **kwd)
+        if timeout is None:
+            stdout, stderr = process.communicate(input)
+        else:
+            try:
+                stdout, stderr = process.communicate(input, timeout=timeout)
+            except subprocess.TimeoutExpired as ex:
+                kill_group(process.pid)
+                stdout, stderr = process.communicate()
+                raise subprocess.TimeoutExpired(ex.cmd, ex.timeout, output=stdout, stderr=stderr)
+        result = CompletedCommand(command, process.returncode, stdout, stderr)
 
     if debug is None:
         debug = print_all_executions
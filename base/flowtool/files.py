@@ -1,7 +1,26 @@
 import os
+import re
+import mmap
 import stat
+import codecs
+import locale
+from array import array
+from collections import OrderedDict, namedtuple
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
+from multiprocessing.pool import ThreadPool
+try:
+    from weakref import finalize
+except ImportError:  # Python < 3.4, the mmap is closed when it is collected
+    finalize = None
 from os.path import exists, isfile, isdir, basename, dirname, join
 
+from flowtool.execute import run_command
+
+
+BOMS = (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE, codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
 
 
 def find_parent_containing(name, path=None, check='exists', not_found=None):
@@ -32,9 +51,122 @@ def find_parent_containing(name, path=None, check='exists', not_found=None):
 
 
 
-def find_subdirs_containing(name, path=None, check='exists', checklist=lambda x: x, not_found=None):
+PRUNE_DIRS = frozenset([
+    '.git', '.hg', '.svn', '.tox', '.nox', '.eggs', '.venv',
+    '__pycache__', '.pytest_cache', '.mypy_cache', 'node_modules',
+])
+
+
+def git_ignored(path):
+    """ The (absolute) paths below path, that git ignores, as listed
+        from the index and the exclude rules by `git ls-files` (ignored
+        dirs as a whole). Empty if path is not in a git work tree.
+
+        >>> git_ignored('/')
+        set()
+    """
+    try:
+        result = run_command([
+            'git', '-C', path, 'ls-files', '-z',
+            '--others', '--ignored', '--exclude-standard', '--directory',
+        ])
+    except OSError:
+        return set()
+    if result.returncode:
+        return set()
+    path = os.path.abspath(path)
+    return set(
+        join(path, name.rstrip('/')) for name in result.stdout.split('\0') if name
+    )
+
+
+DirEntry = namedtuple('DirEntry', ['name', 'path', 'is_dir', 'is_symlink'])
+
+
+def scan_entries(path):
+    """ The entries of a directory, as DirEntry tuples. is_dir follows
+        symlinks (it is False for broken ones), so a symlinked dir has
+        both flags set. Uses os.scandir where available (python3.5+),
+        else os.listdir and os.lstat. Raises OSError if path can not be
+        listed.
+
+        >>> [e for e in scan_entries(dirname(__file__)) if e.name == 'files.py'][0][::2]
+        ('files.py', False)
+    """
+    result = []
+    if hasattr(os, 'scandir'):
+        for entry in os.scandir(path):
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            result.append(DirEntry(entry.name, entry.path, is_dir, entry.is_symlink()))
+        return result
+
+    for name in os.listdir(path):
+        full = join(path, name)
+        try:
+            info = os.lstat(full)
+        except OSError:
+            continue  # deleted meanwhile
+        is_symlink = stat.S_ISLNK(info.st_mode)
+        if is_symlink:
+            try:
+                info = os.stat(full)
+            except OSError:
+                info = None
+        is_dir = info is not None and stat.S_ISDIR(info.st_mode)
+        result.append(DirEntry(name, full, is_dir, is_symlink))
+    return result
+
+
+def walk_dirs(path, prune=PRUNE_DIRS, ignored=()):
+    """ Walk a directory tree top-down like os.walk, generating
+        (dirpath, dirnames, filenames) with the names sorted. It is
+        built on scan_entries (os.scandir), and the names in prune (and the paths in
+        ignored, which are absolute) are left out before descending into them.
+
+        >>> top, dirs, files = next(walk_dirs(dirname(dirname(__file__))))
+        >>> 'flowtool' in dirs, '__pycache__' in dirs
+        (True, False)
+    """
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = sorted(scan_entries(current))
+        except OSError:
+            continue
+        dirs, files, descend = [], [], []
+        for entry in entries:
+            if entry.name in prune or ignored and os.path.abspath(entry.path) in ignored:
+                continue
+            if entry.is_dir:
+                dirs.append(entry.name)
+                if not entry.is_symlink:
+                    descend.append(entry.path)
+            else:
+                files.append(entry.name)
+        yield current, dirs, files
+        stack.extend(reversed(descend))
+
+
+def find_subdirs_containing(name, path=None, check='exists', checklist=lambda x: x, not_found=None,
+                            prune=PRUNE_DIRS, gitignore=False, limit=None, workers=None):
     """ Return the subdirectories containind name.
         The check can be chosen from exists, (is)file and (is)dir.
+
+        The tree is walked with walk_dirs, which leaves out the dirs in
+        prune, and (with gitignore) everything git ignores. The search
+        stops after limit matches, and with workers the subtrees of path
+        are walked on a thread pool (the order of the results stays the
+        same).
+
+        >>> base = dirname(dirname(__file__))
+        >>> find_subdirs_containing('files.py', base, check='file') == [join(base, 'flowtool')]
+        True
+        >>> len(find_subdirs_containing('__init__.py', base, limit=1))
+        1
     """
     path = os.getcwd() if path is None else path
 
@@ -50,10 +182,36 @@ def find_subdirs_containing(name, path=None, check='exists', checklist=lambda x:
         def checklist(loc, dirs, files):  # pylint: disable=E0102
             return dirs
 
-    found = []
-    for step in os.walk(path):
-        if name in checklist(*step):
-            found.append(step[0])
+    ignored = git_ignored(path) if gitignore else ()
+
+    def search(steps):
+        found = []
+        for step in steps:
+            if name in checklist(*step):
+                found.append(step[0])
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    if workers and workers > 1:
+        steps = walk_dirs(path, prune=prune, ignored=ignored)
+        top = next(steps, None)
+        found = search([top] if top else [])
+        if top and (limit is None or len(found) < limit):
+            subtrees = [join(path, d) for d in top[1] if not os.path.islink(join(path, d))]
+            pool = ThreadPool(workers)
+            try:
+                for subtree_found in pool.map(
+                        lambda tree: search(walk_dirs(tree, prune=prune, ignored=ignored)),
+                        subtrees):
+                    found.extend(subtree_found)
+            finally:
+                pool.close()
+                pool.join()
+            if limit is not None:
+                found = found[:limit]
+    else:
+        found = search(walk_dirs(path, prune=prune, ignored=ignored))
 
     if found:
         return found
@@ -62,14 +220,90 @@ def find_subdirs_containing(name, path=None, check='exists', checklist=lambda x:
 
 
 
-def check_file(path, for_content):
-    """ Check wether a file contains a substring.
-        Might be inefficient on large files.
+def encode_needle(needle, encoding):
+    """ Encode a search string (without a byte order mark).
+
+        >>> encode_needle('ab', 'utf-16')
+        b'a\\x00b\\x00'
+        >>> encode_needle(b'raw', 'utf-16')
+        b'raw'
+    """
+    if isinstance(needle, bytes):
+        return needle
+    # the codecs that write a BOM write it only once, in front of 'x'
+    return ('x' + needle).encode(encoding)[len('x'.encode(encoding)):]
+
+
+def search_file(path, needles, encoding=None, first=False):
+    """ Search a file for several substrings (str or bytes) at once.
+        The file is mapped into memory (mmap) and scanned in one pass,
+        without reading or decoding it. Returns a dict from the needles
+        that were found to the (sorted) byte offsets of their matches.
+        With first=True, only the first offset of each needle is looked
+        for, and the scan stops as soon as all of them are found.
+
+        >>> with open('/tmp/_search_file_test', 'w') as fh:
+        ...     _ = fh.write('[versioning]\\nversion = 1\\n')
+        >>> search_file('/tmp/_search_file_test', ['version', 'sion =', 'missing'])
+        {'version': [1, 13], 'sion =': [16]}
+        >>> search_file('/tmp/_search_file_test', ['version'], first=True)
+        {'version': [1]}
+        >>> os.unlink('/tmp/_search_file_test')
+    """
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    needles = list(needles)
+    encoded = {}
+    for needle in needles:
+        encoded.setdefault(encode_needle(needle, encoding), []).append(needle)
+
+    found = {}
+    if b'' in encoded:
+        for needle in encoded.pop(b''):
+            found[needle] = [0]
+    if not encoded or os.path.getsize(path) == 0:
+        return found
+
+    unit = len(encode_needle('x', encoding))  # i.e. 2 for utf-16
+    pattern = re.compile(b'(?=(' + b'|'.join(
+        re.escape(e) for e in sorted(encoded, key=len, reverse=True)
+    ) + b'))')
+
+    with open(path, 'rb') as fh:
+        data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        bom = next((len(b) for b in BOMS if data[:len(b)] == b), 0)
+        remaining = set(encoded)
+        for match in pattern.finditer(data):
+            offset = match.start()
+            if (offset - bom) % unit:
+                continue  # not on a character boundary
+            for key in list(remaining):
+                if data[offset:offset + len(key)] != key:
+                    continue
+                for needle in encoded[key]:
+                    found.setdefault(needle, []).append(offset)
+                if first:
+                    remaining.discard(key)
+            if first and not remaining:
+                break
+    finally:
+        data.close()
+    return found
+
+
+def check_file(path, for_content, encoding=None):
+    """ Check wether a file contains a substring
+        (see search_file, the file is not read into memory).
+
+        >>> check_file(__file__, 'def check_file')
+        True
+        >>> check_file('/_not_/_there_', 'def check_file')
+        False
     """
     if not isfile(path):
         return False
-    with open(path, 'r') as f:
-        return for_content in f.read()
+    return bool(search_file(path, [for_content], encoding=encoding, first=True))
 
 
 
@@ -82,25 +316,206 @@ def append_to_file(path, content):
 
 
 
-_cache = {}
+def mtime_ns(info):
+    """ The mtime of a stat result in nanoseconds (st_mtime_ns
+        is new in python3.3, before the float mtime is used).
+
+        >>> mtime_ns(os.stat(__file__)) == os.stat(__file__).st_mtime_ns
+        True
+    """
+    try:
+        return info.st_mtime_ns
+    except AttributeError:
+        return int(info.st_mtime * 1e9)
+
+
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+MMAP_THRESHOLD = 1024 * 1024
+
+
+class Lines(Sequence):
+    """ An immutable view on (a part of) the lines of a cached file.
+        Slicing gives another view (without copying the lines), and
+        views compare equal to any sequence of the same lines.
+
+        >>> lines = Lines(('a', 'b', 'c', ''))
+        >>> lines[:-1] == ['a', 'b', 'c']
+        True
+        >>> lines[1:][0], lines[-1], len(lines[1:-1])
+        ('b', '', 2)
+        >>> lines[0] = 'x'
+        Traceback (most recent call last):
+        ...
+        TypeError: 'Lines' object does not support item assignment
+    """
+
+    __slots__ = ('_lines', '_start', '_stop')
+
+    def __init__(self, lines, start=0, stop=None):
+        self._lines = lines
+        self._start = start
+        self._stop = len(lines) if stop is None else stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return tuple(self)[index]
+            return Lines(self._lines, self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        return self._lines[self._start + index]
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<Lines: %s lines>' % len(self)
+
+
+class MappedLines(Sequence):
+    """ The lines of a (big) file, read through mmap. Only the
+        offsets of the lines are kept, they are decoded on access.
+        The mapping is held as long as the MappedLines (or a Lines view
+        on them) is in use, or until close() (or the end of a with block).
+    """
+
+    def __init__(self, path, encoding=None):
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        with open(path, 'rb') as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if finalize is not None:
+            finalize(self, self._map.close)
+        offsets = array('q', [0])
+        size = len(self._map)
+        position = self._map.find(b'\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = self._map.find(b'\n', position + 1)
+        if offsets[-1] != size:
+            offsets.append(size)  # no final newline
+        self._offsets = offsets
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, etype, value, traceback):
+        self.close()
+
+    @property
+    def nbytes(self):
+        return self._offsets.itemsize * len(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)  # one more than there are lines (the final '')
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        if index == len(self) - 1:
+            return ''
+        line = self._map[self._offsets[index]:self._offsets[index + 1]]
+        return line.rstrip(b'\n').rstrip(b'\r').decode(self.encoding)
+
+
+class FileCache(object):
+    """ A bounded LRU cache of the lines of text files. An entry is only
+        used as long as the (mtime_ns, size) of the file are unchanged.
+        The cached bytes are accounted (file sizes, or the line offsets
+        for files over the mmap_threshold, that are read through mmap),
+        and the least recently used entries are dropped, when there are
+        more than max_bytes. Bigger files are never cached. The lines
+        handed out stay usable after their entry is dropped (an mmap is
+        closed when the last view on it is gone).
+
+        >>> cache = FileCache(max_bytes=10)
+        >>> with open('/tmp/_file_cache_test', 'w') as fh:
+        ...     _ = fh.write('one\\ntwo\\n')
+        >>> lines = cache.lines('/tmp/_file_cache_test')
+        >>> list(lines), cache.nbytes
+        (['one', 'two', ''], 8)
+        >>> cache.lines('/tmp/_file_cache_test') is lines
+        True
+        >>> with open('/tmp/_file_cache_test', 'a') as fh:
+        ...     _ = fh.write('three\\n')
+        >>> list(cache.lines('/tmp/_file_cache_test')), cache.nbytes
+        (['one', 'two', 'three', ''], 0)
+        >>> os.unlink('/tmp/_file_cache_test')
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, mmap_threshold=MMAP_THRESHOLD):
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+
+    def lines(self, path):
+        """ Return the lines of a file (without line endings, followed
+            by an empty string, see cached_read) as a Lines view.
+        """
+        path = os.path.abspath(path)
+        info = os.stat(path)
+        stamp = (mtime_ns(info), info.st_size)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self._entries[path] = self._entries.pop(path)  # most recently used
+            return entry[1]
+        self._drop(path)
+
+        if self.mmap_threshold is not None and info.st_size >= self.mmap_threshold:
+            mapped = MappedLines(path)
+            lines, nbytes = Lines(mapped), mapped.nbytes
+        else:
+            with open(path, 'r') as f:
+                content = f.read().split('\n')
+            if content[-1] != '':
+                content.append('')
+            lines, nbytes = Lines(tuple(content)), info.st_size
+
+        if nbytes <= self.max_bytes:
+            self._entries[path] = (stamp, lines, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+        return lines
+
+
+_cache = FileCache()
 def _read_cache(path):
-    """ To avoid multiple reads of "small" text files.
-        Appending an empty string adds a final newline
-        in the read case, and omitting it in the readlines
-        case also creates a copy of the cached list.
+    """ To avoid multiple reads of "small" text files. The lines
+        are followed by an empty string, so joining them adds a
+        final newline in the read case, and slicing it off in the
+        readlines case gives a view (not a copy) of the lines.
     """
-    if path in _cache:
-        return _cache[path]
-    else:
-        with open(path, 'r') as f:
-            content = []
-            for line in f.readlines():
-                if line.endswith('\n'):
-                    content.append(line[:-1])
-                else:
-                    content.append(line)
-            content.append('')
-            return _cache.setdefault(path, content)
+    return _cache.lines(path)
 
 
 def cached_read(path):
@@ -109,7 +524,7 @@ def cached_read(path):
 
 
 def cached_readlines(path):
-    """ Get the lines of a file, cached. """
+    """ Get the lines of a file, cached (as an immutable sequence). """
     return _read_cache(path)[:-1]
 
 
@@ -2,6 +2,7 @@
 """ Some pythonic helper functions and general purpose cornercutting. """
 
 import os
+import re
 import sys
 import select
 
@@ -35,47 +36,280 @@ def read_stdin_nonblocking(**kwd):
             yield os.environ['TEST_STDIN_VALUE']
 
 
+def unique(items):
+    """ The unique items, in the order they first appear.
+
+        >>> unique(['b', 'a', 'b', 'c', 'a'])
+        ['b', 'a', 'c']
+    """
+    seen = set()
+    return [i for i in items if not (i in seen or seen.add(i))]
+
+
+def _pattern_list(patterns):
+    """ A single pattern (a string) or many, as a unique list. """
+    if patterns == str(patterns):
+        return [patterns]
+    return unique(patterns)
+
+
+class SubstringMatcher(object):
+    """ Match many substrings at once with an Aho-Corasick automaton.
+        The text is scanned once (one dict lookup per character),
+        no matter how many patterns there are.
+
+        >>> matcher = SubstringMatcher(['he', 'she', 'his', 'hers'])
+        >>> matcher.matches('ushers')
+        ['he', 'she', 'hers']
+        >>> matcher.search_any('this'), matcher.search_any('that')
+        (True, False)
+        >>> matcher.filter(['ushers', 'that', 'this', 'ushers'])
+        ['ushers', 'this']
+    """
+
+    def __init__(self, patterns):
+        self.patterns = _pattern_list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for idx, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state] += (idx,)
+
+        queue = list(self._goto[0].values())
+        for state in queue:  # breadth first, the queue grows while iterating
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+        self._matches_empty = bool(self._out[0])
+
+    def _step(self, state, char):
+        goto = self._goto
+        target = goto[state].get(char)
+        if target is None:
+            fallback = state
+            while target is None and fallback:
+                fallback = self._fail[fallback]
+                target = goto[fallback].get(char)
+            if target is None:
+                target = 0
+            goto[state][char] = target  # remember the transition
+        return target
+
+    def search_any(self, text):
+        """ If any of the patterns is in text. """
+        if self._matches_empty:
+            return True
+        out = self._out
+        goto = self._goto
+        state = 0
+        for char in text:
+            target = goto[state].get(char)
+            state = self._step(state, char) if target is None else target
+            if out[state]:
+                return True
+        return False
+
+    def matches(self, text):
+        """ The patterns that are in text (in the order of the patterns). """
+        found = set(self._out[0])
+        state = 0
+        for char in text:
+            state = self._step(state, char)
+            found.update(self._out[state])
+        return [self.patterns[idx] for idx in sorted(found)]
+
+    def filter(self, items):
+        """ The unique items that contain any of the patterns (in order). """
+        return unique(i for i in items if self.search_any(i))
+
+
+class PrefixMatcher(object):
+    """ Match many prefixes at once. The prefixes are indexed by their
+        length, so an item is looked up once per distinct length.
+
+        >>> PrefixMatcher(['feature/', 'fix/', 'f']).matches('feature/x')
+        ['feature/', 'f']
+        >>> PrefixMatcher(['.py', '.sh'], suffixes=True).filter(['a.py', 'b.txt', 'a.py'])
+        ['a.py']
+    """
+
+    def __init__(self, patterns, suffixes=False):
+        self.patterns = _pattern_list(patterns)
+        self.suffixes = suffixes
+        self._index = {}
+        for pattern in self.patterns:
+            self._index.setdefault(len(pattern), set()).add(pattern)
+        self._lengths = sorted(self._index)
+
+    def _part(self, text, length):
+        if not length:
+            return ''
+        return text[-length:] if self.suffixes else text[:length]
+
+    def search_any(self, text):
+        """ If text starts (or ends) with any of the patterns. """
+        size = len(text)
+        for length in self._lengths:
+            if length > size:
+                break
+            if self._part(text, length) in self._index[length]:
+                return True
+        return False
+
+    def matches(self, text):
+        """ The patterns text starts (or ends) with (in the order of the patterns). """
+        found = set(
+            self._part(text, length) for length in self._lengths
+            if length <= len(text) and self._part(text, length) in self._index[length]
+        )
+        return [p for p in self.patterns if p in found]
+
+    def filter(self, items):
+        """ The unique items that start (or end) with any of the patterns (in order). """
+        return unique(i for i in items if self.search_any(i))
+
+
+class FuzzyMatcher(object):
+    """ Rank items by how well they match a pattern, whose characters
+        have to appear in order, but not necessarily next to each other
+        (like fzf does). Matches at the start of a word and runs of
+        consecutive characters score higher, gaps lower. If the pattern
+        has no uppercase letters, case is ignored (smart case).
+
+        >>> FuzzyMatcher('fb').rank(['feature/foobar', 'fix/bug', 'develop'])
+        ['fix/bug', 'feature/foobar']
+        >>> FuzzyMatcher('fb').score('develop')
+    """
+
+    SCORE_MATCH = 16
+    BONUS_BOUNDARY = 8
+    BONUS_CONSECUTIVE = 4
+    BONUS_EXACT = 1000
+    PENALTY_GAP = 1
+    SEPARATORS = '/-_. '
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.ignore_case = pattern == pattern.lower()
+        self._needle = pattern.lower() if self.ignore_case else pattern
+        self._regex = re.compile('.*?'.join(re.escape(c) for c in self._needle), re.DOTALL)
+
+    def score(self, text):
+        """ The score of text (higher is better), None if it does not match.
+            The leftmost match is scored, and those starting at a word
+            boundary, the best of them counts.
+
+            >>> FuzzyMatcher('x').score('fix/x') > FuzzyMatcher('x').score('fix')
+            True
+        """
+        if self.ignore_case:
+            text = text.lower()
+        needle = self._needle
+        if not needle:
+            return 0
+        match = self._regex.search(text)
+        if match is None:
+            return None
+
+        best = self._score_match(text, match.end())
+        separators = self.SEPARATORS
+        first = needle[0]
+        pos = text.find(first, match.start() + 1)
+        while pos >= 0:
+            if text[pos - 1] in separators:
+                match = self._regex.match(text, pos)
+                if match is None:
+                    break  # no later start can match either
+                best = max(best, self._score_match(text, match.end()))
+            pos = text.find(first, pos + 1)
+        return best + (self.BONUS_EXACT if text == needle else 0)
+
+    def _score_match(self, text, end):
+        needle = self._needle
+
+        # narrow the match down, from its end backwards
+        start = end
+        idx = len(needle)
+        while idx:
+            start -= 1
+            if text[start] == needle[idx - 1]:
+                idx -= 1
+
+        score = 0
+        last = None
+        for pos in range(start, end):
+            if idx < len(needle) and text[pos] == needle[idx]:
+                score += self.SCORE_MATCH
+                if not pos or text[pos - 1] in self.SEPARATORS:
+                    score += self.BONUS_BOUNDARY
+                if last == pos - 1:
+                    score += self.BONUS_CONSECUTIVE
+                last = pos
+                idx += 1
+            else:
+                score -= self.PENALTY_GAP
+        return score
+
+    def rank(self, items, key=None, tiebreak=None):
+        """ The matching items, best first. Items with the same score
+            are ordered by tiebreak(item), by default their length.
+        """
+        if key is None:
+            key = str
+        if tiebreak is None:
+            tiebreak = lambda item: len(key(item))
+        scored = []
+        for item in items:
+            score = self.score(key(item))
+            if score is not None:
+                scored.append((-score, tiebreak(item), len(scored), item))
+        scored.sort()
+        return [item for _, _, _, item in scored]
+
+
 def startingwith(prefixes='', lst=()):
     """ Filter an iterable for elements starting with prefix.
+        The result is unique, in the order of the iterable.
 
         >>> startingwith(('feature/', 'footure/'), ['feature/something', 'release/somethingelse'])
         ['feature/something']
     """
-    if prefixes == str(prefixes):
-        return [e for e in lst if e.startswith(prefixes)]
-    else:
-        result = []
-        for prefix in prefixes:
-            result.extend(startingwith(prefix, lst))
-        return result
+    return PrefixMatcher(prefixes).filter(lst)
 
 def endingwith(suffixes='', lst=()):
     """ Filter an iterable for elements ending with suffix.
+        The result is unique, in the order of the iterable.
 
         >>> endingwith(('.py', 'xxx', '.sh'), ['something.py', 'somethingelse.sh'])
         ['something.py', 'somethingelse.sh']
     """
-    if suffixes == str(suffixes):
-        return [e for e in lst if e.endswith(suffixes)]
-    else:
-        result = []
-        for suffix in suffixes:
-            result.extend(endingwith(suffix, lst))
-        return result
+    return PrefixMatcher(suffixes, suffixes=True).filter(lst)
 
 def containing(parts='', lst=()):
     """ Filter an iterable for elements containing the given parts.
+        The result is unique, in the order of the iterable.
 
         >>> containing(('ing', 'xxx', 'e'), ['something', 'somethingelse', 'morestuff'])
-        ['something', 'somethingelse', 'something', 'somethingelse', 'morestuff']
+        ['something', 'somethingelse', 'morestuff']
+        >>> containing('', ['a', 'b'])
+        ['a', 'b']
     """
-    if parts == str(parts):
-        return [e for e in lst if parts in e]
-    else:
-        result = []
-        for part in parts:
-            result.extend(containing(part, lst))
-        return result
+    return SubstringMatcher(parts).filter(lst)
 
 
 
@@ -97,7 +331,8 @@ def contains_any_filter(containers, *elems):
         >>> contains_any_filter(['something', 'thumethong', 'butter'], 'sum', 'somethingelse', 'ing', 'ong')
         ['something', 'thumethong']
     """
-    return [c for c in containers if contains_any(c, *elems)]
+    matcher = SubstringMatcher(elems)
+    return [c for c in containers if matcher.search_any(c)]
 
 
 # pylint: disable=E0401,E1101,E0611
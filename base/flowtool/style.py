@@ -1,6 +1,11 @@
 """ Flowtool console output wrappers.  """
 
+import os
+import sys
+import time
 import click
+import atexit
+import weakref
 
 from collections import namedtuple
 from functools import partial
@@ -54,3 +59,97 @@ ConvenienceFunctions = namedtuple('ConvenienceFunctions', color_names + term_eff
 colors = ConvenienceFunctions(**functions)
 echo = ConvenienceFunctions(**{name: echo_function(f) for name, f in functions.items()})
 debug = ConvenienceFunctions(**{name: debug_function(f) for name, f in functions.items()})
+
+
+ANSI_RESET = '\x1b[0m'
+ANSI_CODES = dict(
+    [(name, click.style('', fg=name, reset=False)) for name in color_names]
+    + [(name, click.style('', reset=False, **{name: True})) for name in term_effects]
+)
+
+
+def use_color(stream):
+    """ If styles should be written to stream: not when NO_COLOR
+        is set (to anything), and only if stream is a terminal.
+
+        >>> use_color(open(os.devnull, 'w'))
+        False
+    """
+    if 'NO_COLOR' in os.environ:
+        return False
+    isatty = getattr(stream, 'isatty', None)
+    return bool(isatty and isatty())
+
+
+_renderers = weakref.WeakSet()
+
+@atexit.register
+def _flush_renderers():
+    for renderer in list(_renderers):
+        renderer.flush()
+
+
+class Renderer(object):
+    """ Buffered console output for many small writes, like the progress
+        characters of a hook. The buffer is written at most `rate` times
+        per second (and on flush, on leaving the context and at exit).
+        The ANSI codes are precomputed, and when the stream is not a
+        terminal (or NO_COLOR is set), the text is written unstyled.
+        That is checked once per stream, not on every write.
+
+        >>> with Renderer(rate=0) as out:
+        ...     for char in 'XF?':
+        ...         out.write(char, 'bold')
+        ...     out.write(' done.\\n')
+        XF? done.
+    """
+
+    def __init__(self, stream=None, rate=10, color=None):
+        self._stream = stream
+        self.interval = 1.0 / rate if rate else None
+        self.color = color
+        self._checked = (None, None)  # (stream, whether to use color)
+        self._buffer = []
+        self._last_flush = time.time()
+        _renderers.add(self)
+        if color is None and stream is not None:
+            self.stream_color()
+
+    @property
+    def stream(self):
+        # looked up late, so redirections of sys.stdout are respected
+        return sys.stdout if self._stream is None else self._stream
+
+    def stream_color(self):
+        """ If the stream gets colors (see use_color), cached per stream. """
+        stream = self.stream
+        if self._checked[0] is not stream:
+            self._checked = (stream, use_color(stream))
+        return self._checked[1]
+
+    def styled(self, text, style=None):
+        """ Style a text with a color or effect name (i.e. 'bold'). """
+        color = self.stream_color() if self.color is None else self.color
+        if not style or not color:
+            return text
+        return ANSI_CODES[style] + text + ANSI_RESET
+
+    def write(self, text, style=None):
+        self._buffer.append(self.styled(text, style))
+        if self.interval is not None and time.time() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.time()
+        if not self._buffer:
+            return
+        text = ''.join(self._buffer)
+        del self._buffer[:]
+        self.stream.write(text)
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, etype, value, traceback):
+        self.flush()
@@ -1,3 +1,4 @@
+import errno
 import pytest
 
 from flowtool import execute
@@ -10,3 +11,13 @@ def test_execute_date():
     result = execute.run_command('date')
 
     assert result.returncode == 0
+
+
+@pytest.mark.skipif(not execute.use_posix_spawn, reason='no posix_spawn')
+def test_spawn_failure(tmpdir):
+    script = tmpdir.join('garbage')
+    script.write_binary(b'\x00\x01garbage')
+    script.chmod(0o755)
+    with pytest.raises(OSError) as info:
+        execute.spawn_command([str(script)], input='meow')
+    assert info.value.errno != errno.EBADF  # from closing a pipe twice
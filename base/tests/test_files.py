@@ -1,5 +1,7 @@
+import gc
 import os
 import pytest
+import subprocess
 
 from flowtool import files
 
@@ -42,6 +44,61 @@ def test_find_subdirs_containing():
     assert len(found1) <= len(found2)
 
 
+@pytest.fixture
+def tree(tmpdir):
+    for name in (
+            'a/setup.cfg', 'a/sub/setup.cfg', 'b/setup.cfg', 'c/x/y/setup.cfg',
+            '.git/setup.cfg', '.tox/env/setup.cfg', 'node_modules/m/setup.cfg',
+            'build/lib/setup.cfg'):
+        tmpdir.join(name).ensure()
+    tmpdir.join('.gitignore').write('build/\n')
+    return tmpdir
+
+
+def test_find_subdirs_pruned(tree):
+    root = str(tree)
+    expected = [os.path.join(root, d) for d in ('a', 'a/sub', 'b', 'build/lib', 'c/x/y')]
+    found = files.find_subdirs_containing('setup.cfg', root, check='file')
+    assert found == expected
+
+    assert files.find_subdirs_containing('setup.cfg', root, workers=3) == expected
+    assert files.find_subdirs_containing('setup.cfg', root, limit=2) == expected[:2]
+    assert files.find_subdirs_containing('setup.cfg', root, limit=2, workers=3) == expected[:2]
+
+    everything = files.find_subdirs_containing('setup.cfg', root, prune=())
+    assert os.path.join(root, '.tox/env') in everything
+
+
+def test_scan_entries_without_scandir(tree, monkeypatch):
+    root = str(tree)
+    os.symlink(os.path.join(root, 'a'), os.path.join(root, 'link'))
+    os.symlink(os.path.join(root, 'gone'), os.path.join(root, 'broken'))
+    with_scandir = sorted(files.scan_entries(root))
+    monkeypatch.delattr(os, 'scandir')
+    assert sorted(files.scan_entries(root)) == with_scandir
+    link = [e for e in with_scandir if e.name == 'link'][0]
+    assert link.is_dir and link.is_symlink
+
+    expected = [os.path.join(root, d) for d in ('a', 'a/sub', 'b', 'build/lib', 'c/x/y')]  # not below link
+    assert files.find_subdirs_containing('setup.cfg', root, check='file') == expected
+
+
+def test_find_subdirs_gitignore(tree):
+    root = str(tree)
+    subprocess.check_call(['git', 'init', '-q', root])
+    found = files.find_subdirs_containing('setup.cfg', root, gitignore=True)
+    assert os.path.join(root, 'build/lib') not in found
+    assert os.path.join(root, 'c/x/y') in found
+
+
+def test_find_subdirs_gitignore_relative(tree, monkeypatch):
+    subprocess.check_call(['git', 'init', '-q', str(tree)])
+    monkeypatch.chdir(str(tree))
+    found = files.find_subdirs_containing('setup.cfg', '.', gitignore=True)
+    assert './build/lib' not in found
+    assert './c/x/y' in found
+
+
 def test_check_file():
 
     assert files.check_file(__file__, 'check_file')
@@ -49,6 +106,20 @@ def test_check_file():
     assert not files.check_file('/_not_/_here_/_not_/_there_', 'pattern')
 
 
+def test_search_file(tmpdir):
+    path = tmpdir.join('search.txt')
+    path.write_binary(u'abcabc\n\xe4bc\n'.encode('utf-8'))
+    found = files.search_file(str(path), ['abc', 'bc', u'\xe4', b'c\n', 'nope'], encoding='utf-8')
+    assert found == {'abc': [0, 3], 'bc': [1, 4, 9], u'\xe4': [7], b'c\n': [5, 10]}
+
+    path.write_binary(u'\ufeffa\u0101a'.encode('utf-16-le'))
+    assert files.search_file(str(path), [u'\u0101a'], encoding='utf-16') == {u'\u0101a': [4]}
+    assert files.search_file(str(path), [u'\u0100'], encoding='utf-16') == {}
+
+    path.write('')
+    assert files.search_file(str(path), ['a', '']) == {'': [0]}
+
+
 def test_append_file():
     assert files.append_to_file('/dev/null', '100 thousand bytes')
 
@@ -70,6 +141,71 @@ def test_cached_reads():
     os.unlink(test_file)
 
 
+def test_file_cache_lru(tmpdir):
+    paths = []
+    for idx in range(3):
+        path = tmpdir.join('file%s.txt' % idx)
+        path.write('x' * 9 + '\n')
+        paths.append(str(path))
+
+    cache = files.FileCache(max_bytes=25)
+    first = cache.lines(paths[0])
+    cache.lines(paths[1])
+    assert cache.nbytes == 20
+    assert cache.lines(paths[0]) is first
+
+    cache.lines(paths[2])  # evicts paths[1], the least recently used
+    assert cache.nbytes == 20
+    assert cache.lines(paths[0]) is first
+    assert cache.lines(paths[1]) is not cache.lines(paths[2])
+
+
+def test_file_cache_mmap(tmpdir):
+    path = tmpdir.join('big.txt')
+    content = 'first line\r\n' + ''.join('line %s\n' % i for i in range(1000)) + 'last'
+    path.write_binary(content.encode('ascii'))
+
+    mapped = files.FileCache(mmap_threshold=1024).lines(str(path))
+    read = files.FileCache(mmap_threshold=None).lines(str(path))
+    assert isinstance(mapped._lines, files.MappedLines)
+    assert mapped == read
+    assert mapped[0] == 'first line'
+    assert mapped[-2:] == ['last', '']
+    assert len(mapped[10:20]) == 10
+
+
+def test_file_cache_keeps_old_views(tmpdir):
+    path = tmpdir.join('big.txt')
+    path.write('line\n' * 500)
+
+    with files.MappedLines(str(path)) as lines:
+        assert lines[0] == 'line'
+    with pytest.raises(ValueError):
+        lines[0]
+
+    cache = files.FileCache(max_bytes=10**6, mmap_threshold=100)
+    old = cache.lines(str(path))
+    path.write('more\n', mode='a')
+    new = cache.lines(str(path))
+    assert old[0] == 'line' and len(old) == 501
+    assert new[-2] == 'more'
+
+    cache.clear()
+    assert new[0] == 'line'
+
+    mapping = old._lines._map
+    del old
+    gc.collect()
+    assert mapping.closed
+
+
+def test_cached_lines_are_views():
+    lines = files.cached_readlines(__file__)
+    assert lines._lines is files._read_cache(__file__)._lines
+    with pytest.raises(TypeError):
+        lines[0] = 'changed'
+
+
 def test_executables():
 
     assert not files.is_executable(__file__)
@@ -56,3 +56,49 @@ def test_read_stdin_nonblocking():
         result = list(python.read_stdin_nonblocking())
         sys.stdin = _stdin
     assert result == []
+
+
+def test_substring_matcher():
+    patterns = ['yaml', 'aml', 'lint', 'yamllint', 'x']
+    names = ['yamllint', 'pylint', 'shellcheck', 'yamllint', 'html', 'xaml']
+    matcher = python.SubstringMatcher(patterns)
+
+    for name in names:
+        assert matcher.matches(name) == [p for p in patterns if p in name]
+        assert matcher.search_any(name) == any(p in name for p in patterns)
+
+    assert python.containing(patterns, names) == ['yamllint', 'pylint', 'xaml']
+    assert python.containing('lint', names) == ['yamllint', 'pylint']
+    assert python.containing((), names) == []
+
+
+def test_prefix_suffix_matchers():
+    names = ['feature/a', 'fix/b', 'feature/a', 'release/1.0', '']
+    assert python.startingwith(('fix/', 'feature/', 'feat'), names) == ['feature/a', 'fix/b']
+    assert python.startingwith('', names) == ['feature/a', 'fix/b', 'release/1.0', '']
+    assert python.endingwith(('.0', '/a', 'too long for any name'), names) == ['feature/a', 'release/1.0']
+    assert python.PrefixMatcher(['fe', 'feature/', 'x']).matches('feature/a') == ['fe', 'feature/']
+
+
+def test_fuzzy_matcher():
+    branches = [
+        'feature/ABC-123-login-form',
+        'feature/ABC-124-logout',
+        'develop',
+        'release/1.0',
+        'fix/lf',
+    ]
+    matcher = python.FuzzyMatcher('lf')
+    assert matcher.rank(branches) == ['fix/lf', 'feature/ABC-123-login-form']
+
+    assert python.FuzzyMatcher('develop').rank(branches + ['old-develop']) == ['develop', 'old-develop']
+    assert python.FuzzyMatcher('abc').rank(branches) == [branches[1], branches[0]]  # shorter first
+    assert python.FuzzyMatcher('ABC-124').rank(branches) == ['feature/ABC-124-logout']
+    assert python.FuzzyMatcher('Abc').rank(branches) == []
+
+    ranked = python.FuzzyMatcher('').rank(branches, tiebreak=lambda b: b)
+    assert ranked == sorted(branches)
+
+    matcher = python.FuzzyMatcher('ab')
+    assert matcher.score('a-b') > matcher.score('axb')
+    assert matcher.score('ab') > matcher.score('a-b')
@@ -36,3 +36,57 @@ def test_colors():
         assert 'string' in colored
         assert not colored.startswith('string')
         assert not colored.endswith('string')
+
+
+class FakeTerminal(object):
+
+    def __init__(self):
+        self.writes = []
+
+    def isatty(self):
+        return True
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        pass
+
+
+def test_renderer_buffers(monkeypatch):
+    monkeypatch.delenv('NO_COLOR', raising=False)
+    stream = FakeTerminal()
+    out = style.Renderer(stream=stream, rate=1e-6)
+    for char in '....F':
+        out.write(char, 'bold')
+    assert stream.writes == []
+    out.flush()
+    assert stream.writes == [style.colors.bold('.') * 4 + style.colors.bold('F')]
+
+
+def test_renderer_checks_terminal_once(monkeypatch):
+    monkeypatch.delenv('NO_COLOR', raising=False)
+    stream = FakeTerminal()
+    checks = []
+    monkeypatch.setattr(stream, 'isatty', lambda: checks.append(1) or True)
+    with style.Renderer(stream=stream, rate=1e-6) as out:
+        for char in '....F':
+            out.write(char, 'bold')
+    assert len(checks) == 1
+
+
+def test_renderer_no_color(monkeypatch):
+    monkeypatch.setenv('NO_COLOR', '')
+    stream = FakeTerminal()
+    with style.Renderer(stream=stream, rate=1e-6) as out:
+        out.write('.', 'green')
+    assert stream.writes == ['.']
+
+
+def test_renderer_flushes_on_failure(capsys):
+    with pytest.raises(RuntimeError):
+        with style.Renderer(rate=1e-6) as out:
+            out.write('X', 'red')
+            raise RuntimeError('check crashed')
+    out, err = capsys.readouterr()
+    assert out == 'X'
@@ -0,0 +1,70 @@
+""" Benchmark listing tags with a prefix, from a repo with many
+    packed tags: `git tag` filtered in Python (as local_tags did),
+    GitPython's repo.tags, and flowtool_git.refs.
+
+    $ python benchmarks/ref_listing.py [tags]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from git import Repo
+
+from flowtool_git import refs
+
+
+def timed(func, *args):
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def git_tag_listing(repo, prefix):
+    return [t for t in repo.git.tag().split() if t.startswith(prefix)]
+
+def gitpython_listing(repo, prefix):
+    return [t.name for t in repo.tags if t.name.startswith(prefix)]
+
+def refs_listing(repo, prefix):
+    return refs.local_tags(prefix, repo=repo)
+
+
+def make_repo(path, count):
+    repo = Repo.init(path)
+    repo.git.commit('--allow-empty', '-m', 'Tagged.')
+    sha = repo.head.commit.hexsha
+    names = sorted('refs/tags/release/%06d' % i for i in range(count))
+    with open(os.path.join(repo.git_dir, 'packed-refs'), 'w') as fh:
+        fh.write('# pack-refs with: peeled fully-peeled sorted \n')
+        fh.writelines('%s %s\n' % (sha, name) for name in names)
+    old = time.time() - 60  # older than refs.RACY_SECONDS
+    os.utime(os.path.join(repo.git_dir, 'packed-refs'), (old, old))
+    return repo
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 50000
+    prefix = 'release/0123'
+
+    path = tempfile.mkdtemp(prefix='flowtool-refs-benchmark-')
+    try:
+        repo = make_repo(path, count)
+        results = []
+        for name, func in (
+                ('git tag', git_tag_listing),
+                ('repo.tags', gitpython_listing),
+                ('refs (cold)', refs_listing),
+                ('refs (cached)', refs_listing)):
+            seconds, result = timed(func, repo, prefix)
+            results.append(result)
+            print('{:14} {} tags, prefix {!r}: {:8.4f}s, {} found'.format(
+                name, count, prefix, seconds, len(result),
+            ))
+        assert all(r == results[0] for r in results)
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == '__main__':
+    main(sys.argv)
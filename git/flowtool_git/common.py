@@ -55,6 +55,27 @@ def local_repo(path=None, or_exit=True):
         if or_exit:
             abort('The current directory is not under git version control: %s' % ex)
 
+def find_git_repos(path=None):
+    """ Find the git repositories in the directory tree below path.
+        A directory counts as a repository if it contains a `.git`
+        (directory or file, as used by worktrees and submodules).
+        The walk neither descends into `.git` directories nor into
+        the repositories found, so nested repos are not reported.
+
+        >>> find_git_repos('/_not_/_there_')
+        []
+    """
+    if path is None:
+        path = os.getcwd()
+
+    found = []
+    for loc, dirs, files in os.walk(path):
+        if '.git' in dirs or '.git' in files:
+            found.append(loc)
+            dirs[:] = []
+    return sorted(found)
+
+
 def local_git_command(path=None, *args, **kwd):
     """ Return the GitPython git command wrapper for a local git repository.
     """
@@ -0,0 +1,217 @@
+""" Reading information from the git object database.
+
+    All lookups are streamed through one `git cat-file --batch-check`
+    process, instead of spawning one git command per object.
+
+    >>> infos = list(batch_check(['HEAD', 'HEAD:_not_/_there_']))
+    >>> infos[0].type
+    'commit'
+    >>> infos[1]
+    ObjectInfo(object='HEAD:_not_/_there_', type='missing', size=None, rest='')
+"""
+import subprocess
+import threading
+
+from collections import namedtuple
+
+from .common import local_repo, GitCommandError
+
+ObjectInfo = namedtuple('ObjectInfo', ['object', 'type', 'size', 'rest'])
+ChangedBlob = namedtuple('ChangedBlob', ['path', 'object', 'mode'])
+
+BATCH_FORMAT = '%(objectname) %(objecttype) %(objectsize) %(rest)'
+
+NULL_OBJECT = '0' * 40
+GITLINK_MODE = '160000'
+
+
+def parse_batch_line(line):
+    """ Parse an output line of `git cat-file --batch-check` (in BATCH_FORMAT).
+
+        >>> parse_batch_line('e69de29b blob 0 some/path\\n')
+        ObjectInfo(object='e69de29b', type='blob', size=0, rest='some/path')
+        >>> parse_batch_line('HEAD:x missing\\n')
+        ObjectInfo(object='HEAD:x', type='missing', size=None, rest='')
+    """
+    line = line.rstrip('\n')
+    if line.endswith(' missing') or line.endswith(' ambiguous'):
+        name, kind = line.rsplit(' ', 1)
+        return ObjectInfo(name, kind, None, '')
+    parts = line.split(' ', 3)
+    rest = parts[3] if len(parts) > 3 else ''
+    return ObjectInfo(parts[0], parts[1], int(parts[2]), rest)
+
+
+def batch_check(objects, repo=None):
+    """ Generate an ObjectInfo for every object name in objects.
+
+        The names are written to one `git cat-file --batch-check` process
+        by a feeder thread while the results are read, so neither the
+        input nor the output is ever held in memory completely. Anything
+        after the first space of an input line comes back as `rest`.
+        Errors while generating the names are raised in the reader.
+
+        >>> def broken():
+        ...     yield 'HEAD'
+        ...     raise ValueError('broken input')
+        >>> list(batch_check(broken()))
+        Traceback (most recent call last):
+        ...
+        ValueError: broken input
+    """
+    repo = local_repo(repo)
+    process = subprocess.Popen(
+        [
+            'git', '--git-dir', repo.git_dir,
+            'cat-file', '--batch-check=' + BATCH_FORMAT, '--buffer',
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    errors = []
+    def feed():
+        try:
+            for name in objects:
+                process.stdin.write(name + '\n')
+        except (IOError, OSError):
+            pass  # git went away, the reader will notice
+        except Exception as ex:
+            errors.append(ex)  # raised again by the reader
+        finally:
+            try:
+                process.stdin.close()
+            except (IOError, OSError):
+                pass
+
+    feeder = threading.Thread(target=feed)
+    feeder.daemon = True
+    feeder.start()
+
+    try:
+        for line in process.stdout:
+            yield parse_batch_line(line)
+    finally:
+        process.stdout.close()
+        feeder.join()
+        process.wait()
+    if errors:
+        raise errors[0]
+
+
+def parse_raw_diff(output):
+    """ Parse the output of `git diff --raw -z --no-abbrev` into
+        ChangedBlob tuples of the new side (deleted files and
+        submodules are skipped).
+
+        >>> parse_raw_diff(
+        ...     ':000000 100644 %s e69de29b A\\0new file\\0'
+        ...     ':100644 100644 aaaaaaaa bbbbbbbb R087\\0old\\0moved\\0'
+        ...     ':100644 000000 cccccccc %s D\\0gone\\0' % (NULL_OBJECT, NULL_OBJECT)
+        ... )
+        [ChangedBlob(path='new file', object='e69de29b', mode='100644'), ChangedBlob(path='moved', object='bbbbbbbb', mode='100644')]
+    """
+    tokens = output.split('\0')
+    result = []
+    idx = 0
+    while idx < len(tokens) and tokens[idx].startswith(':'):
+        _, new_mode, _, new_object, status = tokens[idx][1:].split(' ')
+        if status[0] in 'RC':
+            path = tokens[idx + 2]
+            idx += 3
+        else:
+            path = tokens[idx + 1]
+            idx += 2
+        if new_object == NULL_OBJECT or new_mode == GITLINK_MODE:
+            continue
+        result.append(ChangedBlob(path, new_object, new_mode))
+    return result
+
+
+def changed_blobs(revisions=('--cached',), repo=None):
+    """ The blobs that are new or changed in a diff (by default
+        the staged changes, or i.e. ('origin/master', 'HEAD')).
+
+        >>> isinstance(changed_blobs(), list)
+        True
+    """
+    repo = local_repo(repo)
+    output = repo.git.diff(
+        '--raw', '-z', '--no-abbrev', '--no-renames', '--diff-filter=ACMRT',
+        *revisions
+    )
+    return parse_raw_diff(output)
+
+
+def stream_git(args, repo=None):
+    """ Run a git command and generate its output lines (without newlines),
+        as they come. Raises a GitCommandError if git fails.
+
+        >>> list(stream_git(['rev-parse', '--is-inside-work-tree']))
+        ['true']
+    """
+    repo = local_repo(repo)
+    command = ['git', '--git-dir', repo.git_dir] + list(args)
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode:
+        raise GitCommandError(command, returncode, stderr)
+
+
+def reachable_blobs(revisions, repo=None):
+    """ Generate an ObjectInfo for every blob reachable from revisions
+        (i.e. ('HEAD', '--not', '--remotes') or (sha, '^' + old_sha)),
+        including those only present in intermediate commits. The path
+        of the blob is in `rest`. One `git rev-list --objects` is streamed
+        into one `git cat-file --batch-check`, in constant memory.
+
+        >>> all(i.type == 'blob' for i in reachable_blobs(['HEAD', '--max-count=1']))
+        True
+    """
+    repo = local_repo(repo)
+    listing = stream_git(['rev-list', '--objects'] + list(revisions), repo=repo)
+    for info in batch_check(listing, repo=repo):
+        if info.type == 'blob':
+            yield info
+
+
+def introducing_commits(objects, revisions, repo=None):
+    """ Find the (oldest) commits within revisions, that introduce
+        the given blobs, in one streaming pass over `git log --raw`.
+        Returns a dict from object id to commit id.
+
+        >>> introducing_commits([], ['HEAD'])
+        {}
+    """
+    wanted = set(objects)
+    found = {}
+    if not wanted:
+        return found
+
+    log = stream_git(
+        ['log', '--format=%H', '--raw', '--no-abbrev', '--no-renames', '--root', '-m']
+        + list(revisions) + ['--'],
+        repo=repo,
+    )
+    commit = None
+    for line in log:
+        if line.startswith(':'):
+            new_object = line.split('\t', 1)[0].split(' ')[3]
+            if new_object in wanted:
+                found[new_object] = commit  # the log is newest first
+        elif line:
+            commit = line.strip()
+    return found
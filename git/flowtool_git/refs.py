@@ -0,0 +1,281 @@
+""" Reading refs (tags, branches, ...) straight from the git directory.
+
+    The `packed-refs` file and the loose refs below `refs/` are parsed
+    directly, instead of asking git (or building GitPython objects).
+    A prefix filter is answered by a binary search over the (sorted)
+    `packed-refs` file, and only the loose refs below the prefix are
+    looked at. Results are cached, and reused as long as the stat info
+    of `packed-refs` and of the loose ref directories is unchanged.
+
+    >>> refs = list_refs('refs/heads/')
+    >>> all(r.name.startswith('refs/heads/') for r in refs)
+    True
+    >>> local_tags('_not_/_there_')
+    []
+"""
+import os
+import time
+
+from collections import namedtuple
+
+from flowtool.files import mtime_ns, scan_entries
+
+from .common import local_repo
+
+Ref = namedtuple('Ref', ['name', 'object', 'peeled'])
+
+# Stat info younger than this may not show the latest change yet
+# (on file systems with coarse timestamps), so it is not cached.
+RACY_SECONDS = 1.0
+
+_packed_cache = {}
+_loose_cache = {}
+
+
+def common_dir(git_dir):
+    """ The directory holding the refs, which is the git dir itself,
+        except for linked worktrees, which point to it in `commondir`.
+
+        >>> common_dir('/_not_/_there_')
+        '/_not_/_there_'
+    """
+    try:
+        with open(os.path.join(git_dir, 'commondir')) as fh:
+            return os.path.normpath(os.path.join(git_dir, fh.read().strip()))
+    except (IOError, OSError):
+        return git_dir
+
+
+def stat_stamp(path):
+    """ What tells us if a file or directory has changed (None if missing). """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (mtime_ns(info), info.st_size, info.st_ino)
+
+
+def is_racy(stamps, now):
+    """ If any of the stamps is too recent to be trusted.
+
+        >>> is_racy([None, (0, 0, 0)], time.time())
+        False
+        >>> is_racy([(int(1e9 * time.time()), 0, 0)], time.time())
+        True
+    """
+    limit = (now - RACY_SECONDS) * 1e9
+    return any(stamp is not None and stamp[0] > limit for stamp in stamps)
+
+
+def _encode(name):
+    return name.encode('utf-8', 'surrogateescape')
+
+def _decode(name):
+    return name.decode('utf-8', 'surrogateescape')
+
+
+def _record_start(data, pos):
+    """ The start of the record (ref line) that the line at pos belongs to. """
+    start = data.rfind(b'\n', 0, pos) + 1
+    while data.startswith(b'^', start) and start:
+        start = data.rfind(b'\n', 0, start - 1) + 1
+    return start
+
+def _skip_peeled(data, pos):
+    while data.startswith(b'^', pos):
+        end = data.find(b'\n', pos)
+        pos = len(data) if end < 0 else end + 1
+    return pos
+
+def _record_name(data, start):
+    """ The refname of the record at start, and the start of the next line. """
+    end = data.find(b'\n', start)
+    if end < 0:
+        end = len(data)
+    return data[data.find(b' ', start, end) + 1:end], end + 1
+
+
+def seek_packed(data, key, start=0):
+    """ Find the offset of the first record in a sorted packed-refs
+        content, whose refname is not less than key (both bytes).
+
+        >>> data = b'1 refs/a\\n2 refs/b\\n^3\\n4 refs/c\\n'
+        >>> [seek_packed(data, k) for k in (b'refs/', b'refs/b', b'refs/bb', b'refs/d')]
+        [0, 9, 21, 30]
+    """
+    low, high = start, len(data)
+    while low < high:
+        record = _record_start(data, (low + high) // 2)
+        name, after = _record_name(data, record)
+        if name < key:
+            low = _skip_peeled(data, after)
+        else:
+            high = record
+    return low
+
+
+def parse_packed(data, prefix=b'', start=0, sorted_refs=True):
+    """ Parse the records of packed-refs content from start, which
+        have a refname starting with prefix. If the refs are sorted,
+        parsing stops at the first refname after the prefix range.
+
+        >>> parse_packed(b'# pack-refs with: peeled sorted \\n1 refs/tags/a\\n^2\\n3 refs/tags/b\\n')
+        [Ref(name='refs/tags/a', object='1', peeled='2'), Ref(name='refs/tags/b', object='3', peeled=None)]
+    """
+    result = []
+    for line in data[start:].splitlines():
+        if line.startswith(b'^'):
+            if result and result[-1] is not None:
+                result[-1] = result[-1]._replace(peeled=_decode(line[1:]))
+            continue
+        if not line or line.startswith(b'#'):
+            continue
+        obj, _, name = line.partition(b' ')
+        if name.startswith(prefix):
+            result.append(Ref(_decode(name), _decode(obj), None))
+        elif sorted_refs and name > prefix:
+            break
+        else:
+            result.append(None)  # so a following peeled line is not misplaced
+    return [ref for ref in result if ref is not None]
+
+
+def packed_refs(git_dir, prefix=''):
+    """ The refs in the packed-refs file (of the common dir) below prefix. """
+    path = os.path.join(common_dir(git_dir), 'packed-refs')
+    stamp = stat_stamp(path)
+    cached = _packed_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        now = time.time()
+        try:
+            with open(path, 'rb') as fh:
+                data = fh.read()
+        except (IOError, OSError):
+            data = b''
+        cached = (stamp, data, {})
+        if not is_racy([stamp], now):
+            _packed_cache[path] = cached
+
+    stamp, data, results = cached
+    if prefix not in results:
+        key = _encode(prefix)
+        header = data.split(b'\n', 1)[0] if data.startswith(b'#') else b''
+        if b' sorted ' in header + b' ':
+            start = seek_packed(data, key, start=len(header) + 1 if header else 0)
+            results[prefix] = parse_packed(data, key, start=start)
+        else:
+            refs = parse_packed(data, key, sorted_refs=False)
+            results[prefix] = sorted(refs, key=lambda ref: _encode(ref.name))
+    return results[prefix]
+
+
+def _walk_loose(path, name, prefix, stamps, found):
+    stamps.append((path, stat_stamp(path)))
+    try:
+        entries = scan_entries(path)
+    except OSError:
+        return
+    for entry in entries:
+        refname = name + entry.name
+        if entry.is_dir and not entry.is_symlink:
+            if refname.startswith(prefix) or prefix.startswith(refname + '/'):
+                _walk_loose(entry.path, refname + '/', prefix, stamps, found)
+        elif refname.startswith(prefix) and not entry.name.endswith('.lock'):
+            try:
+                with open(entry.path, 'rb') as fh:
+                    content = fh.read().strip()
+            except (IOError, OSError):
+                continue  # deleted meanwhile
+            found[refname] = _decode(content)
+
+
+def loose_refs(git_dir, prefix='refs/'):
+    """ The loose refs (files below `refs/`) with names starting with
+        prefix, as a dict from refname to the content (the object name,
+        or 'ref: <refname>' for symbolic refs). Only the directory of the
+        prefix (i.e. `refs/tags` for 'refs/tags/v1.') is walked.
+    """
+    base = common_dir(git_dir)
+    top = prefix[:prefix.rfind('/') + 1] or 'refs/'
+    key = (base, prefix)
+
+    cached = _loose_cache.get(key)
+    if cached is not None:
+        stamps, found = cached
+        if all(stat_stamp(path) == stamp for path, stamp in stamps):
+            return found
+
+    now = time.time()
+    stamps, found = [], {}
+    _walk_loose(os.path.join(base, top), top, prefix, stamps, found)
+    if not is_racy([stamp for _, stamp in stamps], now):
+        _loose_cache[key] = (stamps, found)
+    return found
+
+
+def _read_refs(git_dir, prefix):
+    refs = dict((ref.name, ref) for ref in packed_refs(git_dir, prefix))
+    for name, content in loose_refs(git_dir, prefix).items():
+        refs[name] = Ref(name, content, None)
+    return refs
+
+
+def resolve(refs, git_dir, name, depth=5):
+    """ The object a (possibly symbolic) ref points to, looking up
+        targets outside of refs if needed. None if it is dangling.
+    """
+    ref = refs.get(name) or _read_refs(git_dir, name).get(name)
+    if ref is None:
+        return None
+    if ref.object.startswith('ref: '):
+        return resolve(refs, git_dir, ref.object[5:], depth - 1) if depth else None
+    return ref.object
+
+
+def list_refs(prefix='refs/', repo=None):
+    """ All refs starting with prefix, sorted by name (like git does).
+        Loose refs take precedence over packed ones, symbolic refs are
+        resolved to the object of their target.
+    """
+    repo = local_repo(repo)
+    refs = _read_refs(repo.git_dir, prefix)
+    result = []
+    for name in sorted(refs, key=_encode):
+        ref = refs[name]
+        if ref.object.startswith('ref: '):
+            ref = ref._replace(object=resolve(refs, repo.git_dir, name))
+        result.append(ref)
+    return result
+
+
+def reflog_time(git_dir, refname):
+    """ When a ref was last updated (the mtime of its reflog), 0 if unknown.
+
+        >>> reflog_time('/_not_/_there_', 'refs/heads/master')
+        0
+    """
+    try:
+        return os.stat(os.path.join(common_dir(git_dir), 'logs', refname)).st_mtime
+    except OSError:
+        return 0
+
+
+def ref_names(namespace, prefix='', repo=None):
+    """ The (short) names of the refs in a namespace (i.e. 'refs/tags/'),
+        that start with prefix.
+    """
+    return [ref.name[len(namespace):] for ref in list_refs(namespace + prefix, repo=repo)]
+
+
+def local_tags(prefix='', repo=None):
+    """ The names of the local tags starting with prefix. """
+    return ref_names('refs/tags/', prefix, repo=repo)
+
+
+def local_branches(prefix='', repo=None):
+    """ The names of the local branches starting with prefix.
+
+        >>> 'master' in local_branches() or not local_branches('master')
+        True
+    """
+    return ref_names('refs/heads/', prefix, repo=repo)
@@ -1,14 +1,83 @@
-from .common import local_git_command
+from flowtool.execute import run_command
+
+from .common import local_repo, GitCommandError
+from . import refs
+
+# tags per `git update-ref --stdin` transaction (and packed-refs rewrite)
+LOCAL_CHUNK_SIZE = 2000
+# tags per `git push --delete` (one command line and remote request)
+REMOTE_CHUNK_SIZE = 200
+
+
+def chunked(items, size):
+    """ Split a list of items into lists of at most size items.
+
+        >>> chunked(list('abcde'), 2)
+        [['a', 'b'], ['c', 'd'], ['e']]
+        >>> chunked(list('abc'), None)
+        [['a', 'b', 'c']]
+    """
+    items = list(items)
+    if not size:
+        return [items] if items else []
+    return [items[idx:idx + size] for idx in range(0, len(items), size)]
+
+
+def git_command(repo, *args, **kwd):
+    """ Run a git command on repo (with run_command), raise
+        a GitCommandError if it fails, else return the result.
+    """
+    command = ['git', '--git-dir', repo.git_dir] + list(args)
+    result = run_command(command, **kwd)
+    if result.returncode:
+        raise GitCommandError(command, result.returncode, result.stderr)
+    return result
+
 
 def local_tags(prefix='', path=None):
     """ Retrieve the tag names from the local repo.
         The selection can be filtered using a prefix.
+        The refs are read directly (see flowtool_git.refs).
+    """
+    return refs.local_tags(prefix, repo=path)
+
+def delete_local_tags(tags=(), path=None, chunk_size=LOCAL_CHUNK_SIZE, atomic=False):
+    """ Delete a list of git tags from the local repository path.
+
+        The tags are fed to `git update-ref --stdin` (so there is no limit
+        on their number), each chunk of chunk_size tags in one transaction,
+        which rewrites packed-refs only once. With atomic, all tags are
+        deleted in one transaction, or none at all. Returns the number of
+        tags deleted (tags that do not exist count as deleted).
+
+        >>> delete_local_tags([])
+        0
     """
-    tags = local_git_command(path=path).tag().split()
-    return [t for t in tags if t.startswith(prefix)]
+    repo = local_repo(path)
+    if atomic:
+        chunk_size = None
+
+    deleted = 0
+    for chunk in chunked(tags, chunk_size):
+        script = ''.join('delete refs/tags/%s\n' % tag for tag in chunk)
+        git_command(repo, 'update-ref', '--stdin', input=script)
+        deleted += len(chunk)
+    return deleted
 
-def delete_local_tags(tags=(), path=None):
-    """ Delete a list of git tags from the local repository path. """
-    cmd_args = ['--delete'] + list(tags)
-    return local_git_command(path=path).tag(*cmd_args)
+def delete_remote_tags(tags=(), remote='origin', path=None, chunk_size=REMOTE_CHUNK_SIZE, atomic=False):
+    """ Delete a list of git tags from a remote, chunk_size tags per
+        `git push --delete`. With atomic, each push is atomic (as far
+        as the remote supports it). Returns the number of tags deleted.
+
+        >>> delete_remote_tags([], remote='_not_there_')
+        0
+    """
+    repo = local_repo(path)
+    options = ['--atomic'] if atomic else []
 
+    deleted = 0
+    for chunk in chunked(tags, chunk_size):
+        refspecs = ['refs/tags/%s' % tag for tag in chunk]
+        git_command(repo, 'push', '--quiet', *options + [remote, '--delete'] + refspecs)
+        deleted += len(chunk)
+    return deleted
@@ -43,3 +43,15 @@ def test_short_status(fresh_repo):
     fresh_repo.git.add('dirty_file.txt')
 
     assert common.short_status(path=fresh_repo)
+
+
+def test_find_git_repos(fresh_repo, nogit):
+
+    repo_root = dirname(fresh_repo.git_dir)
+    assert common.find_git_repos(repo_root) == [repo_root]
+    assert common.find_git_repos(nogit) == []
+
+    nested = os.path.join(repo_root, 'sub', 'nested')
+    os.makedirs(os.path.join(nested, '.git'))
+    assert common.find_git_repos(repo_root) == [repo_root]
+    assert common.find_git_repos(os.path.join(repo_root, 'sub')) == [nested]
@@ -0,0 +1,36 @@
+import os
+
+from flowtool_git import objects
+
+
+def write(repo, name, content):
+    filename = os.path.join(os.path.dirname(repo.git_dir), name)
+    with open(filename, 'w') as fh:
+        fh.write(content)
+
+
+def test_changed_blobs(fresh_repo):
+    write(fresh_repo, 'initial_file', 'changed')
+    write(fresh_repo, 'with space', 'x' * 100)
+    fresh_repo.git.add('.')
+    write(fresh_repo, 'initial_file', 'changed again, but not staged')
+
+    blobs = objects.changed_blobs(repo=fresh_repo)
+    assert sorted(b.path for b in blobs) == ['initial_file', 'with space']
+
+    infos = list(objects.batch_check((b.object for b in blobs), repo=fresh_repo))
+    sizes = dict((b.path, i.size) for b, i in zip(blobs, infos))
+    assert sizes == {'initial_file': len('changed'), 'with space': 100}
+
+
+def test_batch_check_rest(fresh_repo):
+    lines = ['HEAD first', 'HEAD:initial_file second one', 'deadbeef']
+    infos = list(objects.batch_check(lines, repo=fresh_repo))
+    assert [i.type for i in infos] == ['commit', 'blob', 'missing']
+    assert [i.rest for i in infos] == ['first', 'second one', '']
+
+
+def test_batch_check_many(fresh_repo):
+    count = 20000
+    infos = objects.batch_check(('HEAD' for _ in range(count)), repo=fresh_repo)
+    assert sum(1 for i in infos if i.type == 'commit') == count
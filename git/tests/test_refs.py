@@ -0,0 +1,83 @@
+import os
+import time
+import pytest
+
+from flowtool_git import refs
+
+from itertools import product
+
+
+@pytest.fixture
+def packed_repo(fresh_repo):
+    for pref, suff in product(['a/', 'b/', 'c/'], ['12', '34', '56']):
+        fresh_repo.git.tag(pref + suff)
+    fresh_repo.git.tag('-a', '-m', 'Annotated.', 'annotated')
+    fresh_repo.git.pack_refs('--all')
+    return fresh_repo
+
+
+def test_packed_and_loose(packed_repo):
+    assert refs.local_tags(repo=packed_repo) == packed_repo.git.tag().split()
+    assert refs.local_tags('b/', repo=packed_repo) == ['b/12', 'b/34', 'b/56']
+    assert refs.local_tags('a/3', repo=packed_repo) == ['a/34']
+    assert refs.local_tags('d', repo=packed_repo) == []
+
+    packed_repo.git.tag('b/40')
+    packed_repo.git.branch('b/40')
+    assert refs.local_tags('b/', repo=packed_repo) == ['b/12', 'b/34', 'b/40', 'b/56']
+    assert refs.local_branches(repo=packed_repo) == ['b/40', 'master']
+
+
+def test_peeled_and_symbolic(packed_repo):
+    head = packed_repo.head.commit.hexsha
+    annotated, = refs.list_refs('refs/tags/annotated', repo=packed_repo)
+    assert annotated.object != head
+    assert annotated.peeled == head
+
+    packed_repo.git.symbolic_ref('refs/heads/alias', 'refs/heads/master')
+    alias, = refs.list_refs('refs/heads/alias', repo=packed_repo)
+    assert alias.object == head
+
+
+def test_cache_invalidation(packed_repo, monkeypatch):
+    monkeypatch.setattr(refs, 'RACY_SECONDS', 0)
+    assert 'x' not in refs.local_tags(repo=packed_repo)
+    packed_repo.git.tag('x')
+    assert 'x' in refs.local_tags(repo=packed_repo)
+    packed_repo.git.pack_refs('--all')
+    packed_repo.git.tag('-d', 'x')
+    assert 'x' not in refs.local_tags(repo=packed_repo)
+
+
+def test_unsorted_packed_refs(fresh_repo):
+    sha = fresh_repo.head.commit.hexsha
+    with open(os.path.join(fresh_repo.git_dir, 'packed-refs'), 'w') as fh:
+        fh.write('%s refs/tags/z\n%s refs/tags/a\n' % (sha, sha))
+    assert refs.local_tags(repo=fresh_repo) == ['a', 'z']
+
+
+def test_many_packed_tags(fresh_repo):
+    sha = fresh_repo.head.commit.hexsha
+    lines = ['# pack-refs with: peeled fully-peeled sorted ']
+    lines.extend(sorted(
+        '%s refs/tags/%s/%05d' % (sha, p, i) for p in ('release', 'snapshot') for i in range(25000)
+    ))
+    filename = os.path.join(fresh_repo.git_dir, 'packed-refs')
+    with open(filename, 'w') as fh:
+        fh.write('\n'.join(lines) + '\n')
+
+    start = time.time()
+    found = refs.local_tags('release/001', repo=fresh_repo)
+    assert time.time() - start < 0.1
+    assert found == ['release/%05d' % i for i in range(100, 200)]
+    assert len(refs.local_tags('snapshot/', repo=fresh_repo)) == 25000
+
+
+def test_without_scandir(packed_repo, monkeypatch):
+    packed_repo.git.branch('loose')
+    monkeypatch.setattr(refs, '_loose_cache', {})
+    expected = refs.list_refs('refs/', repo=packed_repo)
+    monkeypatch.setattr(refs, '_loose_cache', {})
+    monkeypatch.delattr(os, 'scandir')
+    assert refs.list_refs('refs/', repo=packed_repo) == expected
+    assert refs.local_branches(repo=packed_repo) == ['loose', 'master']
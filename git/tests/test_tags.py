@@ -1,6 +1,8 @@
 import os
 import pytest
 
+from git import Repo
+
 from flowtool_git import tags
 
 from itertools import product
@@ -32,3 +34,45 @@ def test_delete_local_tags(tagged_repo):
 
     taglist = tags.local_tags(path=tagged_repo)
     assert len(taglist) == 2*3
+
+
+def test_delete_many_local_tags(tagged_repo):
+    sha = tagged_repo.head.commit.hexsha
+    for idx in range(1500):
+        # written directly, 1500 `git tag` runs would be slow
+        with open(os.path.join(tagged_repo.git_dir, 'refs', 'tags', 'bulk-%04d' % idx), 'w') as fh:
+            fh.write(sha + '\n')
+    tagged_repo.git.pack_refs('--all')
+
+    bulk = tags.local_tags('bulk-', path=tagged_repo)
+    assert len(bulk) == 1500
+    assert tags.delete_local_tags(bulk, path=tagged_repo, chunk_size=400) == 1500
+    assert tags.local_tags('bulk-', path=tagged_repo) == []
+    assert len(tags.local_tags(path=tagged_repo)) == 3 * 3
+
+
+def test_delete_local_tags_atomic(tagged_repo):
+    with pytest.raises(tags.GitCommandError):
+        tags.delete_local_tags(['a/12', 'a/34', 'in valid'], path=tagged_repo, atomic=True)
+    assert len(tags.local_tags(path=tagged_repo)) == 3 * 3
+
+    with pytest.raises(tags.GitCommandError):
+        tags.delete_local_tags(['a/12', 'a/34', 'in valid'], path=tagged_repo, chunk_size=2)
+    assert len(tags.local_tags(path=tagged_repo)) == 3 * 3 - 2
+
+
+def test_delete_remote_tags(tagged_repo, nogit):
+    remote = Repo.init(nogit, bare=True)
+    tagged_repo.git.remote('add', 'mirror', remote.git_dir)
+    tagged_repo.git.push('mirror', '--tags')
+    assert len(tags.local_tags(path=remote)) == 3 * 3
+
+    deleted = tags.delete_remote_tags(
+        ['a/12', 'b/34', 'c/56'], remote='mirror', path=tagged_repo, chunk_size=2,
+    )
+    assert deleted == 3
+    assert len(tags.local_tags(path=remote)) == 2 * 3
+    assert len(tags.local_tags(path=tagged_repo)) == 3 * 3
+
+    with pytest.raises(tags.GitCommandError):
+        tags.delete_remote_tags(['a/34'], remote='_not_there_', path=tagged_repo)
@@ -1,10 +1,21 @@
 """ Basic things to enable swift gitting. """
 import click
+from git import Head
+from operator import attrgetter
+from collections import namedtuple
+from flowtool.ui import abort
 from flowtool.style import echo, colors
+from flowtool.python import FuzzyMatcher
 from flowtool_git.common import local_repo
+from flowtool_git.refs import list_refs, local_branches, reflog_time
+from flowtool_gitflow.worktrees import acquire_worktree
 
 # from flowtool.style import debug
 
+Branch = namedtuple('Branch', ['name', 'ref', 'remote', 'updated'])
+
+BRANCH_NAMESPACES = ('refs/heads/', 'refs/remotes/')
+
 
 def checkout(branch, repo=None):
     """ Check out a branch and give an appropriate message.
@@ -23,38 +34,118 @@ def checkout(branch, repo=None):
         branch.checkout()
 
 
+def branch_index(repo=None, remotes=False):
+    """ The branches of a repo (and the remote tracking branches, if
+        requested), with the time of their last update (from the reflog).
+        The refs are read (and cached) by flowtool_git.refs.
+
+        >>> any(b.name == 'master' for b in branch_index()) or not branch_index()
+        True
+    """
+    repo = local_repo(repo)
+    index = []
+    for namespace in BRANCH_NAMESPACES[:2 if remotes else 1]:
+        remote = namespace == 'refs/remotes/'
+        for ref in list_refs(namespace, repo=repo):
+            name = ref.name[len(namespace):]
+            if remote and name.endswith('/HEAD'):
+                continue
+            index.append(Branch(name, ref.name, remote, reflog_time(repo.git_dir, ref.name)))
+    return index
+
+
+def find_branches(pattern, branches):
+    """ The branches matching pattern (fuzzily, see FuzzyMatcher), best
+        first. Equally good matches are ordered by their last update
+        (most recent first), then by length.
+
+        >>> branches = [Branch('feature/x', '', False, 1), Branch('fix/x', '', False, 2)]
+        >>> [b.name for b in find_branches('x', branches)]
+        ['fix/x', 'feature/x']
+    """
+    return FuzzyMatcher(pattern).rank(
+        branches,
+        key=attrgetter('name'),
+        tiebreak=lambda branch: (-branch.updated, len(branch.name)),
+    )
+
+
+def checkout_found(branch, repo):
+    """ Check out a found branch. For a remote tracking branch, the
+        local branch of the same name, which is created if needed.
+    """
+    if not branch.remote:
+        return checkout(Head(repo, branch.ref), repo)
+
+    local = branch.name.split('/', 1)[-1]
+    if local in local_branches(local, repo=repo):
+        return checkout(Head(repo, 'refs/heads/' + local), repo)
+    echo.green('Tracking %r as %r.' % (branch.name, local))
+    repo.git.checkout('--track', branch.name)
+
+
+def worktree_found(branch, repo):
+    """ Get a worktree (see flowtool_gitflow.worktrees) for a found
+        branch, instead of checking it out. Returns its path.
+    """
+    if not branch.remote:
+        return acquire_worktree(branch.name, repo=repo)
+
+    local = branch.name.split('/', 1)[-1]
+    if local not in local_branches(local, repo=repo):
+        echo.green('Tracking %r as %r.' % (branch.name, local), err=True)
+        repo.git.branch('--track', local, branch.name)
+    return acquire_worktree(local, repo=repo)
+
+
+def echo_branches(branches, heading):
+    echo.bold(heading + '\n')
+    for idx, branch in enumerate(branches):
+        name = colors.cyan(branch.name) if branch.remote else branch.name
+        echo.white(' {i:-4d} - {name}'.format(name=name, i=idx+1))
+
+
 @click.command()
 @click.option('-g', '--git', type=click.Path(exists=True), default=None, help='Specify the git repo to operate on (defaults to current directory).')
 @click.option('-n', '--noop', is_flag=True, help='Do not do anything. Mainly for testing purposes.')
+@click.option('-r', '--remotes', is_flag=True, help='Also match remote tracking branches.')
+@click.option('-l', '--list', 'show', is_flag=True, help='List the best matches instead of checking one out.')
+@click.option('-k', '--top', type=int, default=10, help='How many matches to list (default: 10).')
+@click.option('-p', '--pick', type=int, default=None, help='Check out the n-th best match (as listed).')
+@click.option('-w', '--worktree', is_flag=True, help='Print the path of a worktree with the branch, instead of checking it out.')
 @click.argument('pattern', default='')
-def checkout_branch(pattern='', git=None, noop=None):
-    """ Check out branches via substrings. """
+def checkout_branch(pattern='', git=None, noop=None, remotes=None, show=None, top=10, pick=None, worktree=None):
+    """ Check out branches via (fuzzy) substrings.
+
+        The characters of the pattern have to appear in the branch name in
+        order. The best match is checked out, recently updated branches
+        win ties. Without a pattern, the recent branches are listed.
+
+        With --worktree, the branch is not checked out here, but in a
+        worktree of the pool (see the wt command), and its path printed
+        (as the only output on stdout).
+    """
 
     repo = local_repo(git)
-    possible = [b for b in repo.branches if pattern in b.name]
+    branches = branch_index(repo, remotes=remotes)
+    possible = find_branches(pattern, branches)
 
     if not possible:
         echo.red('No branch in your current repo matches %r.' % pattern)
-        echo.white('Branches in this repo:', [b.name for b in repo.branches])
+        echo_branches(find_branches('', branches)[:top], 'Recent branches in this repo:')
 
-    elif len(possible) == 1:
-        branch = possible.pop()
-        noop or checkout(branch, repo)
+    elif show or not pattern and pick is None:
+        echo_branches(possible[:top], '%s branches match, the best are:' % len(possible))
 
     else:
-        echo.bold('Multiple branch names match:\n')
-        for idx, branch in enumerate(possible):
-            echo.white(' {i:-4d} - {b.name}'.format(b=branch, i=idx+1))
-
-        echo.blue()
-        answer = click.prompt(
-            'Where do you want to go today?',
-            prompt_suffix=' ', type=int,
-        )
-        while not 0 < answer <= len(possible):
-            echo.white('Choice out of range: %s' % answer)
-            answer = noop or click.prompt(
-                'Check out which branch [1-%s]?' % len(possible),
-                prompt_suffix=' ', type=int,
-            )
-        noop or checkout(possible[answer-1], repo)
+        choice = 1 if pick is None else pick
+        if not 0 < choice <= len(possible):
+            abort('Choice out of range: %s (of %s matches).' % (choice, len(possible)))
+        if pick is None and len(possible) > 1:
+            echo.white('Best of %s matches (see --list).' % len(possible), err=bool(worktree))
+        if noop:
+            return
+        elif worktree:
+            echo.white(worktree_found(possible[choice-1], repo))
+        else:
+            checkout_found(possible[choice-1], repo)
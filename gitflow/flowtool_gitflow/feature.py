@@ -1,30 +1,65 @@
 # -*- coding: utf-8 -*-
 """ Work efficiently with feature branches. """
 
-import re
 import sys
 import click
 from flowtool.style import colors, echo
 from flowtool.ui import abort
+from git import Head
 from flowtool_git.common import local_repo
+from flowtool_git.refs import local_branches
+from flowtool_gitflow.basic import checkout
+from flowtool_gitflow.issues import issue_index, branches_for
+from flowtool_gitflow.issues import jira_issue_regex  # noqa: F401 (it used to live here)
 
 def is_feature(name):
     return name.startswith('feature/')
 
-jira_issue_regex = re.compile(r'#?(?P<id>[A-Z]+-[0-9]+)')
 # ticket = '-'.join(branch[8:].split('-')[:2])
 
 @click.command()
-def main():
+@click.option('-g', '--git', type=click.Path(exists=True), default=None, help='Specify the git repo to operate on (defaults to current directory).')
+def main(git=None):
     """ Handle feature branches. """
-    repo = local_repo()
-    branches = [b.name for b in repo.branches]
+    repo = local_repo(git)
+    branches = local_branches(repo=repo)
     echo.white('Local branches:', branches)
-    for b in branches:
-        match = jira_issue_regex.search(b)
-        if match:
-            issue = match.group()
-            echo.white('  -', colors.cyan(issue), '=', colors.cyan(b))
+    for key, entries in sorted(issue_index(repo)['issues'].items()):
+        for name, _ in entries:
+            echo.white('  -', colors.cyan(key), '=', colors.cyan(name))
+
+
+@click.command()
+@click.option('-g', '--git', type=click.Path(exists=True), default=None, help='Specify the git repo to operate on (defaults to current directory).')
+@click.option('-l', '--list', 'show', is_flag=True, help='Only list the branches, do not check one out.')
+@click.argument('keys', nargs=-1)
+def issue(keys=(), git=None, show=None):
+    """ Find the branches of issues (by key, i.e. ABC-123).
+
+        If there is one branch for one key, it is checked out. Any number
+        of keys can be given (or read from stdin, with the key '-').
+    """
+    if '-' in keys:
+        keys = [k for k in keys if k != '-'] + click.get_text_stream('stdin').read().split()
+    keys = [key.lstrip('#').upper() for key in keys]
+    if not keys:
+        abort('Please give an issue key.')
+
+    repo = local_repo(git)
+    found = branches_for(keys, repo=repo)
+
+    if len(keys) == 1 and not show:
+        key = keys[0]
+        if not found[key]:
+            abort('No branch for issue %s.' % key)
+        elif len(found[key]) == 1:
+            return checkout(Head(repo, 'refs/heads/' + found[key][0].name), repo)
+
+    for key in keys:
+        if not found[key]:
+            echo.yellow(key, '-')
+        for branch in found[key]:
+            echo.white(colors.cyan(key), branch.name, colors.bold(branch.object[:8]))
 
 
 @click.command()
@@ -0,0 +1,131 @@
+""" An index from issue keys (like ABC-123) to the branches working on them.
+
+    The index is kept in a JSON file in the git directory, together with
+    the refs (and their objects) it was built from. On every use, only
+    the branches that were added, moved or deleted since are looked at,
+    so even with thousands of branches a lookup costs about as much as
+    reading the refs (see flowtool_git.refs) and the index file.
+
+    >>> issue_keys('feature/#ABC-123-fix-XY-9')
+    ['ABC-123', 'XY-9']
+    >>> issue_keys('develop')
+    []
+"""
+import os
+import re
+import json
+
+from collections import namedtuple
+
+from flowtool_git.common import local_repo
+from flowtool_git.refs import common_dir, list_refs
+
+IssueBranch = namedtuple('IssueBranch', ['name', 'object'])
+
+jira_issue_regex = re.compile(r'#?(?P<id>[A-Z]+-[0-9]+)')
+
+INDEX_FILE = 'flowtool-issues.json'
+INDEX_VERSION = 1
+BRANCHES = 'refs/heads/'
+
+
+def issue_keys(name):
+    """ The issue keys in a branch name (in order, without duplicates). """
+    keys = []
+    for match in jira_issue_regex.finditer(name):
+        if match.group('id') not in keys:
+            keys.append(match.group('id'))
+    return keys
+
+
+def index_file(repo=None):
+    repo = local_repo(repo)
+    return os.path.join(common_dir(repo.git_dir), INDEX_FILE)
+
+
+def empty_index():
+    return dict(version=INDEX_VERSION, refs={}, issues={})
+
+
+def load_index(repo=None):
+    """ The stored index (an empty one, if there is none or it is unusable). """
+    try:
+        with open(index_file(repo)) as fh:
+            index = json.load(fh)
+    except (IOError, OSError, ValueError):
+        return empty_index()
+    if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+        return empty_index()
+    return index
+
+
+def save_index(index, repo=None):
+    """ Store the index (replacing the old one in one step). """
+    filename = index_file(repo)
+    temporary = '%s.%s.tmp' % (filename, os.getpid())
+    with open(temporary, 'w') as fh:
+        json.dump(index, fh, sort_keys=True)
+    os.rename(temporary, filename)
+
+
+def update_index(index, refs):
+    """ Bring an index up to date with refs (a dict from refname to object),
+        touching only the refs that changed. Returns if anything changed.
+
+        >>> index = empty_index()
+        >>> update_index(index, {'refs/heads/ABC-1-x': 'a1', 'refs/heads/y': 'b2'})
+        True
+        >>> index['issues']
+        {'ABC-1': [['ABC-1-x', 'a1']]}
+        >>> update_index(index, {'refs/heads/ABC-1-x': 'a1', 'refs/heads/y': 'b2'})
+        False
+        >>> update_index(index, {'refs/heads/ABC-1-x': 'c3'}), index['issues']
+        (True, {'ABC-1': [['ABC-1-x', 'c3']]})
+        >>> update_index(index, {}), index['issues']
+        (True, {})
+    """
+    known = index['refs']
+    issues = index['issues']
+    changed = [ref for ref, obj in refs.items() if known.get(ref) != obj]
+    removed = [ref for ref in known if ref not in refs]
+
+    for ref in removed + changed:
+        name = ref[len(BRANCHES):]
+        for key in issue_keys(name):
+            entries = [e for e in issues.get(key, ()) if e[0] != name]
+            if entries:
+                issues[key] = entries
+            else:
+                issues.pop(key, None)
+        known.pop(ref, None)
+
+    for ref in changed:
+        name = ref[len(BRANCHES):]
+        for key in issue_keys(name):
+            issues.setdefault(key, []).append([name, refs[ref]])
+            issues[key].sort()
+        known[ref] = refs[ref]
+
+    return bool(changed or removed)
+
+
+def issue_index(repo=None):
+    """ The up to date index (it is refreshed and saved if needed). """
+    repo = local_repo(repo)
+    index = load_index(repo)
+    refs = dict((ref.name, ref.object) for ref in list_refs(BRANCHES, repo=repo))
+    if update_index(index, refs):
+        save_index(index, repo)
+    return index
+
+
+def branches_for(keys, repo=None):
+    """ The branches working on each of the issue keys, as a dict from
+        key to a list of IssueBranch (empty for unknown keys). One index
+        lookup serves any number of keys.
+    """
+    issues = issue_index(repo)['issues']
+    return dict(
+        (key, [IssueBranch(*entry) for entry in issues.get(key, ())])
+        for key in keys
+    )
@@ -0,0 +1,234 @@
+""" A pool of git worktrees, for switching branches by changing directory.
+
+    Checking out another branch rewrites every file that differs, which
+    on a large tree takes a while and throws away build caches. Instead,
+    the recently used branches are kept checked out in worktrees (slots)
+    below `.git/flowtool-worktrees/`. Switching to one of them means just
+    changing the directory. For a branch that is not in the pool, the
+    least recently used clean slot is switched over (the checkout is
+    incremental there, and its build caches stay warm), or a new slot is
+    added while the pool is not full. Slots with local changes are never
+    reused or removed. When the slots were last used is kept in a JSON
+    file in the pool dir, and worktrees whose directory is gone are
+    pruned on the way.
+
+    >>> parse_worktrees('worktree /r\\nHEAD 1a2b\\nbranch refs/heads/master\\n\\nworktree /w\\nHEAD 3c4d\\ndetached\\nprunable gitdir file points to non-existent location\\n')
+    [Worktree(path='/r', head='1a2b', branch='master', prunable=False), Worktree(path='/w', head='3c4d', branch=None, prunable=True)]
+"""
+import os
+import json
+import time
+import click
+
+from git import Git
+from collections import namedtuple
+from flowtool.ui import abort
+from flowtool.style import echo, colors
+from flowtool_git.common import local_repo, GitCommandError
+from flowtool_git.refs import common_dir
+
+Worktree = namedtuple('Worktree', ['path', 'head', 'branch', 'prunable'])
+
+POOL_DIR = 'flowtool-worktrees'
+POOL_SIZE = 4
+SLOT_PREFIX = 'slot-'
+USAGE_FILE = 'usage.json'
+
+
+def parse_worktrees(output):
+    """ Parse the output of `git worktree list --porcelain`. """
+    result = []
+    for block in output.strip().split('\n\n'):
+        if not block:
+            continue
+        info = dict(line.partition(' ')[::2] for line in block.splitlines())
+        branch = info.get('branch')
+        if branch and branch.startswith('refs/heads/'):
+            branch = branch[len('refs/heads/'):]
+        result.append(Worktree(info['worktree'], info.get('HEAD'), branch, 'prunable' in info))
+    return result
+
+
+def list_worktrees(repo=None):
+    """ All worktrees of the repo, the main worktree first. """
+    repo = local_repo(repo)
+    return parse_worktrees(repo.git.worktree('list', '--porcelain'))
+
+
+def pool_dir(repo=None):
+    repo = local_repo(repo)
+    return os.path.join(common_dir(repo.git_dir), POOL_DIR)
+
+
+def is_stale(worktree):
+    """ If a worktree is gone (git only tells so since version 2.31). """
+    return worktree.prunable or not os.path.isdir(worktree.path)
+
+
+def in_pool(worktree, repo=None):
+    base = os.path.realpath(pool_dir(repo))
+    return os.path.dirname(os.path.realpath(worktree.path)) == base
+
+
+def load_usage(repo=None):
+    """ When the slots were last used, as a dict from their
+        names to times (empty, if it is not known).
+    """
+    try:
+        with open(os.path.join(pool_dir(repo), USAGE_FILE)) as fh:
+            usage = json.load(fh)
+    except (IOError, OSError, ValueError):
+        return {}
+    return usage if isinstance(usage, dict) else {}
+
+
+def save_usage(usage, repo=None):
+    """ Store the usage times of the slots that still exist
+        (replacing the old file in one step).
+    """
+    base = pool_dir(repo)
+    usage = dict((name, used) for name, used in usage.items() if os.path.isdir(os.path.join(base, name)))
+    filename = os.path.join(base, USAGE_FILE)
+    temporary = '%s.%s.tmp' % (filename, os.getpid())
+    with open(temporary, 'w') as fh:
+        json.dump(usage, fh, sort_keys=True)
+    os.rename(temporary, filename)
+
+
+def mark_used(path, repo=None):
+    usage = load_usage(repo)
+    usage[os.path.basename(path)] = time.time()
+    save_usage(usage, repo)
+
+
+def pool_slots(repo=None, worktrees=None):
+    """ The worktrees of the pool, least recently used first. """
+    if worktrees is None:
+        worktrees = list_worktrees(repo)
+    usage = load_usage(repo)
+    slots = [w for w in worktrees if not is_stale(w) and in_pool(w, repo)]
+    return sorted(slots, key=lambda w: usage.get(os.path.basename(w.path), 0))
+
+
+def is_clean(path):
+    """ If a worktree has no changes to tracked files (untracked
+        files, like build results, do not count).
+    """
+    return not Git(path).status('--porcelain', '--untracked-files=no').strip()
+
+
+def prune_stale(repo=None, worktrees=None):
+    """ Let git forget the worktrees whose directory is gone, if there
+        are any. Returns the (remaining) worktrees.
+    """
+    repo = local_repo(repo)
+    if worktrees is None:
+        worktrees = list_worktrees(repo)
+    if any(is_stale(w) for w in worktrees):
+        repo.git.worktree('prune')
+        worktrees = list_worktrees(repo)
+    return worktrees
+
+
+def new_slot_path(repo=None, worktrees=()):
+    """ A free slot path, neither existing nor known to git
+        (a locked stale worktree can not be pruned).
+    """
+    base = pool_dir(repo)
+    taken = set(os.listdir(base)) if os.path.isdir(base) else set()
+    taken.update(os.path.basename(w.path) for w in worktrees if in_pool(w, repo))
+    number = 1
+    while SLOT_PREFIX + str(number) in taken:
+        number += 1
+    return os.path.join(base, SLOT_PREFIX + str(number))
+
+
+def prune_pool(repo=None, size=POOL_SIZE):
+    """ Forget stale worktrees (whose directory is gone), and remove the
+        least recently used clean slots, that exceed the pool size.
+        Returns the paths of the removed slots.
+    """
+    repo = local_repo(repo)
+    repo.git.worktree('prune')
+    slots = pool_slots(repo)
+    removed = []
+    for slot in slots[:max(0, len(slots) - size)]:
+        if is_clean(slot.path):
+            repo.git.worktree('remove', slot.path)
+            removed.append(slot.path)
+    if os.path.isdir(pool_dir(repo)):
+        save_usage(load_usage(repo), repo)
+    return removed
+
+
+def acquire_worktree(branch, repo=None, size=POOL_SIZE):
+    """ The path of a worktree with branch checked out. That may be the
+        main worktree, or any other one, that has it checked out already.
+        Else a slot of the pool is switched over to the branch, or added.
+    """
+    repo = local_repo(repo)
+    worktrees = prune_stale(repo)
+    for worktree in worktrees:
+        if worktree.branch == branch and not is_stale(worktree):
+            if in_pool(worktree, repo):
+                mark_used(worktree.path, repo)
+            return worktree.path
+
+    slots = pool_slots(repo, worktrees)
+    if len(slots) >= size:
+        for slot in slots:
+            if is_clean(slot.path):
+                Git(slot.path).checkout(branch)
+                mark_used(slot.path, repo)
+                return slot.path
+
+    path = new_slot_path(repo, worktrees)
+    repo.git.worktree('add', path, branch)
+    mark_used(path, repo)
+    if len(slots) >= size:
+        echo.yellow('All %s slots of the pool have changes, added one more.' % len(slots), err=True)
+    return path
+
+
+@click.command()
+@click.option('-g', '--git', type=click.Path(exists=True), default=None, help='Specify the git repo to operate on (defaults to current directory).')
+@click.option('-s', '--size', type=int, default=POOL_SIZE, help='How many worktrees to keep (default: %s).' % POOL_SIZE)
+@click.option('-e', '--export', is_flag=True, help='Print a cd command (for eval).')
+@click.option('-l', '--list', 'show', is_flag=True, help='List the worktrees of the pool.')
+@click.option('-p', '--prune', is_flag=True, help='Remove stale and surplus worktrees.')
+@click.argument('branch', default='')
+def worktree(branch='', git=None, size=POOL_SIZE, export=None, show=None, prune=None):
+    """ Print the path of a worktree with branch checked out.
+
+        The recently used branches are kept checked out in a pool of
+        worktrees, so switching to them is just changing the directory:
+
+            eval "$(flowtool wt --export some-branch)"
+
+        Only the path (or the cd command) is written to stdout,
+        all messages go to stderr.
+    """
+    repo = local_repo(git)
+
+    if prune:
+        for path in prune_pool(repo, size=size):
+            echo.white('Removed', path, err=True)
+
+    if show:
+        for slot in reversed(pool_slots(repo)):
+            echo.white(colors.cyan(slot.branch or slot.head[:8]), slot.path, err=bool(export))
+
+    if not branch:
+        if not (prune or show):
+            abort('Please give a branch name.')
+        return
+
+    try:
+        path = acquire_worktree(branch, repo=repo, size=size)
+    except GitCommandError as ex:
+        abort('Could not check out %r in a worktree: %s' % (branch, ex.stderr.strip()))
+
+    if export:
+        echo.white("cd '%s'" % path.replace("'", "'\\''"))
+    else:
+        echo.white(path)
@@ -88,6 +88,8 @@ setup_args.update(
             'co = flowtool_gitflow.basic:checkout_branch',
             'feature = flowtool_gitflow.feature:main',
             'ci = flowtool_gitflow.feature:commit',
+            'issue = flowtool_gitflow.feature:issue',
+            'wt = flowtool_gitflow.worktrees:worktree',
         ],
     },
 )
@@ -1,7 +1,9 @@
+import os
 import pytest
+from git import Repo
 from click.testing import CliRunner
 
-from flowtool_gitflow.basic import checkout_branch
+from flowtool_gitflow.basic import checkout_branch, find_branches, Branch
 
 runner = CliRunner()
 
@@ -51,3 +53,58 @@ def test_checkout(branched_repo):
 
     assert result.exit_code == 0
     assert branched_repo.active_branch.name == 'master'
+
+
+def test_ranked_checkout(branched_repo, nogit):
+    branched_repo.git.checkout('master')
+
+    result = runner.invoke(
+        checkout_branch,
+        ['--git', branched_repo.git_dir, '--list', 'ff'],
+    )
+    assert result.exit_code == 0
+    assert '2 branches match' in result.output
+    assert 'feature/feature_one' in result.output
+    assert branched_repo.active_branch.name == 'master'
+
+    result = runner.invoke(
+        checkout_branch,
+        ['--git', branched_repo.git_dir, 'rel1'],
+    )
+    assert result.exit_code == 0
+    assert branched_repo.active_branch.name == 'release/1.0'
+
+    result = runner.invoke(
+        checkout_branch,
+        ['--git', branched_repo.git_dir, '--pick', '9', 'ff'],
+    )
+    assert result.exit_code == 1
+    assert 'Choice out of range' in result.output
+
+    result = runner.invoke(
+        checkout_branch,
+        ['--git', branched_repo.git_dir, '--pick', '0', 'ff'],
+    )
+    assert result.exit_code == 1
+    assert 'Choice out of range: 0' in result.output
+    assert branched_repo.active_branch.name == 'release/1.0'
+
+    clone = Repo.clone_from(os.path.dirname(branched_repo.git_dir), nogit)
+    result = runner.invoke(
+        checkout_branch,
+        ['--git', clone.git_dir, '--remotes', 'random'],
+    )
+    assert result.exit_code == 0, result.output
+    assert clone.active_branch.name == 'random_branch'
+    assert clone.active_branch.tracking_branch().name == 'origin/random_branch'
+
+
+def test_find_branches():
+    branches = [
+        Branch('feature/ABC-12-old', 'refs/heads/feature/ABC-12-old', False, 100),
+        Branch('feature/ABC-13-new', 'refs/heads/feature/ABC-13-new', False, 200),
+        Branch('origin/feature/ABC-14', 'refs/remotes/origin/feature/ABC-14', True, 0),
+    ]
+    found = find_branches('abc', branches)
+    assert [b.name for b in found] == ['feature/ABC-13-new', 'feature/ABC-12-old', 'origin/feature/ABC-14']
+    assert find_branches('ABC-14', branches) == branches[2:]
@@ -0,0 +1,68 @@
+import json
+import pytest
+from click.testing import CliRunner
+
+from flowtool_gitflow import issues
+from flowtool_gitflow.feature import main, issue
+
+runner = CliRunner()
+
+@pytest.fixture
+def issue_repo(fresh_repo):
+    fresh_repo.git.branch('develop')
+    fresh_repo.git.branch('feature/ABC-1-login')
+    fresh_repo.git.branch('feature/ABC-2-logout')
+    fresh_repo.git.branch('fix/ABC-2-XYZ-7-crash')
+    return fresh_repo
+
+
+def test_index(issue_repo):
+    found = issues.branches_for(['ABC-2', 'XYZ-7', 'NOPE-1'], repo=issue_repo)
+    assert [b.name for b in found['ABC-2']] == ['feature/ABC-2-logout', 'fix/ABC-2-XYZ-7-crash']
+    assert [b.name for b in found['XYZ-7']] == ['fix/ABC-2-XYZ-7-crash']
+    assert found['NOPE-1'] == []
+    assert found['XYZ-7'][0].object == issue_repo.head.commit.hexsha
+
+    filename = issues.index_file(issue_repo)
+    with open(filename) as fh:
+        stored = json.load(fh)
+    assert 'refs/heads/feature/ABC-1-login' in stored['refs']
+
+    issue_repo.git.branch('-D', 'fix/ABC-2-XYZ-7-crash')
+    issue_repo.git.branch('feature/XYZ-8')
+    found = issues.branches_for(['ABC-2', 'XYZ-7', 'XYZ-8'], repo=issue_repo)
+    assert [b.name for b in found['ABC-2']] == ['feature/ABC-2-logout']
+    assert found['XYZ-7'] == []
+    assert [b.name for b in found['XYZ-8']] == ['feature/XYZ-8']
+
+    with open(filename, 'w') as fh:
+        fh.write('{broken')
+    assert set(issues.issue_index(issue_repo)['issues']) == set(['ABC-1', 'ABC-2', 'XYZ-8'])
+
+
+def test_issue_command(issue_repo):
+    git_dir = issue_repo.git_dir
+
+    result = runner.invoke(issue, ['--git', git_dir, 'abc-1'])
+    assert result.exit_code == 0, result.output
+    assert issue_repo.active_branch.name == 'feature/ABC-1-login'
+
+    result = runner.invoke(issue, ['--git', git_dir, 'ABC-2'])
+    assert result.exit_code == 0
+    assert 'feature/ABC-2-logout' in result.output
+    assert issue_repo.active_branch.name == 'feature/ABC-1-login'
+
+    result = runner.invoke(issue, ['--git', git_dir, 'ABC-99'])
+    assert result.exit_code == 1
+    assert 'No branch for issue ABC-99.' in result.output
+
+    result = runner.invoke(issue, ['--git', git_dir, '-'], input='ABC-1\nXYZ-7 ABC-3\n')
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert len(lines) == 3
+    assert 'feature/ABC-1-login' in lines[0]
+    assert lines[2] == 'ABC-3 -'
+
+    result = runner.invoke(main, ['--git', git_dir])
+    assert result.exit_code == 0
+    assert 'XYZ-7' in result.output
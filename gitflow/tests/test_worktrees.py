@@ -0,0 +1,134 @@
+import os
+import shutil
+from click.testing import CliRunner
+
+from flowtool_gitflow import worktrees
+from flowtool_gitflow.basic import checkout_branch
+from flowtool_gitflow.worktrees import worktree
+
+runner = CliRunner()
+
+
+def branch_repo(repo, *names):
+    for name in names:
+        repo.git.branch(name)
+    return repo
+
+
+def make_least_recent(path, repo):
+    usage = worktrees.load_usage(repo)
+    usage[os.path.basename(path)] = 0
+    worktrees.save_usage(usage, repo)
+
+
+def test_pool(fresh_repo):
+    repo = branch_repo(fresh_repo, 'b1', 'b2', 'b3')
+    main = os.path.dirname(repo.git_dir)
+
+    assert worktrees.acquire_worktree('master', repo=repo) == main
+
+    first = worktrees.acquire_worktree('b1', repo=repo, size=2)
+    second = worktrees.acquire_worktree('b2', repo=repo, size=2)
+    assert first != second
+    assert worktrees.acquire_worktree('b1', repo=repo, size=2) == first
+    assert [w.branch for w in worktrees.list_worktrees(repo)] == ['master', 'b1', 'b2']
+
+    make_least_recent(first, repo)
+    open(os.path.join(first, 'build.log'), 'w').close()  # does not count as a use
+    assert worktrees.acquire_worktree('b3', repo=repo, size=2) == first
+    assert [w.branch for w in worktrees.pool_slots(repo)] == ['b2', 'b3']
+    assert repo.active_branch.name == 'master'
+
+
+def test_dirty_slots(fresh_repo):
+    repo = branch_repo(fresh_repo, 'b1', 'b2')
+    first = worktrees.acquire_worktree('b1', repo=repo, size=1)
+    with open(os.path.join(first, 'initial_file'), 'w') as fh:
+        fh.write('changed')
+
+    second = worktrees.acquire_worktree('b2', repo=repo, size=1)
+    assert second != first
+    assert worktrees.prune_pool(repo, size=1) == []
+    assert len(worktrees.pool_slots(repo)) == 2
+
+    with open(os.path.join(first, 'initial_file'), 'w') as fh:
+        fh.write('initial content')
+    make_least_recent(second, repo)
+    assert worktrees.prune_pool(repo, size=1) == [second]
+    assert [w.branch for w in worktrees.pool_slots(repo)] == ['b1']
+
+
+def test_prune_stale(fresh_repo):
+    repo = branch_repo(fresh_repo, 'b1', 'b2')
+    path = worktrees.acquire_worktree('b1', repo=repo)
+    shutil.rmtree(path)
+    assert worktrees.pool_slots(repo) == []
+    worktrees.prune_pool(repo)
+    assert [w.branch for w in worktrees.list_worktrees(repo)] == ['master']
+    assert worktrees.acquire_worktree('b1', repo=repo) == path
+    assert 'slot-1' in worktrees.load_usage(repo)
+
+
+def test_acquire_prunes_stale(fresh_repo):
+    repo = branch_repo(fresh_repo, 'b1', 'b2')
+    path = worktrees.acquire_worktree('b1', repo=repo)
+    shutil.rmtree(path)
+    assert worktrees.acquire_worktree('b2', repo=repo) == path
+    assert [w.branch for w in worktrees.list_worktrees(repo)] == ['master', 'b2']
+    assert worktrees.acquire_worktree('b1', repo=repo) != path
+
+
+def test_worktree_command(fresh_repo):
+    repo = branch_repo(fresh_repo, 'b1')
+    git_dir = repo.git_dir
+
+    result = runner.invoke(worktree, ['--git', git_dir, 'b1'])
+    assert result.exit_code == 0, result.output
+    path = result.output.strip()
+    assert os.path.isfile(os.path.join(path, 'initial_file'))
+
+    result = runner.invoke(worktree, ['--git', git_dir, '--export', 'b1'])
+    assert result.output == "cd '%s'\n" % path
+
+    result = runner.invoke(worktree, ['--git', git_dir, '--list'])
+    assert result.exit_code == 0
+    assert path in result.output
+
+    result = runner.invoke(worktree, ['--git', git_dir, 'nope'])
+    assert result.exit_code == 1
+
+    result = runner.invoke(worktree, ['--git', git_dir])
+    assert result.exit_code == 1
+
+
+def test_export_with_messages(fresh_repo):
+    repo = branch_repo(fresh_repo, 'b1', 'b2')
+    git_dir = repo.git_dir
+    first = worktrees.acquire_worktree('b1', repo=repo, size=1)
+    with open(os.path.join(first, 'initial_file'), 'w') as fh:
+        fh.write('changed')
+
+    result = runner.invoke(worktree, ['--git', git_dir, '--size', '1', '--export', 'b2'])
+    assert result.exit_code == 0, result.output
+    assert 'added one more' in result.stderr
+    second = [w.path for w in worktrees.list_worktrees(repo) if w.branch == 'b2'][0]
+    assert result.stdout == "cd '%s'\n" % second
+
+    with open(os.path.join(first, 'initial_file'), 'w') as fh:
+        fh.write('initial content')
+    make_least_recent(first, repo)
+    result = runner.invoke(worktree, ['--git', git_dir, '--size', '1', '--prune', '--list', '--export', 'b2'])
+    assert result.exit_code == 0, result.output
+    assert 'Removed' in result.stderr
+    assert result.stdout == "cd '%s'\n" % second
+
+
+def test_checkout_worktree(fresh_repo):
+    repo = branch_repo(fresh_repo, 'feature/xyz')
+    repo.git.branch('feature/xyz-old')
+    result = runner.invoke(checkout_branch, ['--git', repo.git_dir, '--worktree', 'xyz'])
+    assert result.exit_code == 0, result.output
+    assert 'Best of 2 matches' in result.stderr
+    path = result.stdout.strip()
+    assert [w.path for w in worktrees.pool_slots(repo)] == [path]
+    assert repo.active_branch.name == 'master'
@@ -7,17 +7,17 @@ from os.path import join, basename, dirname
 import sys
 import click
 
-from flowtool.files import is_executable
 
 from flowtool.style import echo, colors
 from flowtool.style import debug
 from flowtool.ui import abort
 from flowtool.python import containing
 
-from flowtool_git.common import local_repo
+from flowtool_git.common import local_repo, find_git_repos
 
-from flowtool_githooks.manager import get_script_entry_points
 from flowtool_githooks.manager import hook_specs
+from flowtool_githooks.inventory import gather_inventory, inventory_json
+from flowtool_githooks import multirepo
 
 
 def link_script(script_name, scripts_dir):
@@ -86,19 +86,45 @@ def add_remove_scripts(hook, patterns, add, noop, scripts_dir, available, instal
 @click.option('-g', '--git', type=click.Path(exists=True), default=None, help='Specify the git repo to operate on (defaults to current directory).')
 @click.option('-a/-r', '--add/--remove', default=None, help='Wether the scripts should be added or removed.')
 @click.option('-n', '--noop', is_flag=True, help='Do not really do anything. Mainly for testing purposes.')
+@click.option('-j', '--json', 'as_json', is_flag=True, help='Print the hooks inventory as json.')
+@click.option('-R', '--recursive', type=click.Path(exists=True, file_okay=False), default=None, help='Operate on all git repos found below this directory.')
+@click.option('-w', '--workers', type=int, default=multirepo.DEFAULT_WORKERS, help='Number of repos processed in parallel with --recursive.')
 @click.argument('hook', type=click.Choice(sorted(hook_specs)), nargs=1)
 @click.argument('patterns', nargs=-1)
-def manage_scripts(hook=None, patterns=(), add=None, noop=None, git=None):
+def manage_scripts(hook=None, patterns=(), add=None, noop=None, git=None, as_json=None, recursive=None, workers=None):
     """ Manage the scripts of a git hook runner. """
 
+    if recursive is not None:
+        repos = find_git_repos(recursive)
+        if add is None:
+            reports = multirepo.run_on_repos(
+                multirepo.status_report, repos, workers=workers, hooks=[hook],
+            )
+        else:
+            if not patterns:
+                abort('To add/remove you need to give some script name patterns.')
+            reports = multirepo.run_on_repos(
+                multirepo.scripts_report, repos, workers=workers,
+                hook=hook, patterns=patterns, add=add, noop=noop,
+            )
+        if multirepo.print_reports(reports, as_json=as_json):
+            sys.exit(1)
+        return
+
     repo = local_repo(path=git)
+    inventory = gather_inventory(repo)
+
+    if as_json:
+        click.echo(inventory_json(inventory, [hook]))
+        return
 
     scripts_dir = join(repo.git_dir, 'hooks', hook + '.d')
-    if not os.path.isdir(scripts_dir):
+    if scripts_dir not in inventory.scripts:
         abort('Runner dir not found: %s\nYou must first install the runner for %s.' % (scripts_dir, colors.cyan(hook)))
 
-    available = get_script_entry_points(hook)
-    installed = os.listdir(scripts_dir)
+    available = inventory.entry_points[hook]
+    executable = {s.name: s.executable for s in inventory.scripts[scripts_dir]}
+    installed = list(executable)
 
     if add is None and patterns:
 
@@ -112,8 +138,6 @@ def manage_scripts(hook=None, patterns=(), add=None, noop=None, git=None):
             echo.white('No matching scripts available.')
         return
 
-    repo = local_repo(repo)
-
     if add is not None:
         return add_remove_scripts(hook, patterns, add, noop, scripts_dir, available, installed)
 
@@ -121,7 +145,7 @@ def manage_scripts(hook=None, patterns=(), add=None, noop=None, git=None):
         echo.white('Installed in %s:' % colors.cyan(scripts_dir))
         for idx, filename in enumerate(installed):
             cnt = idx + 1
-            if is_executable(join(scripts_dir, filename)):
+            if executable[filename]:
                 echo.green(colors.white('%4d' % cnt), '+', filename)
             else:
                 echo.white('%4d' % cnt, '+', filename)
@@ -0,0 +1,231 @@
+""" A snapshot of everything there is to know about the git hooks of a repo.
+
+    Commands like `githooks-runner --status` and `githooks-manage` used to
+    collect their information piece by piece: listing the virtualenvs bin
+    directory once per hook, comparing every hook file with the runner and
+    listing the scripts dirs again and again. The inventory collects all of
+    it once (using os.scandir where available) and can be reused by all of
+    them, and also be dumped as json.
+
+    >>> inventory = gather_inventory()
+    >>> sorted(inventory.entry_points) == sorted(hook_specs)
+    True
+    >>> import json
+    >>> 'hooks' in json.loads(inventory_json(inventory))
+    True
+"""
+import os
+import sys
+import json
+import stat
+
+from collections import namedtuple
+
+from flowtool.style import debug
+
+from flowtool_git.common import local_repo
+
+from flowtool_githooks.manager import hook_specs, RUNNER, InstalledHook
+from flowtool_githooks.manager import get_all_script_entry_points
+
+
+HookInventory = namedtuple('HookInventory', ['git_dir', 'hooks', 'entry_points', 'available', 'scripts'])
+InstalledScript = namedtuple('InstalledScript', ['name', 'executable'])
+
+
+def scan_dir(path):
+    """ Return a dict of the entries in path, mapping names to a
+        (possibly cached) stat result, following symlinks.
+        Entries that cannot be stat'ed (i.e. broken symlinks)
+        map to None. A missing directory yields an empty dict.
+
+        >>> 'ls' in scan_dir('/bin')
+        True
+        >>> scan_dir('/_not_/_there_')
+        {}
+    """
+    result = {}
+    if hasattr(os, 'scandir'):
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return result
+        for entry in entries:
+            try:
+                result[entry.name] = entry.stat()
+            except OSError:
+                result[entry.name] = None
+    else:
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return result
+        for name in names:
+            try:
+                result[name] = os.stat(os.path.join(path, name))
+            except OSError:
+                result[name] = None
+    return result
+
+
+def _is_dir(stat_result):
+    return stat_result is not None and stat.S_ISDIR(stat_result.st_mode)
+
+
+def _is_executable(stat_result):
+    return stat_result is not None and bool(stat_result.st_mode & stat.S_IXUSR)
+
+
+class RunnerComparison(object):
+    """ Compare files with the runner script, reading the runner only once.
+
+        >>> is_runner = RunnerComparison()
+        >>> is_runner(RUNNER)
+        True
+        >>> is_runner(__file__)
+        False
+        >>> is_runner('/_not_/_there_')
+        False
+    """
+
+    def __init__(self, runner=RUNNER):
+        with open(runner, 'rb') as fh:
+            self.content = fh.read()
+
+    def __call__(self, filename, stat_result=None):
+        try:
+            if stat_result is None:
+                stat_result = os.stat(filename)
+            if stat_result.st_size != len(self.content):
+                return False
+            with open(filename, 'rb') as fh:
+                return fh.read() == self.content
+        except (OSError, IOError):
+            return False
+
+
+def gather_inventory(repo=None, file_hooks=None, bindir=None):
+    """ Collect the hook inventory of a repo in one go.
+
+        The bin directory of the running python is listed only once, and
+        every scripts dir is scanned only once. If file_hooks are given,
+        they are used instead of looking at the repos hook files (their
+        runner dirs will still be scanned).
+
+        >>> inventory = gather_inventory()
+        >>> isinstance(inventory.hooks, list)
+        True
+        >>> fake = InstalledHook('fake', True, '/bin/ls', False, '/bin')
+        >>> 'ls' in [s.name for s in gather_inventory(file_hooks=[fake]).scripts['/bin']]
+        True
+    """
+
+    repo = local_repo(repo)
+    hook_dir = os.path.join(repo.git_dir, 'hooks')
+    hook_entries = scan_dir(hook_dir)
+
+    scripts = {}
+    def add_scripts(scripts_dir):
+        if scripts_dir not in scripts:
+            scripts[scripts_dir] = [
+                InstalledScript(name, _is_executable(st))
+                for name, st in sorted(scan_dir(scripts_dir).items())
+            ]
+
+    for name in hook_specs:
+        if _is_dir(hook_entries.get(name + '.d')):
+            add_scripts(os.path.join(hook_dir, name + '.d'))
+
+    if file_hooks is None:
+        is_runner = RunnerComparison()
+        file_hooks = []
+        for name in sorted(hook_specs):
+            if name not in hook_entries:
+                continue
+            filename = os.path.join(hook_dir, name)
+            st = hook_entries[name]
+            runner_dir = filename + '.d'
+            file_hooks.append(InstalledHook(
+                name=name,
+                active=_is_executable(st),
+                file=filename,
+                is_runner=is_runner(filename, st),
+                runner_dir=runner_dir if runner_dir in scripts else None,
+            ))
+
+    for info in file_hooks:
+        if info.runner_dir:
+            add_scripts(info.runner_dir)
+
+    if bindir is None:
+        bindir = os.path.dirname(str(sys.executable))
+    binscripts = scan_dir(bindir)
+
+    entry_points = {}
+    available = {}
+    hook_names = set(hook_specs).union(info.name for info in file_hooks)
+    for name, scripts_found in get_all_script_entry_points(hook_names).items():
+        names = sorted(scripts_found)
+        entry_points[name] = names
+        available[name] = [n for n in names if n in binscripts]
+
+    inventory = HookInventory(
+        git_dir=repo.git_dir,
+        hooks=sorted(file_hooks),
+        entry_points=entry_points,
+        available=available,
+        scripts=scripts,
+    )
+    debug.bold('hook inventory:', inventory)
+    return inventory
+
+
+def inventory_dict(inventory, hooks=None):
+    """ Convert an inventory into plain data (i.e. for json).
+        The output can be restricted to some hook names.
+
+        >>> data = inventory_dict(gather_inventory(), hooks=['pre-commit'])
+        >>> list(data['hooks'])
+        ['pre-commit']
+        >>> sorted(data['hooks']['pre-commit'])
+        ['active', 'available', 'entry_points', 'file', 'installed', 'is_runner', 'scripts', 'scripts_dir']
+    """
+    if hooks is None:
+        hooks = sorted(inventory.entry_points)
+
+    installed = {info.name: info for info in inventory.hooks}
+    hook_dir = os.path.join(inventory.git_dir, 'hooks')
+
+    result = {}
+    for name in hooks:
+        info = installed.get(name)
+        if info is None:
+            scripts_dir = os.path.join(hook_dir, name + '.d')
+            if scripts_dir not in inventory.scripts:
+                scripts_dir = None
+        else:
+            scripts_dir = info.runner_dir
+        result[name] = dict(
+            file=info.file if info else None,
+            installed=info is not None,
+            active=bool(info and info.active),
+            is_runner=bool(info and info.is_runner),
+            scripts_dir=scripts_dir,
+            scripts=[
+                dict(name=s.name, executable=s.executable)
+                for s in inventory.scripts.get(scripts_dir, ())
+            ],
+            available=list(inventory.available.get(name, ())),
+            entry_points=list(inventory.entry_points.get(name, ())),
+        )
+
+    return dict(
+        git_dir=inventory.git_dir,
+        runner=RUNNER,
+        hooks=result,
+    )
+
+
+def inventory_json(inventory, hooks=None):
+    """ Render the inventory as a json string. """
+    return json.dumps(inventory_dict(inventory, hooks), indent=2, sort_keys=True)
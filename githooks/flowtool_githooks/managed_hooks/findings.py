@@ -0,0 +1,225 @@
+""" Structured findings of code checkers.
+
+    The output of the checker tools is parsed into compact Finding records,
+    which can be printed uniformly, and be aggregated into one JSON or SARIF
+    report (for CI systems and other tools, that should not have to parse
+    terminal output).
+
+    >>> findings = parse_yamllint_parsable(
+    ...     'a.yaml:1:1: [warning] missing document start "---" (document-start)\\n'
+    ... )
+    >>> findings
+    [Finding(path='a.yaml', line=1, column=1, rule='document-start', severity='warning', message='missing document start "---"', tool='yamllint')]
+    >>> print(format_finding(findings[0]))
+    a.yaml:1:1: [warning] missing document start "---" (document-start)
+    >>> report_data(findings)['findings'][0]['rule']
+    'document-start'
+"""
+import os
+import re
+import json
+
+from collections import namedtuple
+from collections import OrderedDict
+
+Finding = namedtuple('Finding', ['path', 'line', 'column', 'rule', 'severity', 'message', 'tool'])
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_VERSION = '2.1.0'
+
+SEVERITIES = {
+    'fatal': 'error',
+    'error': 'error',
+    'warning': 'warning',
+    'info': 'note',
+    'style': 'note',
+    'convention': 'note',
+    'refactor': 'note',
+}
+
+
+def severity(level):
+    """ Normalize a tools severity level to error, warning or note (as in SARIF).
+
+        >>> severity('convention'), severity('Error'), severity('unheard-of')
+        ('note', 'error', 'warning')
+    """
+    return SEVERITIES.get(level.lower(), 'warning')
+
+
+def parse_pylint_json(text):
+    """ Parse the output of `pylint --output-format=json`.
+
+        >>> parse_pylint_json('''[{"type": "error", "path": "x.py", "line": 3,
+        ...     "column": 4, "symbol": "undefined-variable",
+        ...     "message": "Undefined variable 'y'", "message-id": "E0602"}]''')
+        [Finding(path='x.py', line=3, column=5, rule='undefined-variable', severity='error', message="Undefined variable 'y'", tool='pylint')]
+        >>> parse_pylint_json('[]')
+        []
+    """
+    if not text.strip():
+        return []
+    return [
+        Finding(
+            path=msg.get('path'),
+            line=msg.get('line'),
+            column=msg.get('column', 0) + 1,  # pylint counts from 0
+            rule=msg.get('symbol') or msg.get('message-id'),
+            severity=severity(msg.get('type', 'warning')),
+            message=msg.get('message', ''),
+            tool='pylint',
+        )
+        for msg in json.loads(text)
+    ]
+
+
+def parse_shellcheck_json1(text):
+    """ Parse the output of `shellcheck --format=json1`.
+
+        >>> parse_shellcheck_json1('''{"comments": [{"file": "x.sh", "line": 2,
+        ...     "column": 6, "level": "info", "code": 2086,
+        ...     "message": "Double quote to prevent globbing."}]}''')
+        [Finding(path='x.sh', line=2, column=6, rule='SC2086', severity='note', message='Double quote to prevent globbing.', tool='shellcheck')]
+    """
+    if not text.strip():
+        return []
+    return [
+        Finding(
+            path=comment.get('file'),
+            line=comment.get('line'),
+            column=comment.get('column'),
+            rule='SC%s' % comment.get('code'),
+            severity=severity(comment.get('level', 'warning')),
+            message=comment.get('message', ''),
+            tool='shellcheck',
+        )
+        for comment in json.loads(text).get('comments', ())
+    ]
+
+
+YAMLLINT_REGEX = re.compile(
+    r'^(?P<path>.+?):(?P<line>\d+):(?P<column>\d+): '
+    r'\[(?P<level>\w+)\] (?P<message>.*?)(?: \((?P<rule>[\w-]+)\))?$'
+)
+
+def parse_yamllint_parsable(text):
+    """ Parse the output of `yamllint --format=parsable`.
+
+        >>> parse_yamllint_parsable('b.yml:3:1: [error] syntax error: found character')
+        [Finding(path='b.yml', line=3, column=1, rule=None, severity='error', message='syntax error: found character', tool='yamllint')]
+    """
+    result = []
+    for line in text.splitlines():
+        match = YAMLLINT_REGEX.match(line)
+        if match:
+            result.append(Finding(
+                path=match.group('path'),
+                line=int(match.group('line')),
+                column=int(match.group('column')),
+                rule=match.group('rule'),
+                severity=severity(match.group('level')),
+                message=match.group('message'),
+                tool='yamllint',
+            ))
+    return result
+
+
+PARSERS = {
+    'pylint-json': parse_pylint_json,
+    'shellcheck-json1': parse_shellcheck_json1,
+    'yamllint-parsable': parse_yamllint_parsable,
+}
+
+
+def format_finding(finding):
+    """ Format a finding for the terminal (like a compiler would). """
+    rule = ' (%s)' % finding.rule if finding.rule else ''
+    return '{}:{}:{}: [{}] {}{}'.format(
+        finding.path, finding.line, finding.column,
+        finding.severity, finding.message, rule,
+    )
+
+
+def relative_findings(findings, root):
+    """ Make the absolute paths below root relative to it.
+
+        >>> relative_findings([Finding('/repo/a.py', 1, 1, None, 'note', '', 't')], '/repo')[0].path
+        'a.py'
+    """
+    result = []
+    for finding in findings:
+        path = finding.path
+        if path and os.path.isabs(path):
+            relative = os.path.relpath(path, root)
+            if not relative.startswith(os.pardir):
+                finding = finding._replace(path=relative)
+        result.append(finding)
+    return result
+
+
+def report_data(findings):
+    """ The plain JSON report data. """
+    return dict(
+        count=len(findings),
+        findings=[dict(f._asdict()) for f in findings],
+    )
+
+
+def sarif_data(findings):
+    """ A SARIF (2.1.0) log of the findings, with one run per tool.
+
+        >>> log = sarif_data(parse_yamllint_parsable('a.yml:2:3: [error] bad (rule)'))
+        >>> run = log['runs'][0]
+        >>> run['tool']['driver']['name'], run['results'][0]['ruleId']
+        ('yamllint', 'rule')
+        >>> run['results'][0]['locations'][0]['physicalLocation']['region']
+        {'startLine': 2, 'startColumn': 3}
+    """
+    runs = OrderedDict()
+    for finding in findings:
+        run = runs.setdefault(finding.tool, dict(
+            tool=dict(driver=dict(name=finding.tool, rules=[])),
+            results=[],
+        ))
+        rules = run['tool']['driver']['rules']
+        if finding.rule and not any(r['id'] == finding.rule for r in rules):
+            rules.append(dict(id=finding.rule))
+
+        region = dict(startLine=finding.line or 1)
+        if finding.column:
+            region['startColumn'] = finding.column
+        result = dict(
+            level=finding.severity,
+            message=dict(text=finding.message),
+            locations=[dict(physicalLocation=dict(
+                artifactLocation=dict(uri=finding.path),
+                region=region,
+            ))],
+        )
+        if finding.rule:
+            result['ruleId'] = finding.rule
+        run['results'].append(result)
+
+    return {
+        '$schema': SARIF_SCHEMA,
+        'version': SARIF_VERSION,
+        'runs': list(runs.values()),
+    }
+
+
+def write_report(findings, filename):
+    """ Write the findings to filename, as SARIF if the
+        name ends with .sarif (or .sarif.json), else as JSON.
+
+        >>> write_report([], '/tmp/_findings_test.sarif')
+        >>> json.load(open('/tmp/_findings_test.sarif'))['version']
+        '2.1.0'
+        >>> os.unlink('/tmp/_findings_test.sarif')
+    """
+    if filename.endswith('.sarif') or filename.endswith('.sarif.json'):
+        data = sarif_data(findings)
+    else:
+        data = report_data(findings)
+    with open(filename, 'w') as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write('\n')
@@ -14,6 +14,7 @@ from flowtool_git.common import local_repo, GitCommandError
 from flowtool_githooks.managed_hooks.universal import make_check
 from flowtool_githooks.managed_hooks.universal import ErroredCheck, CompletedCheck
 from flowtool_githooks.managed_hooks.universal import UniversalGithook
+from flowtool_githooks.managed_hooks import findings
 
 
 def get_gitconfig_simple(repo=None, local=True):
@@ -245,14 +246,20 @@ class ConfigFileHook(ConfiguredGithook):
         >>> tst.cleanup_configfile()
     """
 
-    def __init__(self):
-        super(ConfigFileHook, self).__init__()
-        update =  {self.CONFIGFILE_GITCFGKEY: self._configfile_path()}
-        if self.GITCONFIG_DEFAULT is None:
-            self.GITCONFIG_DEFAULT = update
-        else:
-            self.GITCONFIG_DEFAULT.update(update)
+    _GITCONFIG_DEFAULT = None
+
+    @property
+    def GITCONFIG_DEFAULT(self):
+        """ The default git config, including the path of the config file
+            (which is only looked up when needed, since it needs the repo).
+        """
+        defaults = dict(self._GITCONFIG_DEFAULT or ())
+        defaults[self.CONFIGFILE_GITCFGKEY] = self._configfile_path()
+        return defaults
 
+    @GITCONFIG_DEFAULT.setter
+    def GITCONFIG_DEFAULT(self, value):
+        self._GITCONFIG_DEFAULT = value
 
     CONFIGFILE = '.universal.cfg'
     CONFIGFILE_GITCFGKEY = 'configfile'
@@ -369,6 +376,8 @@ class ConfigFileHook(ConfiguredGithook):
 def capture_command(*cmdline, **kwd):
     """ Run command and return it's output.
         Issue a warning if the command is not installed.
+        A timeout (in seconds) and resource limits (see
+        flowtool.execute.limits_setter) can be given.
 
         >>> capture_command('ls').returncode
         0
@@ -381,13 +390,19 @@ def capture_command(*cmdline, **kwd):
         <BLANKLINE>
         ...
         Not found.
+        >>> capture_command('sleep', '5', timeout=0.1)
+        Traceback (most recent call last):
+        ...
+        subprocess.TimeoutExpired: Command '('sleep', '5')' timed out after 0.1 seconds
     """
     quiet_error = kwd['quiet_error'] if 'quiet_error' in kwd else False
+    timeout = kwd.get('timeout')
+    limits = kwd.get('limits')
 
     if len(cmdline) == 1:
         cmdline = cmdline[0]
     try:
-        result = run_command(cmdline)
+        result = run_command(cmdline, timeout=timeout, limits=limits)
     except OSError as ex:
         msg = '\nAn Excepion occurred during command execution of: {}\nException: {}\n--> Is the command installed?'
         quiet_error or echo.yellow(msg.format(colors.cyan(' '.join(cmdline)), colors.red(repr(ex))))
@@ -437,8 +452,11 @@ class ShellCommandHook(ConfigFileHook):
     """
 
     CHECK_TOOL = None
+    LIMITS = None  # resource limits for CHECK_TOOL, i.e. {'cpu': 60, 'memory': 2**30}
     RETURNCODE_ON_STDOUT = 0
     RETURNCODE_ON_STDERR = 0
+    FINDINGS_FORMAT = None
+    REPORT_ENVIRON = 'FLOWTOOL_GITHOOKS_REPORT'
 
 
     def _msg_hook_startup(self, checks=(), **kwd):
@@ -470,13 +488,17 @@ class ShellCommandHook(ConfigFileHook):
                 result = outcome.result
                 command = (colors.yellow(os.path.basename(result.command[0])),) + result.command[1:]
                 msg = ('== failed:', colors.yellow(' '.join(command)))
-                if result.stdout or result.stderr:
+                stdout = result.stdout
+                parsed = self.parse_findings(result)
+                if parsed:
+                    stdout = '\n'.join(findings.format_finding(f) for f in parsed)
+                if stdout or result.stderr:
                     msg += ('\n',)
-                if result.stdout:
+                if stdout:
                     msg += (
                         # colors.cyan('\n> > > stdout > > >\n'),
                         '\n',
-                        result.stdout,
+                        stdout,
                         # colors.cyan('\n< < < stdout < < <')
                     )
                 if result.stderr:
@@ -502,9 +524,17 @@ class ShellCommandHook(ConfigFileHook):
             char = '.'
         else:
             char = '?!'
-        kwd.setdefault('nl', False)
-        echo.bold(char, nl=False)
+        self.progress.write(char, 'bold')
+
 
+    def in_process_func(self):
+        """ Return a function, that does the job of the CHECK_TOOL
+            in-process, or None if that is not possible. It is called
+            with the tool name and the file arguments of a check, and
+            has to return a CompletedCommand like the tool would.
+
+            >>> ShellCommandHook().in_process_func()
+        """
 
     def make_check(self, *args, **kwd):
         """ Make a check (combine function and args).
@@ -518,7 +548,30 @@ class ShellCommandHook(ConfigFileHook):
             >>> tst.CHECK_TOOL = ('flowtool', '--flow')
             >>> len(tst.make_check().args)
             2
+
+            If the hook has an in-process function, it is used
+            instead of running the tool:
+
+            >>> from flowtool_githooks.managed_hooks.universal import print_args
+            >>> tst.in_process_func = lambda: print_args
+            >>> check = tst.make_check('file.txt')
+            >>> check.func is print_args, check.args
+            (True, ('flowtool', 'file.txt'))
+
+            The TIMEOUT and LIMITS of the hook apply to the tool:
+
+            >>> tst = ShellCommandHook()
+            >>> tst.TIMEOUT = 10
+            >>> tst.make_check('file.txt').kwargs
+            {'timeout': 10}
         """
+        in_process = self.in_process_func()
+        if in_process is not None:
+            tool = self.CHECK_TOOL
+            if isinstance(tool, (tuple, list)):
+                tool = tool[0]  # pylint: disable=E1136
+            return make_check(in_process, str(tool), *args, **kwd)
+
         if self.CHECK_TOOL is not None:
             if isinstance(self.CHECK_TOOL, (tuple, list)):
                 tool_args = []
@@ -531,6 +584,10 @@ class ShellCommandHook(ConfigFileHook):
             else:
                 args = (str(self.CHECK_TOOL),) + args
 
+        if self.TIMEOUT is not None:
+            kwd.setdefault('timeout', self.TIMEOUT)
+        if self.LIMITS:
+            kwd.setdefault('limits', self.LIMITS)
         return make_command_check(*args, **kwd)
 
 
@@ -542,7 +599,7 @@ class ShellCommandHook(ConfigFileHook):
             0
         """
         if type(result) is ErroredCheck:
-            return self.EXCEPTION_RETURNCODE
+            return result.returncode
         elif type(result) is CompletedCheck:
             completed_command = result.result
         else:
@@ -553,7 +610,85 @@ class ShellCommandHook(ConfigFileHook):
         elif completed_command.stderr and self.RETURNCODE_ON_STDERR:
             return self.RETURNCODE_ON_STDERR
         elif completed_command.stdout and self.RETURNCODE_ON_STDOUT:
+            if self.parse_findings(completed_command) == []:
+                return 0  # i.e. an empty json list
             return self.RETURNCODE_ON_STDOUT
         else:
             return 0
 
+    def parse_findings(self, completed_command):
+        """ Parse the output of the tool into a list of Findings
+            (using the FINDINGS_FORMAT), or return None if there
+            is no parser or the output can not be parsed.
+
+            >>> tst = ShellCommandHook()
+            >>> tst.parse_findings(capture_command('echo', '[]'))
+            >>> tst.FINDINGS_FORMAT = 'pylint-json'
+            >>> tst.parse_findings(capture_command('echo', '[]'))
+            []
+            >>> tst.parse_findings(capture_command('echo', 'garbage'))
+        """
+        parser = findings.PARSERS.get(self.FINDINGS_FORMAT)
+        if parser is None:
+            return None
+        try:
+            return parser(completed_command.stdout)
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def collect_findings(self, results):
+        """ Collect the findings of all completed checks,
+            with paths relative to the repo root.
+        """
+        collected = []
+        for outcome in results:
+            if type(outcome) is CompletedCheck:
+                collected.extend(self.parse_findings(outcome.result) or ())
+        return findings.relative_findings(collected, os.path.dirname(self.repo.git_dir))
+
+    def report_file(self):
+        """ The file to write the findings report to (or None). It can be set
+            in the environment (FLOWTOOL_GITHOOKS_REPORT, where {name} is
+            replaced by the NAME of the hook), or as the `report` key in
+            the hooks git config section. If the name ends with .sarif,
+            a SARIF log is written, else plain JSON.
+
+            >>> tst = ShellCommandHook()
+            >>> tst.NAME = 'test_hook'
+            >>> os.environ[tst.REPORT_ENVIRON] = '/tmp/{name}.sarif'
+            >>> tst.report_file()
+            '/tmp/test_hook.sarif'
+            >>> del os.environ[tst.REPORT_ENVIRON]
+            >>> tst.report_file()
+        """
+        filename = os.environ.get(self.REPORT_ENVIRON)
+        if filename:
+            filename = filename.replace('{name}', self.NAME or 'hook')
+        else:
+            filename = self.get_gitconfig('report')
+        if filename and not os.path.isabs(filename):
+            filename = os.path.join(os.path.dirname(self.repo.git_dir), filename)
+        return filename or None
+
+    def write_report(self, results):
+        report_file = self.FINDINGS_FORMAT and self.report_file()
+        if report_file:
+            findings.write_report(self.collect_findings(results), report_file)
+            debug.cyan('findings report written to', report_file)
+
+    def game_over(self, results=(), fails=None, verbose=None):
+        if not verbose:
+            self.write_report(results)  # else done by summarize
+        return super(ShellCommandHook, self).game_over(results, fails=fails, verbose=verbose)
+
+    def summarize(self, results=(), verbose=None):
+        """ Summarize the results, and write the findings report.
+
+            >>> tst = ShellCommandHook()
+            >>> tst.summarize([])
+            0
+        """
+        returncode = super(ShellCommandHook, self).summarize(results, verbose=verbose)
+        self.write_report(results)
+        return returncode
+
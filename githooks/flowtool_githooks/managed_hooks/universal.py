@@ -45,11 +45,15 @@
 """
 import os
 import sys
+import time
 import click
+import subprocess
 
 from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 from flowtool.style import echo, colors
+from flowtool.style import Renderer
 from flowtool.style import debug
 from flowtool.python import read_stdin_nonblocking
 
@@ -59,6 +63,9 @@ from flowtool_githooks.discovering import find_file_patterns_in_project
 from flowtool_githooks.discovering import find_changed_file_patterns
 from flowtool_githooks.discovering import find_added_file_patterns
 
+# there are no timeouts before python3.3 (and nothing is a subclass of ())
+TimeoutExpired = getattr(subprocess, 'TimeoutExpired', ())
+
 
 def print_args(*cmdline, **kwd):
     """ Print the args that are given to this function.
@@ -106,12 +113,45 @@ class UniversalGithook(object):
     CHECK_FUNC = None
 
     EXCEPTION_RETURNCODE = -2
+    TIMEOUT_RETURNCODE = -3
+    TIMEOUT = None  # seconds per check (for hooks that run commands)
+    TIME_BUDGET = None  # seconds for all checks, the rest is skipped
     CONTINUES = 0
     PROGRESSBAR_MIN_COUNT = 4
     SIMPLE_GENERATOR = False
+    WORKERS = None
 
+    _repo = None
 
-    repo = local_repo()
+    @property
+    def repo(self):
+        """ The repo the hook runs in. It is looked up on first use,
+            so importing and creating hooks does not touch git.
+
+            >>> tst = UniversalGithook()
+            >>> tst._repo
+            >>> tst.repo.git_dir == local_repo().git_dir
+            True
+        """
+        if self._repo is None:
+            self._repo = local_repo()
+        return self._repo
+
+    @repo.setter
+    def repo(self, value):
+        self._repo = value
+
+    _progress = None
+
+    @property
+    def progress(self):
+        """ The buffered renderer for the progress characters. It only
+            redraws a few times per second, so it has to be flushed before
+            anything else is echoed.
+        """
+        if self._progress is None:
+            self._progress = Renderer()
+        return self._progress
 
 
     @classmethod
@@ -215,7 +255,9 @@ class UniversalGithook(object):
     def _fmt_checked(self, outcome=None):
         check = outcome.check
         check_name = self._check_func_name(check.func)
-        if self.is_returncode(outcome):
+        if type(outcome) is ErroredCheck and outcome.returncode == self.TIMEOUT_RETURNCODE:
+            msg = ('==', colors.cyan(check_name), 'timed out after %ss.' % outcome.exc_info[1].timeout)
+        elif self.is_returncode(outcome):
             msg = ('==', colors.cyan(check_name), 'errored.')
         else:
             msg = ('==', colors.cyan(check_name), 'passed.')
@@ -240,18 +282,27 @@ class UniversalGithook(object):
             char = '.'
         else:
             char = '?!'
-        kwd.setdefault('nl', False)
-        echo.bold(char, **kwd)
+        self.progress.write(char, 'bold')
 
     def make_check(self, *args, **kwd):
         """ Make a check (combine function and args).
+            If no CHECK_FUNC is set, a check_func method is
+            used, if the hook has one.
 
             >>> tst = UniversalGithook()
+            >>> tst.make_check().func is dummy_check
+            True
+            >>> tst.check_func = print_args
+            >>> tst.make_check().func is print_args
+            True
             >>> tst.CHECK_FUNC = 'test'
             >>> tst.make_check().func
             'test'
         """
-        check_func = self.CHECK_FUNC if self.CHECK_FUNC is not None else dummy_check
+        if self.CHECK_FUNC is not None:
+            check_func = self.CHECK_FUNC
+        else:
+            check_func = getattr(self, 'check_func', dummy_check)
         return make_check(check_func, *args, **kwd)
 
     def generate_checks(self):
@@ -301,8 +352,48 @@ class UniversalGithook(object):
         return CompletedCheck(check, result)
 
     def check_errored(self, check, exc_info):
+        """ Wrap up an exception of a check. Timeouts get their own returncode.
+
+            >>> tst = UniversalGithook()
+            >>> def hangs():
+            ...     raise subprocess.TimeoutExpired('hangs', 1)
+            >>> tst.run_check(make_check(hangs)).returncode
+            -3
+        """
+        if issubclass(exc_info[0], TimeoutExpired):
+            return ErroredCheck(check, exc_info, self.TIMEOUT_RETURNCODE)
         return ErroredCheck(check, exc_info, self.EXCEPTION_RETURNCODE)
 
+    def start_budget(self):
+        """ Start the clock for the TIME_BUDGET of the hook. """
+        if self.TIME_BUDGET is None:
+            self._deadline = None
+        else:
+            self._deadline = time.time() + self.TIME_BUDGET
+
+    def over_budget(self):
+        """ If the TIME_BUDGET is used up.
+
+            >>> tst = UniversalGithook()
+            >>> tst.start_budget()
+            >>> tst.over_budget()
+            False
+            >>> tst.TIME_BUDGET = 0
+            >>> tst.start_budget()
+            >>> tst.over_budget()
+            True
+        """
+        deadline = getattr(self, '_deadline', None)
+        return deadline is not None and time.time() >= deadline
+
+    def _msg_over_budget(self, skipped=None, **kwd):
+        count = '%s ' % skipped if skipped is not None else ''
+        msg = (
+            '\n== time budget of %ss used up,' % self.TIME_BUDGET,
+            'skipping the remaining %schecks.' % count,
+        )
+        echo.yellow(*msg, **kwd)
+
     def _msg_hook_startup(self, checks=(), **kwd):
         msg = ('==', colors.yellow(self.NAME),) if self.NAME else ('==',)
         if hasattr(checks, '__len__'):
@@ -341,10 +432,14 @@ class UniversalGithook(object):
             continues = self.CONTINUES
 
         self._msg_hook_startup(checks)
+        self.start_budget()
 
         results = []
         fails = 0
-        for check in checks:
+        for idx, check in enumerate(checks):
+            if self.over_budget():
+                self._msg_over_budget(len(checks) - idx if hasattr(checks, '__len__') else None)
+                break
             self._msg_simple_check_start(check)
             outcome = self.run_check(check, **kwd)
             self._msg_simple_checked(outcome)
@@ -381,10 +476,15 @@ class UniversalGithook(object):
         self._msg_hook_startup(checks)
         echo.white()
 
+        self.start_budget()
+
         results = []
         fails = 0
         with click.progressbar(checks) as bar:
             for check in bar:
+                if self.over_budget():
+                    self._msg_over_budget(len(checks) - len(results))
+                    break
                 outcome = self.run_check(check, **kwd)
                 results.append(outcome)
                 if self.is_returncode(outcome):
@@ -419,19 +519,90 @@ class UniversalGithook(object):
             continues = self.CONTINUES
 
         self._msg_hook_startup(checks, nl=False)
+        self.start_budget()
 
         results = []
         fails = 0
-        for check in checks:
-            outcome = self.run_check(check, **kwd)
-            self._msg_generator_checked(outcome)
-            results.append(outcome)
-            if self.is_returncode(outcome):
-                fails += 1
-                if fails >= continues:
-                    echo.white('')
-                    return self.game_over(results, fails=fails, verbose=True)
+        with self.progress:
+            for check in checks:
+                if self.over_budget():
+                    self.progress.flush()
+                    self._msg_over_budget(nl=False)
+                    break
+                outcome = self.run_check(check, **kwd)
+                self._msg_generator_checked(outcome)
+                results.append(outcome)
+                if self.is_returncode(outcome):
+                    fails += 1
+                    if fails >= continues:
+                        self.progress.flush()
+                        echo.white('')
+                        return self.game_over(results, fails=fails, verbose=True)
+        echo.white('')
+        returncode = self.summarize(results, verbose=True)
+        if returncode is None:
+            returncode = 0
+        return returncode
+
+    def execute_parallel(self, checks=None, continues=None, workers=None, **kwd):
+        """ Procedure for hook execution on a pool of worker threads.
+            Meant for checks that spend their time in subprocesses.
+            The results are summarized in the order of the checks.
+
+            >>> tst = UniversalGithook()
+            >>> tst.generate_checks = lambda: [make_check(lambda x: x, i) for i in range(3)]
+            >>> tst.execute_parallel(workers=2)
+            == will run 3 checks.
+            ...
+            0
+        """
+
+        if checks is None:
+            checks = self.generate_checks()
+
+        if continues is None:
+            continues = self.CONTINUES
+
+        if workers is None:
+            workers = self.WORKERS or 1
+
+        checks = list(checks)
+        self._msg_hook_startup(checks)
+        self.start_budget()
+
+        def run_within_budget(item):
+            if self.over_budget():
+                return item[0], None
+            return item[0], self.run_check(item[1], **kwd)
+
+        results = []
+        fails = 0
+        skipped = 0
+        pool = ThreadPool(max(1, min(workers, len(checks))))
+        try:
+            running = pool.imap_unordered(run_within_budget, enumerate(checks))
+            for idx, outcome in running:
+                if outcome is None:
+                    skipped += 1
+                    continue
+                self._msg_generator_checked(outcome)
+                results.append((idx, outcome))
+                if self.is_returncode(outcome):
+                    fails += 1
+                    if fails >= continues:
+                        self.progress.flush()
+                        echo.white('')
+                        results = [o for _, o in sorted(results, key=lambda r: r[0])]
+                        return self.game_over(results, fails=fails, verbose=True)
+        finally:
+            self.progress.flush()
+            pool.terminate()
+            pool.join()
+
+        if skipped:
+            self._msg_over_budget(skipped, nl=False)
         echo.white('')
+        results = [o for _, o in sorted(results, key=lambda r: r[0])]
         returncode = self.summarize(results, verbose=True)
         if returncode is None:
             returncode = 0
@@ -460,7 +631,9 @@ class UniversalGithook(object):
             checks = self.generate_checks()
 
         if hasattr(checks, '__len__'):
-            if len(checks) < self.PROGRESSBAR_MIN_COUNT:
+            if self.WORKERS and self.WORKERS > 1 and len(checks) > 1:
+                return self.execute_parallel(checks=checks, **kwd)
+            elif len(checks) < self.PROGRESSBAR_MIN_COUNT:
                 return self.execute_simple(checks=checks, **kwd)
             else:
                 return self.execute_progressbar(checks=checks, **kwd)
@@ -4,7 +4,7 @@ import click
 import filecmp
 
 from collections import namedtuple
-from pkg_resources import iter_entry_points
+from pkg_resources import iter_entry_points, working_set
 
 from flowtool.style import echo, colors
 from flowtool.style import debug
@@ -60,6 +60,29 @@ def get_script_entry_points(hook_name):
             pass
     return result
 
+def get_all_script_entry_points(hook_names):
+    """ Get the script entrypoints of many hooks at once, as a dict
+        from hook names to dicts like get_script_entry_points gives.
+        The installed distributions are looked through only once.
+
+        >>> get_all_script_entry_points(['unknown-hook'])
+        {'unknown-hook': {}}
+        >>> found = get_all_script_entry_points(['pre-commit'])['pre-commit']
+        >>> sorted(found) == sorted(get_script_entry_points('pre-commit'))
+        True
+    """
+    groups = {script_group_name(name): name for name in hook_names}
+    result = {name: {} for name in hook_names}
+    for dist in working_set:
+        try:
+            entry_map = dist.get_entry_map()
+        except Exception:
+            continue
+        for group, entries in entry_map.items():
+            if group in groups:
+                result[groups[group]].update(entries)
+    return result
+
 def find_entry_scripts(hook_name):
     """ Find managed git hooks via the entry points for the respective hooks.
         This is done by intersecting the names in the virtual environments bin
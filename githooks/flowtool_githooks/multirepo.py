@@ -0,0 +1,222 @@
+""" Run githooks management tasks on many repositories at once.
+
+    The repositories are discovered below a directory, and then processed
+    concurrently by a pool of worker threads. The workers do not print
+    anything, but return a RepoReport each, which are then printed as one
+    aggregated report (sorted by path).
+
+    >>> reports = run_on_repos(status_report, [], workers=2)
+    >>> reports
+    []
+    >>> print_reports(reports)
+    == 0 repositories processed, 0 failed.
+    0
+"""
+import os
+import json
+import traceback
+
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+import click
+
+from flowtool.style import echo, colors
+from flowtool.python import containing
+
+from flowtool_git.common import local_repo
+
+from flowtool_githooks.manager import hook_specs
+from flowtool_githooks.inventory import gather_inventory, inventory_dict
+
+DEFAULT_WORKERS = 8
+
+RepoReport = namedtuple('RepoReport', ['path', 'ok', 'lines', 'data'])
+
+
+def guarded(func, path, kwd):
+    """ Run a report function, turning exceptions into failed reports.
+
+        >>> guarded(lambda path: RepoReport(path, True, [], None), '/', {}).ok
+        True
+        >>> report = guarded(lambda path: 1/0, '/', {})
+        >>> report.ok
+        False
+        >>> report.lines[0].startswith('ZeroDivisionError')
+        True
+    """
+    try:
+        return func(path, **kwd)
+    except (Exception, SystemExit) as ex:
+        lines = [line for line in traceback.format_exception_only(type(ex), ex)]
+        return RepoReport(path, False, [l.strip() for l in lines], None)
+
+
+def run_on_repos(func, paths, workers=None, **kwd):
+    """ Run func(path, **kwd) for all paths on a thread pool,
+        and return the RepoReports sorted by path.
+
+        >>> run_on_repos(lambda p: RepoReport(p, True, [], None), ['b', 'a'])
+        [RepoReport(path='a', ok=True, lines=[], data=None), RepoReport(path='b', ok=True, lines=[], data=None)]
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+
+    if workers is None:
+        workers = DEFAULT_WORKERS
+    workers = max(1, min(workers, len(paths)))
+
+    pool = ThreadPool(workers)
+    try:
+        reports = pool.map(lambda p: guarded(func, p, kwd), paths)
+    finally:
+        pool.close()
+        pool.join()
+
+    return sorted(reports, key=lambda r: r.path)
+
+
+def status_report(path, hooks=None):
+    """ Report the hook status of one repository.
+
+        >>> report = status_report(os.getcwd())
+        >>> report.ok
+        True
+        >>> sorted(report.data['hooks']) == sorted(hook_specs)
+        True
+    """
+    inventory = gather_inventory(path)
+    installed = {info.name: info for info in inventory.hooks}
+
+    lines = []
+    for name in sorted(hooks or hook_specs):
+        info = installed.get(name)
+        if info is None:
+            lines.append('%s: not installed' % name)
+            continue
+        state = 'enabled' if info.active else 'disabled'
+        kind = 'runner' if info.is_runner else 'foreign script'
+        scripts = inventory.scripts.get(info.runner_dir, ())
+        enabled = [s.name for s in scripts if s.executable]
+        lines.append('%s: %s %s, scripts: %s' % (
+            name, state, kind, ', '.join(enabled) if enabled else '-'
+        ))
+
+    return RepoReport(path, True, lines, inventory_dict(inventory, hooks))
+
+
+def setup_report(path, hooks=(), install=None, activate=None, yes=None, noop=None):
+    """ Install/remove and (de)activate the runner in one repository.
+
+        >>> setup_report(os.getcwd(), noop=True)
+        RepoReport(path=..., ok=True, lines=[], data=None)
+    """
+    from flowtool_githooks import runner
+
+    repo = local_repo(path)
+    prefix = 'would ' if noop else ''
+    lines = []
+
+    if install is not None:
+        for hook in hooks:
+            if install is True:
+                runner.install_runner(hook, repo=repo, noop=noop, yes=yes, quietly=True)
+                lines.append('%sinstall %s' % (prefix, hook))
+            elif os.path.exists(os.path.join(repo.git_dir, 'hooks', hook)):
+                runner.remove_runner(hook, repo=repo, noop=noop, yes=yes, quietly=True)
+                lines.append('%sremove %s' % (prefix, hook))
+
+    if activate is not None:
+        for hook in hooks:
+            if not os.path.exists(os.path.join(repo.git_dir, 'hooks', hook)):
+                lines.append('%s: not installed' % hook)
+            elif activate is True:
+                runner.activate_runner(hook, repo=repo, noop=noop, quietly=True)
+                lines.append('%sactivate %s' % (prefix, hook))
+            else:
+                runner.deactivate_runner(hook, repo=repo, noop=noop, quietly=True)
+                lines.append('%sdeactivate %s' % (prefix, hook))
+
+    return RepoReport(path, True, lines, None)
+
+
+def scripts_report(path, hook=None, patterns=(), add=None, noop=None):
+    """ Add or remove managed scripts of one repositories hook runner.
+
+        >>> scripts_report('/tmp', 'pre-commit', (), True)
+        Traceback (most recent call last):
+        ...
+        RuntimeError: need some script name patterns to add/remove
+    """
+    from flowtool_githooks.config import link_script
+
+    if not patterns:
+        raise RuntimeError('need some script name patterns to add/remove')
+
+    inventory = gather_inventory(path)
+    scripts_dir = os.path.join(inventory.git_dir, 'hooks', hook + '.d')
+    if scripts_dir not in inventory.scripts:
+        return RepoReport(path, False, ['runner dir not found: %s' % scripts_dir], None)
+
+    installed = [s.name for s in inventory.scripts[scripts_dir]]
+    available = inventory.entry_points.get(hook, ())
+    prefix = 'would ' if noop else ''
+
+    lines = []
+    if add is True:
+        matching = containing(patterns, set(available).union(installed))
+        for script in sorted(set(matching).difference(installed)):
+            noop or link_script(script, scripts_dir)
+            lines.append('%sadd %s to %s' % (prefix, script, hook))
+    elif add is False:
+        for script in sorted(set(containing(patterns, installed))):
+            noop or os.unlink(os.path.join(scripts_dir, script))
+            lines.append('%sremove %s from %s' % (prefix, script, hook))
+
+    if not lines:
+        lines.append('nothing to do for %s' % hook)
+
+    return RepoReport(path, True, lines, None)
+
+
+def print_reports(reports, as_json=None):
+    """ Print the aggregated report and return the number of failures.
+
+        >>> print_reports([RepoReport('/a', True, ['fine'], {}), RepoReport('/b', False, ['bad'], None)])
+        == /a
+           fine
+        == /b (failed)
+           bad
+        == 2 repositories processed, 1 failed.
+        1
+        >>> print_reports([RepoReport('/a', True, [], {'x': 1})], as_json=True)
+        {
+          "/a": {
+            "data": {
+              "x": 1
+            },
+            "lines": [],
+            "ok": true
+          }
+        }
+        0
+    """
+    failed = len([r for r in reports if not r.ok])
+
+    if as_json:
+        data = {r.path: dict(ok=r.ok, lines=r.lines, data=r.data) for r in reports}
+        click.echo(json.dumps(data, indent=2, sort_keys=True))
+        return failed
+
+    for report in reports:
+        if report.ok:
+            echo.white('==', colors.cyan(report.path))
+        else:
+            echo.white('==', colors.cyan(report.path), colors.red('(failed)'))
+        for line in report.lines:
+            echo.white('  ', line)
+
+    summary = '== %s repositories processed, %s failed.' % (len(reports), failed)
+    (echo.yellow if failed else echo.green)(summary)
+    return failed
@@ -11,6 +11,7 @@
         - manually launching a hook script (i.e. for testing)
 """
 import os
+import sys
 import shutil
 import filecmp
 
@@ -24,10 +25,12 @@ from flowtool.python import containing
 from flowtool.ui import abort
 from flowtool.files import make_executable, make_not_executable, is_executable
 
-from flowtool_git.common import local_repo
+from flowtool_git.common import local_repo, find_git_repos
 
 from flowtool_githooks.status import status as repo_status
 from flowtool_githooks.manager import hook_specs, RUNNER
+from flowtool_githooks.inventory import gather_inventory, inventory_json
+from flowtool_githooks import multirepo
 
 
 def run_githook(hook_name, noop=None, repo=None):
@@ -60,15 +63,26 @@ def run_githook(hook_name, noop=None, repo=None):
 @click.option('-i/-r', '--install/--remove', is_flag=True, default=None, help='Install or remove the runner script.')
 @click.option('-a/-d', '--activate/--deactivate', is_flag=True, default=None, help='Manipulate executable bit of the runner script.')
 @click.option('-s', '--status', is_flag=True, help='Print the status of the git hooks in the local repo.')
+@click.option('-j', '--json', 'as_json', is_flag=True, help='Print the status as json (implies --status).')
 @click.option('-y', '--yes', is_flag=True, help='Automaticall answer yes to the backup question.')
 @click.option('-n', '--noop', is_flag=True, help='Do not really take any action. Mainly for testing purposes.')
+@click.option('-R', '--recursive', type=click.Path(exists=True, file_okay=False), default=None, help='Operate on all git repos found below this directory.')
+@click.option('-w', '--workers', type=int, default=multirepo.DEFAULT_WORKERS, help='Number of repos processed in parallel with --recursive.')
 @click.argument('patterns', nargs=-1)
-def runner_command(patterns=(), status=None, install=None, activate=None, yes=None, noop=None, git=None):
+def runner_command(patterns=(), status=None, install=None, activate=None, yes=None, noop=None, git=None, as_json=None, recursive=None, workers=None):
     """ Manage git hooks of the local repo. """
 
+    if recursive is not None:
+        return recursive_runner(recursive, patterns, status, install, activate, yes, noop, as_json, workers)
+
     repo = local_repo(git)
     hooks = containing(patterns, hook_specs)
 
+    if as_json:
+        inventory = gather_inventory(repo)
+        click.echo(inventory_json(inventory, sorted(set(hooks)) if patterns else None))
+        return
+
     if status:
         return repo_status(repo)
 
@@ -108,8 +122,41 @@ def runner_command(patterns=(), status=None, install=None, activate=None, yes=No
                 deactivate_runner(hook, repo=repo, noop=noop)
 
 
-def remove_runner(hook_name, repo=None, noop=None, yes=None):
-    """ Install the runner as a git hook.
+def recursive_runner(path, patterns=(), status=None, install=None, activate=None, yes=None, noop=None, as_json=None, workers=None):
+    """ The --recursive mode of the runner command. All git repos below
+        path are processed in parallel, and reported on at the end.
+
+        >>> recursive_runner('/_not_/_there_')
+        == 0 repositories processed, 0 failed.
+        >>> recursive_runner('/_not_/_there_', install=False)
+        Traceback (most recent call last):
+        ...
+        SystemExit: 1
+    """
+    hooks = sorted(set(containing(patterns, hook_specs))) if patterns else sorted(hook_specs)
+
+    if install is False and not (yes or noop):
+        abort('Removing hooks recursively requires --yes.')
+
+    repos = find_git_repos(path)
+    if status or as_json or (install is None and activate is None):
+        reports = multirepo.run_on_repos(
+            multirepo.status_report, repos, workers=workers,
+            hooks=hooks,
+        )
+    else:
+        reports = multirepo.run_on_repos(
+            multirepo.setup_report, repos, workers=workers,
+            hooks=hooks, install=install, activate=activate, yes=yes, noop=noop,
+        )
+
+    if multirepo.print_reports(reports, as_json=as_json):
+        sys.exit(1)
+
+
+def remove_runner(hook_name, repo=None, noop=None, yes=None, quietly=None):
+    """ Remove the runner git hook. Without yes, a quiet removal
+        will not ask, but just not remove anything.
 
         >>> remove_runner('xxx')
         Traceback (most recent call last):
@@ -126,12 +173,13 @@ def remove_runner(hook_name, repo=None, noop=None, yes=None):
     msg = ' '.join([
         colors.bold('Remove %s?' % hook_file),
     ])
-    if yes or click.confirm(msg):
+    if yes or (not quietly and click.confirm(msg)):
         noop or os.unlink(hook_file)
 
 
-def install_runner(hook_name, repo=None, noop=None, yes=None):
+def install_runner(hook_name, repo=None, noop=None, yes=None, quietly=None):
     """ Install the runner as a git hook.
+        A quiet installation never asks, but preserves existing hooks.
 
         >>> install_runner('xxx')
         Traceback (most recent call last):
@@ -162,10 +210,10 @@ def install_runner(hook_name, repo=None, noop=None, yes=None):
             'hook.\n',
             colors.bold('Do you want to remove it?'),
         ])
-        if yes or (noop and click.confirm(msg)):
+        if yes or (noop and not quietly and click.confirm(msg)):
             noop or os.unlink(hook_file)
 
-    noop or do_install(runner_file, hook_file)
+    noop or do_install(runner_file, hook_file, quietly=quietly)
 
 
 def do_install(runner_file, hook_file, scripts_dir=None, quietly=None):
@@ -209,7 +257,7 @@ def do_install(runner_file, hook_file, scripts_dir=None, quietly=None):
     make_executable(hook_file)
 
 
-def activate_runner(hook_name, repo=None, noop=None, yes=None):
+def activate_runner(hook_name, repo=None, noop=None, yes=None, quietly=None):
     """ Activate a git hook (by making it executable).
 
         >>> activate_runner('xxx')
@@ -231,9 +279,9 @@ def activate_runner(hook_name, repo=None, noop=None, yes=None):
     hook_file = join(repo.git_dir, 'hooks', hook_name)
 
     noop or make_executable(hook_file)
-    echo.green('Activated', colors.cyan(hook_name), 'hook.')
+    quietly or echo.green('Activated', colors.cyan(hook_name), 'hook.')
 
-def deactivate_runner(hook_name, repo=None, noop=None, yes=None):
+def deactivate_runner(hook_name, repo=None, noop=None, yes=None, quietly=None):
     """ Deactivate a git hook (by making it not executable).
 
         >>> deactivate_runner('xxx')
@@ -255,4 +303,4 @@ def deactivate_runner(hook_name, repo=None, noop=None, yes=None):
     hook_file = join(repo.git_dir, 'hooks', hook_name)
 
     noop or make_not_executable(hook_file)
-    echo.green('Deactivated', colors.cyan(hook_name), 'hook.')
+    quietly or echo.green('Deactivated', colors.cyan(hook_name), 'hook.')
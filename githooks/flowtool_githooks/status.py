@@ -6,12 +6,13 @@ import click
 
 from flowtool.style import echo, colors
 from flowtool.style import debug
-from flowtool.files import is_executable
 from flowtool_git.common import local_repo
-from flowtool_githooks.manager import find_entry_scripts, gather_hooks
+from flowtool_githooks.inventory import gather_inventory
 
-def status(repo=None, file_hooks=None):
+def status(repo=None, file_hooks=None, inventory=None):
     """ Draw a nice summary of the git hook status.
+        All information is taken from one hook inventory,
+        that is gathered if not given.
 
         >>> import os
         >>> if not os.path.exists('/tmp/test.d'): os.makedirs('/tmp/test.d')
@@ -27,12 +28,12 @@ def status(repo=None, file_hooks=None):
 
     repo = local_repo(repo)
 
-    if file_hooks is None:
-        file_hooks = gather_hooks(repo)
+    if inventory is None:
+        inventory = gather_inventory(repo, file_hooks=file_hooks)
 
     echo.bold('git hooks status:')
-    echo.white('git dir', repo.git_dir)
-    for number, info in enumerate(file_hooks):
+    echo.white('git dir', inventory.git_dir)
+    for number, info in enumerate(inventory.hooks):
 
         if info.is_runner:
             effect = colors.bold
@@ -58,20 +59,19 @@ def status(repo=None, file_hooks=None):
         ])
         click.echo(hook_line.format(info=info, number=number+1))
 
-        plugin_hooks = (os.path.basename(f) for f in find_entry_scripts(info.name))
-        echo.white('Available:', colors.cyan(', '.join(sorted(plugin_hooks))))
+        plugin_hooks = inventory.available.get(info.name, ())
+        echo.white('Available:', colors.cyan(', '.join(plugin_hooks)))
 
         if info.runner_dir:
-            scripts = sorted(os.listdir(info.runner_dir))
+            scripts = inventory.scripts.get(info.runner_dir, ())
             if scripts:
                 if info.active:
                     echo.white('Installed:')
                 else:
                     echo.white('Installed, but disabled:')
             for script in scripts:
-                fname = os.sep.join([info.runner_dir, script])
-                if info.active and is_executable(fname):
+                if info.active and script.executable:
                     color = echo.green
                 else:
                     color = echo.white
-                color('  - %s' % script, color=color)
+                color('  - %s' % script.name, color=color)
@@ -136,3 +136,17 @@ def test_script_install_remove(confed_repo):
 
         assert exit_code == 0
         assert not err
+
+
+def test_listinfo_json(confed_repo):
+
+    import json
+
+    for hook in hook_specs:
+
+        exit_code, out, err = exec_click(
+            flowtool_githooks.config.manage_scripts,
+            ['--git', confed_repo.git_dir, '--json', hook],
+        )
+        assert exit_code == 0
+        assert list(json.loads(out)['hooks']) == [hook]
@@ -248,3 +248,85 @@ def test_invoke_githook(confed_repo):
     assert exit_code == 0
     assert out.startswith('Invoking commit-msg')
     assert not err
+
+
+def test_status_json(confed_repo):
+
+    import json
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--git', confed_repo.git_dir, '--json'],
+    )
+    assert exit_code == 0
+
+    data = json.loads(out)
+    assert data['git_dir'] == confed_repo.git_dir
+    assert sorted(data['hooks']) == sorted(hook_specs)
+    for hook in hook_specs:
+        assert data['hooks'][hook]['installed']
+        assert data['hooks'][hook]['is_runner']
+        assert data['hooks'][hook]['scripts_dir'].endswith(hook + '.d')
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--git', confed_repo.git_dir, '--json', 'push'],
+    )
+    assert exit_code == 0
+    assert list(json.loads(out)['hooks']) == ['pre-push']
+
+
+def test_recursive(nogit):
+
+    from git import Repo
+
+    paths = [os.path.join(nogit, name) for name in ('one', 'two', 'sub/three')]
+    for path in paths:
+        Repo.init(path)
+    Repo.init(os.path.join(paths[0], 'nested'))
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--recursive', nogit, '--install', '--workers', '2'],
+    )
+    assert exit_code == 0
+    assert '3 repositories processed, 0 failed.' in out
+    for path in paths:
+        assert path in out
+        for hook in hook_specs:
+            assert os.path.isdir(os.path.join(path, '.git', 'hooks', hook + '.d'))
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--recursive', nogit, '--deactivate', 'commit'],
+    )
+    assert exit_code == 0
+    assert out.count('deactivate') == 2 * 3
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--recursive', nogit, '--status', '--json'],
+    )
+    assert exit_code == 0
+    import json
+    data = json.loads(out)
+    assert sorted(data) == sorted(paths)
+    for path in paths:
+        assert not data[path]['data']['hooks']['pre-commit']['active']
+        assert data[path]['data']['hooks']['pre-push']['active']
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--recursive', nogit, '--remove'],
+    )
+    assert exit_code == 1
+    assert 'requires --yes' in out
+
+    exit_code, out, err = exec_click(
+        flowtool_githooks.runner.runner_command,
+        ['--recursive', nogit, '--remove', '--yes'],
+    )
+    assert exit_code == 0
+    for path in paths:
+        for hook in hook_specs:
+            assert not os.path.exists(os.path.join(path, '.git', 'hooks', hook))
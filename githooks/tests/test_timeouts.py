@@ -0,0 +1,53 @@
+import time
+
+from flowtool_githooks.managed_hooks.universal import UniversalGithook
+from flowtool_githooks.managed_hooks.universal import ErroredCheck, make_check
+from flowtool_githooks.managed_hooks.shellcommands import ShellCommandHook
+
+
+def test_timeout_kills_process_group(tmpdir):
+    marker = tmpdir.join('survived')
+    githook = ShellCommandHook()
+    githook.CHECK_TOOL = ('sh', '-c')
+    githook.TIMEOUT = 0.5
+
+    script = '(sleep 1.5; touch %s) & wait' % marker
+    start = time.time()
+    outcome = githook.run_check(githook.make_check(script))
+
+    assert time.time() - start < 1.5
+    assert type(outcome) is ErroredCheck
+    assert githook.is_returncode(outcome) == githook.TIMEOUT_RETURNCODE
+    assert 'timed out' in ' '.join(map(str, githook._fmt_checked(outcome)))
+
+    time.sleep(1.5)
+    assert not marker.check(), 'the background job should have been killed'
+
+
+def test_cpu_limit():
+    githook = ShellCommandHook()
+    githook.CHECK_TOOL = ('sh', '-c', 'ulimit -t')
+    githook.LIMITS = {'cpu': 7}
+    outcome = githook.run_check(githook.make_check())
+    assert outcome.result.stdout == '7\n'
+
+
+def test_time_budget(capsys):
+    ran = []
+    def slow(idx):
+        ran.append(idx)
+        time.sleep(0.2)
+
+    githook = UniversalGithook()
+    githook.TIME_BUDGET = 0.3
+    checks = [make_check(slow, i) for i in range(10)]
+
+    assert githook.execute_simple(checks=checks) == 0
+    assert ran == [0, 1]
+    assert 'skipping the remaining 8 checks' in capsys.readouterr().out
+
+    del ran[:]
+    githook.WORKERS = 2
+    assert githook.execute_parallel(checks=checks) == 0
+    assert 2 <= len(ran) < 10
+    assert 'time budget of 0.3s used up' in capsys.readouterr().out
@@ -0,0 +1,146 @@
+""" The pytest hook with coverage.
+"""
+import os
+import sys
+
+from flowtool.execute import run_command
+from flowtool.style import echo, colors
+from flowtool.style import debug
+
+from flowtool_githooks.managed_hooks.universal import CompletedCheck
+
+from flowtool_githooks_demo import diffcover
+from flowtool_githooks_demo import impact
+from flowtool_githooks_demo.pytest_hook import PytestHook
+
+
+class PytestCoverageHook(PytestHook):
+    """ Run the tests with coverage, and record the test impact
+        map (which tests touch which files) on the way.
+
+        Every component writes its own coverage data file (kept
+        in the git dir), these are combined (with `coverage combine`)
+        into one .coverage file in the repo root, for one coverage report.
+    """
+
+    NAME = 'coverage_hook'
+    RECORD_IMPACT = True
+
+    def data_file(self, location):
+        """ The coverage data file of a component.
+
+            >>> tst = PytestCoverageHook()
+            >>> repo_root = os.path.dirname(tst.repo.git_dir)
+            >>> os.path.basename(tst.data_file(os.path.join(repo_root, 'hooks-demo')))
+            '.coverage.hooks-demo'
+            >>> os.path.basename(tst.data_file(repo_root))
+            '.coverage.root'
+        """
+        name = self._component_name(location)
+        if name == os.curdir:
+            name = 'root'
+        return os.path.join(
+            diffcover.cache_dir(self.repo),
+            '.coverage.' + name.replace(os.sep, '-'),
+        )
+
+    def pytest_args(self, location, tests=None):
+        args = (
+            '--cov',
+            os.path.dirname(self.repo.git_dir),
+            '--cov-report=',
+        )
+        if self.RECORD_IMPACT:
+            args += ('--cov-context=test',)
+        return args + super(PytestCoverageHook, self).pytest_args(location, tests)
+
+    def pytest_env(self, location):
+        env = super(PytestCoverageHook, self).pytest_env(location)
+        env['COVERAGE_FILE'] = self.data_file(location)
+        return env
+
+    def check_func(self, location, rootdir=None, tests=None):
+        cache_dir = diffcover.cache_dir(self.repo)
+        if not os.path.isdir(cache_dir):
+            try:
+                os.mkdir(cache_dir)
+            except OSError:
+                pass  # created by another worker
+        return super(PytestCoverageHook, self).check_func(location, rootdir=rootdir, tests=tests)
+
+    def summarize(self, results=(), verbose=None):
+        returncode = super(PytestCoverageHook, self).summarize(results, verbose=verbose)
+        self.combine_coverage(self.record_coverage(results))
+        return returncode
+
+    def record_coverage(self, results):
+        """ Collect the data files of the completed runs
+            (and record the test impact from them).
+
+            >>> PytestCoverageHook().record_coverage([])
+            []
+        """
+        data_files = []
+        for outcome in results:
+            location = outcome.check.args[0]
+            data_file = self.data_file(location)
+            if type(outcome) is CompletedCheck and os.path.isfile(data_file):
+                if self.RECORD_IMPACT:
+                    self.record_impact(location, data_file, outcome.check.kwargs.get('rootdir'))
+                data_files.append(data_file)
+        return data_files
+
+    def combine_coverage(self, data_files, report=True):
+        """ Combine the per component data files (keeping them),
+            print the report, and return the combined data file.
+
+            >>> PytestCoverageHook().combine_coverage([])
+        """
+        if not data_files:
+            return
+
+        repo_root = os.path.dirname(self.repo.git_dir)
+        combined_file = os.path.join(repo_root, '.coverage')
+        env = dict(os.environ, COVERAGE_FILE=combined_file)
+        coverage = [sys.executable, '-m', 'coverage']
+
+        combined = run_command(coverage + ['combine', '--keep'] + data_files, cwd=repo_root, env=env)
+        if combined.returncode:
+            echo.yellow('coverage_hook: combine failed:', combined.stderr)
+            return
+
+        if report:
+            report = run_command(coverage + ['report'], cwd=repo_root, env=env)
+            echo.bold(colors.yellow('\n-- Coverage Report --\n'))
+            echo.white(report.stdout)
+
+        return combined_file
+
+    def record_impact(self, component_dir, data_file=None, rootdir=None):
+        """ Store the per test coverage of a components run in the impact map.
+
+            >>> PytestCoverageHook().record_impact('/tmp', data_file='/_not_/_there_')
+        """
+        if data_file is None:
+            data_file = self.data_file(component_dir)
+        if not os.path.isfile(data_file):
+            return
+
+        repo_root = os.path.dirname(self.repo.git_dir)
+        try:
+            contexts = impact.read_coverage_contexts(data_file, repo_root)
+        except Exception as ex:
+            debug.yellow('coverage_hook: no test impact recorded:', repr(ex))
+            return
+
+        index_file = impact.index_path(self.repo)
+        index = impact.load_index(index_file)
+        impact.update_component(
+            index,
+            os.path.relpath(component_dir, repo_root),
+            impact.config_stamp(component_dir, rootdir),
+            contexts,
+        )
+        impact.save_index(index, index_file)
+
+coverage_hook = PytestCoverageHook()
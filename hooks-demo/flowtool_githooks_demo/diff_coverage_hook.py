@@ -0,0 +1,127 @@
+""" The diff coverage hook.
+"""
+import os
+
+from flowtool.style import echo, colors
+from flowtool.style import debug
+
+from flowtool_githooks_demo import diffcover
+from flowtool_githooks_demo import impact
+from flowtool_githooks_demo.pytest_hook import PytestHook
+from flowtool_githooks_demo.coverage_hook import PytestCoverageHook
+
+
+class PytestDiffCoverageHook(PytestCoverageHook):
+    """ Judge only the coverage of the changed lines (of the commit, the
+        push, or the working tree in standalone mode), and fail only if
+        some of them are not covered.
+
+        The coverage data of components is reused, as long as their
+        sources, tests and all the files their tests touched are unchanged.
+
+        >>> tst = PytestDiffCoverageHook()
+        >>> tst.changed = {}
+        >>> tst.report_diff_coverage(None)
+        == diff_coverage_hook: no changed python lines.
+        0
+    """
+
+    NAME = 'diff_coverage_hook'
+    RECORD_IMPACT = False
+
+    changed = None
+    reused = ()
+
+    def _stamps_file(self):
+        return os.path.join(diffcover.cache_dir(self.repo), diffcover.STAMPS_FILE)
+
+    def component_stamp(self, component_dir, rootdir, files=()):
+        paths = [component_dir] + [
+            f for f in files if not impact.in_component(f, self._component_name(component_dir))
+        ]
+        return diffcover.source_stamp(
+            paths,
+            impact.config_stamp(component_dir, rootdir),
+            repo=self.repo,
+        )
+
+    def generate_checks(self):
+        self.changed = diffcover.changed_lines(self.run_mode, repo=self.repo)
+        if not any(f.endswith('.py') for f in self.changed):
+            return []
+
+        stamps = diffcover.load_stamps(self._stamps_file())
+        self.reused = []
+        checks = []
+        for component_dir, rootdir in sorted(self.find_components().items()):
+            entry = stamps.get(self._component_name(component_dir))
+            if (
+                entry and os.path.isfile(self.data_file(component_dir))
+                and entry['stamp'] == self.component_stamp(component_dir, rootdir, entry['files'])
+            ):
+                debug.cyan('diff_coverage: reusing', component_dir)
+                self.reused.append(component_dir)
+            else:
+                checks.append(self.make_check(component_dir, rootdir=rootdir))
+        return checks
+
+    def save_stamps(self, results):
+        """ Remember the stamps of the components that passed. """
+        stamps_file = self._stamps_file()
+        stamps = diffcover.load_stamps(stamps_file)
+        repo_root = os.path.dirname(self.repo.git_dir)
+        for outcome in results:
+            component_dir = outcome.check.args[0]
+            name = self._component_name(component_dir)
+            stamps.pop(name, None)
+            if self.is_returncode(outcome):
+                continue
+            try:
+                files = diffcover.measured_files(self.data_file(component_dir), repo_root)
+            except Exception as ex:
+                debug.yellow('diff_coverage: no data for', name, repr(ex))
+                continue
+            stamp = self.component_stamp(component_dir, outcome.check.kwargs.get('rootdir'), files)
+            if stamp is not None:
+                stamps[name] = dict(stamp=stamp, files=files)
+        if os.path.isdir(os.path.dirname(stamps_file)):
+            diffcover.save_stamps(stamps, stamps_file)
+
+    def summarize(self, results=(), verbose=None):
+        returncode = 0
+        if results:
+            returncode = PytestHook.summarize(self, results, verbose=verbose)
+            self.save_stamps(results)
+
+        if self.reused:
+            echo.white('== reused the coverage data of:', ', '.join(
+                colors.cyan(self._component_name(c)) for c in self.reused
+            ))
+
+        data_files = self.record_coverage(results)
+        data_files += [self.data_file(c) for c in self.reused]
+        combined = self.combine_coverage(data_files, report=False)
+        return self.report_diff_coverage(combined) or returncode
+
+    def report_diff_coverage(self, data_file):
+        """ Print the diff coverage and return 1 if changed lines are uncovered. """
+        if not any(f.endswith('.py') for f in self.changed or ()):
+            echo.white('==', colors.cyan(self.NAME) + ':', 'no changed python lines.')
+            return 0
+        if data_file is None:
+            echo.yellow('==', self.NAME + ':', 'no coverage data.')
+            return 1
+
+        repo_root = os.path.dirname(self.repo.git_dir)
+        result = diffcover.diff_coverage(data_file, repo_root, self.changed)
+
+        total = sum(len(lines) for lines in result.statements.values())
+        missed = sum(len(lines) for lines in result.uncovered.values())
+        echo.bold(colors.yellow('\n-- Diff Coverage: %s of %s changed lines covered --\n' % (total - missed, total)))
+        for filename, lines in sorted(result.uncovered.items()):
+            echo.yellow('{}: {}'.format(filename, diffcover.format_ranges(lines)))
+        for filename in result.unmeasured:
+            echo.white('{}: not measured'.format(colors.cyan(filename)))
+        return 1 if missed else 0
+
+diff_coverage_hook = PytestDiffCoverageHook()
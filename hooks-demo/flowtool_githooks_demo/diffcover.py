@@ -0,0 +1,206 @@
+""" Diff coverage for the coverage hook.
+
+    Instead of judging the coverage of the whole repo, only the lines
+    that are changed by a commit (or push) are looked at, and only new
+    lines that are not covered by any test count as a failure.
+
+    The changed lines are read from the zero context output of `git diff`:
+
+    >>> changed = parse_unified_diff('''diff --git a/x.py b/x.py
+    ... --- a/x.py
+    ... +++ b/x.py
+    ... @@ -1,0 +2,2 @@ def foo():
+    ... +    bar()
+    ... +    baz()
+    ... @@ -10 +13 @@
+    ... -    old
+    ... +    new
+    ... ''')
+    >>> changed
+    {'x.py': [2, 3, 13]}
+
+    To avoid measuring unchanged components again and again, the data
+    files of the components are kept in the git dir together with a stamp
+    of the sources (the blobs in the index) of the component and of all
+    the files its tests touched. The data is reused while the stamp matches.
+"""
+import os
+import re
+import json
+import hashlib
+
+from collections import namedtuple
+
+from flowtool_git.common import local_repo
+
+CACHE_DIR = 'flowtool-coverage'
+STAMPS_FILE = 'stamps.json'
+
+HUNK_REGEX = re.compile(r'^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@')
+
+DIFF_ARGS = ('-U0', '--no-color', '--no-ext-diff', '--diff-filter=ACMRTUXB')
+
+DiffCoverage = namedtuple('DiffCoverage', ['statements', 'uncovered', 'unmeasured'])
+
+
+def parse_unified_diff(text):
+    """ Map the (new) file names in a unified diff to
+        the (sorted) line numbers added or changed there.
+
+        >>> parse_unified_diff('+++ /dev/null\\n@@ -1 +0,0 @@\\n')
+        {}
+    """
+    result = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith('+++ '):
+            name = line[4:].split('\t')[0]
+            current = name[2:] if name.startswith('b/') else None
+            continue
+        match = HUNK_REGEX.match(line)
+        if match and current is not None:
+            start = int(match.group('start'))
+            count = match.group('count')
+            count = 1 if count is None else int(count)
+            if count:
+                result.setdefault(current, set()).update(range(start, start + count))
+
+    return {name: sorted(lines) for name, lines in result.items()}
+
+
+def changed_lines(run_mode='standalone', reference='origin/master', repo=None):
+    """ The changed lines of the current commit (pre-commit), push (compared
+        to reference) or of the working tree (standalone).
+
+        >>> isinstance(changed_lines(), dict)
+        True
+    """
+    repo = local_repo(repo)
+    if run_mode in ('pre-commit', 'commit-msg'):
+        args = ('--cached',)
+    elif run_mode in ('pre-push',):
+        args = (reference,)
+    else:
+        args = ('HEAD',)
+    try:
+        diff = repo.git.diff(*(DIFF_ARGS + args))
+    except Exception:
+        return {}
+    return parse_unified_diff(diff)
+
+
+def cache_dir(repo=None):
+    """ The dir where the per component data files are kept.
+
+        >>> cache_dir().endswith(CACHE_DIR)
+        True
+    """
+    return os.path.join(local_repo(repo).git_dir, CACHE_DIR)
+
+
+def source_stamp(paths, extra='', repo=None):
+    """ A stamp of the sources in paths (dirs or files), made from the
+        blob ids in the index. If there are unstaged changes, there is
+        no stamp (None), so data depending on them will not be reused.
+
+        >>> stamp = source_stamp([os.path.dirname(__file__)])
+        >>> stamp is None or len(stamp) == 40
+        True
+    """
+    repo = local_repo(repo)
+    paths = list(paths)
+    if repo.git.diff('--name-only', '--', *paths):
+        return None
+    digest = hashlib.sha1(extra.encode('utf-8'))
+    digest.update(repo.git.ls_files('-s', '--', *paths).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def measured_files(data_file, root):
+    """ The (root relative) files measured in a coverage data file. """
+    from coverage import CoverageData
+
+    data = CoverageData(basename=data_file)
+    data.read()
+    return sorted(
+        f for f in (os.path.relpath(m, root) for m in data.measured_files())
+        if not f.startswith(os.pardir)
+    )
+
+
+def load_stamps(path):
+    """ Load the stamps of the cached data files.
+
+        >>> load_stamps('/_not_/_there_')
+        {}
+    """
+    try:
+        with open(path, 'r') as fh:
+            return json.load(fh)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_stamps(stamps, path):
+    """ Save the stamps of the cached data files.
+
+        >>> save_stamps({'base': 'abc'}, '/tmp/_stamps_test.json')
+        >>> load_stamps('/tmp/_stamps_test.json')
+        {'base': 'abc'}
+        >>> os.unlink('/tmp/_stamps_test.json')
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(stamps, fh, sort_keys=True)
+    os.rename(tmp_path, path)
+
+
+def diff_coverage(data_file, root, changed):
+    """ Look up the changed lines in a coverage data file. Returns a
+        DiffCoverage with the changed executable lines (statements) and
+        the uncovered ones among them (both per file), and a list of
+        the changed python files, that were not measured at all.
+    """
+    import coverage
+
+    cov = coverage.Coverage(data_file=data_file)
+    cov.load()
+    measured = set(
+        os.path.relpath(f, root) for f in cov.get_data().measured_files()
+    )
+
+    statements = {}
+    uncovered = {}
+    unmeasured = []
+    for filename, lines in sorted(changed.items()):
+        if not filename.endswith('.py'):
+            continue
+        if filename not in measured:
+            unmeasured.append(filename)
+            continue
+        _, executable, _, missing, _ = cov.analysis2(os.path.join(root, filename))
+        changed_statements = set(lines).intersection(executable)
+        if changed_statements:
+            statements[filename] = sorted(changed_statements)
+        missed = changed_statements.intersection(missing)
+        if missed:
+            uncovered[filename] = sorted(missed)
+
+    return DiffCoverage(statements, uncovered, unmeasured)
+
+
+def format_ranges(lines):
+    """ Format line numbers as compact ranges.
+
+        >>> format_ranges([1, 2, 3, 7, 9, 10])
+        '1-3, 7, 9-10'
+    """
+    ranges = []
+    for line in lines:
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ', '.join(
+        str(a) if a == b else '%s-%s' % (a, b) for a, b in ranges
+    )
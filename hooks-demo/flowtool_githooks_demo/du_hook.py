@@ -0,0 +1,118 @@
+""" The file size hook.
+"""
+import os
+
+from flowtool.style import echo, colors
+from flowtool_git.common import GitCommandError
+from flowtool_git.objects import batch_check, changed_blobs
+
+from flowtool_githooks.discovering import file_pattern_matcher
+from flowtool_githooks.managed_hooks.shellcommands import ShellCommandHook
+from flowtool_githooks.managed_hooks.universal import ErroredCheck, CompletedCheck
+from flowtool_githooks.managed_hooks.universal import make_check
+
+
+def file_size(filename, size=None):
+    """ The size of a file in bytes, unless it is already known.
+
+        >>> file_size('/_not_/_there_', 42)
+        42
+        >>> file_size(__file__) > 0
+        True
+    """
+    if size is None:
+        size = os.stat(filename).st_size
+    return size
+
+
+class FileSizeCheck(ShellCommandHook):
+    """ A hook that checks file sizes and fails if they exceed SIZE_LIMIT.
+
+        In standalone mode the files in the working tree are stat'ed. In
+        pre-commit mode the sizes of the staged blobs, and in pre-push mode
+        the sizes of the blobs changed since REFERENCE are read from the
+        object database (with one `git cat-file --batch-check`), so what
+        is checked is what gets committed (or pushed).
+
+        >>> from click.testing import CliRunner
+        >>> runner = CliRunner()
+
+        >>> githook = du_hook
+        >>> result = runner.invoke(githook.click_command, [])
+        >>> result.exception
+        >>> result.exit_code
+        0
+        >>> output_lines = result.output.split('\\n')[:-1]
+        >>> 'will check' in output_lines[0]
+        True
+        >>> 'Size Sum:' in output_lines[-1]
+        True
+    """
+
+    NAME = 'du_hook'
+    FILE_PATTERNS = '*'
+    SIZE_LIMIT = 500 * 1024  # bytes
+    REFERENCE = 'origin/master'
+
+    def make_check(self, *args, **kwd):
+        return make_check(file_size, *args, **kwd)
+
+    def generate_checks(self):
+        """ Generate the checks, with the blob sizes for pre-commit and pre-push.
+
+            >>> tst = FileSizeCheck()
+            >>> tst.run_mode = 'pre-commit'
+            >>> all(type(c.kwargs['size']) is int for c in tst.generate_checks())
+            True
+        """
+        if self.run_mode in ('pre-commit', 'commit-msg'):
+            revisions = ('--cached',)
+        elif self.run_mode in ('pre-push',):
+            revisions = (self.REFERENCE, 'HEAD')
+        else:
+            return super(FileSizeCheck, self).generate_checks()
+
+        try:
+            blobs = changed_blobs(revisions, repo=self.repo)
+        except GitCommandError:
+            blobs = []
+
+        matches = file_pattern_matcher(self.FILE_PATTERNS)
+        blobs = [b for b in blobs if matches(b.path)]
+        if not blobs:
+            return []
+        infos = batch_check((b.object for b in blobs), repo=self.repo)
+        return [
+            self.make_check(blob.path, size=info.size)
+            for blob, info in zip(blobs, infos)
+        ]
+
+    def is_returncode(self, result):
+        if type(result) is ErroredCheck:
+            return self.EXCEPTION_RETURNCODE
+        elif type(result) is CompletedCheck:
+            return 1 if result.result > self.SIZE_LIMIT else 0
+        return 0
+
+    def _fmt_checked(self, outcome=None):
+        if type(outcome) is CompletedCheck and self.is_returncode(outcome):
+            return (
+                '== too big:', colors.yellow(outcome.check.args[0]),
+                '(%s bytes, the limit is %s)' % (outcome.result, self.SIZE_LIMIT),
+            )
+        return super(FileSizeCheck, self)._fmt_checked(outcome)
+
+    def summarize(self, results, verbose=True):
+        size_sum = 0
+        returncode = 0
+        for outcome in results:
+            if type(outcome) is CompletedCheck:
+                size_sum += outcome.result
+            if self.is_returncode(outcome):
+                returncode = 1
+                if verbose:
+                    echo.yellow(*self._fmt_checked(outcome))
+        echo.bold(colors.yellow('Size Sum: %s bytes' % size_sum))
+        return returncode
+
+du_hook = FileSizeCheck()
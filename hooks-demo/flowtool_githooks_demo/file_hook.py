@@ -0,0 +1,70 @@
+""" The file type summary hook.
+"""
+from collections import Counter
+
+from flowtool.style import echo, colors
+
+from flowtool_githooks.managed_hooks.shellcommands import ShellCommandHook
+from flowtool_githooks.managed_hooks.universal import CompletedCheck
+from flowtool_githooks.managed_hooks.universal import make_check
+
+from flowtool_githooks_demo import filetypes
+
+
+class FileContentSummary(ShellCommandHook):
+    """ A hook that checks file contents and reports a statistic about them.
+        It is an informational hook only and should never fail.
+
+        The file types are sniffed in-process (see filetypes), only the
+        files that can not be classified that way are passed to `file`
+        (all in one run, after the checks).
+
+        >>> from click.testing import CliRunner
+        >>> runner = CliRunner()
+
+        >>> githook = FileContentSummary()
+        >>> result = runner.invoke(githook.click_command, [])
+        >>> '-- File Content Statistics --' in result.output
+        True
+        >>> githook.generate_checks = lambda: iter(file_hook.generate_checks())
+        >>> result = runner.invoke(githook.click_command, [])
+        >>> '-- File Content Statistics --' in result.output
+        True
+    """
+
+    NAME = 'file_hook'
+    FILE_PATTERNS = '*'
+
+    def make_check(self, *args, **kwd):
+        return make_check(filetypes.sniff_type, *args, **kwd)
+
+    def is_returncode(self, result):
+        """ This hook never fails.
+
+            >>> from flowtool_githooks.managed_hooks.universal import ErroredCheck
+            >>> FileContentSummary().is_returncode(ErroredCheck(None, None, 1))
+            0
+        """
+        return 0
+
+    def summarize(self, results, verbose=True):
+        summary = Counter()
+        unknown = []
+        for outcome in results:
+            if type(outcome) is CompletedCheck and outcome.result is not None:
+                summary[outcome.result] += 1
+            else:
+                unknown.append(outcome.check.args[0])
+        try:
+            summary.update(filetypes.describe_files(unknown))
+        except OSError:
+            summary['unknown'] += len(unknown)
+
+        echo.bold(colors.yellow('\n-- File Content Statistics --\n'))
+        idx = None
+        for idx, (typ, cnt) in enumerate(summary.most_common()):
+            echo.white('{:-4d}. {:-4d}: {}'.format(1+idx, cnt, colors.cyan(typ)))
+        if summary:
+            echo.white()
+
+file_hook = FileContentSummary()
@@ -0,0 +1,210 @@
+""" A small in-process file type sniffer.
+
+    Only the first few KB of a file are read, and classified by a compact
+    signature table (with names like the `file` command gives them).
+    Files that can not be classified that way (None) can be handed to
+    `file` in one batch.
+
+    >>> sniff_type(__file__)
+    'ASCII text'
+    >>> try:
+    ...     sniff_type('/_not_/_there_')
+    ... except OSError:
+    ...     print('Not found.')
+    Not found.
+"""
+import os
+import stat
+import codecs
+
+from flowtool.execute import run_command
+
+BLOCK_SIZE = 4096
+
+SIGNATURES = (
+    (0, b'\x89PNG\r\n\x1a\n', 'PNG image data'),
+    (0, b'GIF87a', 'GIF image data'),
+    (0, b'GIF89a', 'GIF image data'),
+    (0, b'\xff\xd8\xff', 'JPEG image data'),
+    (0, b'%PDF-', 'PDF document'),
+    (0, b'PK\x03\x04', 'Zip archive data'),
+    (0, b'PK\x05\x06', 'Zip archive data (empty)'),
+    (0, b'\x1f\x8b', 'gzip compressed data'),
+    (0, b'BZh', 'bzip2 compressed data'),
+    (0, b'\xfd7zXZ\x00', 'XZ compressed data'),
+    (0, b'7z\xbc\xaf\x27\x1c', '7-zip archive data'),
+    (0, b'SQLite format 3\x00', 'SQLite 3.x database'),
+    (0, b'\x00asm', 'WebAssembly (wasm) binary module'),
+    (257, b'ustar', 'POSIX tar archive'),
+)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'UTF-8 Unicode (with BOM) text'),
+    (codecs.BOM_UTF32_LE, 'Unicode text, UTF-32, little-endian'),
+    (codecs.BOM_UTF32_BE, 'Unicode text, UTF-32, big-endian'),
+    (codecs.BOM_UTF16_LE, 'Unicode text, UTF-16, little-endian'),
+    (codecs.BOM_UTF16_BE, 'Unicode text, UTF-16, big-endian'),
+)
+
+INTERPRETERS = {
+    'sh': 'POSIX shell script',
+    'dash': 'POSIX shell script',
+    'bash': 'Bourne-Again shell script',
+    'zsh': "Paul Falstad's zsh script",
+    'python': 'Python script',
+    'perl': 'Perl script',
+    'ruby': 'Ruby script',
+    'node': 'Node.js script',
+}
+
+ELF_TYPES = {1: 'relocatable', 2: 'executable', 3: 'shared object', 4: 'core file'}
+
+
+def elf_type(head):
+    """ Describe an ELF header.
+
+        >>> elf_type(b'\\x7fELF\\x02\\x01' + 10 * b'\\x00' + b'\\x03\\x00')
+        'ELF 64-bit LSB shared object'
+    """
+    head = bytearray(head[:18])
+    bits = {1: '32-bit', 2: '64-bit'}.get(head[4] if len(head) > 4 else 0, '')
+    order = head[5] if len(head) > 5 else 0
+    endian = {1: 'LSB', 2: 'MSB'}.get(order, '')
+    kind = ''
+    if len(head) >= 18:
+        low, high = head[16:18]
+        kind = ELF_TYPES.get(low + 256 * high if order == 1 else 256 * low + high, '')
+    return ' '.join(filter(None, ['ELF', bits, endian, kind]))
+
+
+def interpreter(line):
+    """ The name of the interpreter in a shebang line.
+
+        >>> interpreter(b'#!/usr/bin/env python3')
+        'python3'
+        >>> interpreter(b'#! /bin/sh -e')
+        'sh'
+        >>> interpreter(b'#!')
+    """
+    words = line[2:].decode('utf-8', 'replace').split()
+    if words and os.path.basename(words[0]) == 'env':
+        words = [w for w in words[1:] if not w.startswith('-')]
+    if words:
+        return os.path.basename(words[0])
+
+
+def script_type(name):
+    """ Describe a script by its interpreter.
+
+        >>> script_type('python2.7')
+        'Python script'
+        >>> script_type('tclsh')
+        'tclsh script'
+    """
+    base = name.rstrip('0123456789.')
+    return INTERPRETERS.get(base, INTERPRETERS.get(name, '%s script' % name))
+
+
+def text_type(head, complete=True):
+    """ Describe text content, or return None if it does not look like text.
+        If the head is not complete, a multibyte character may be cut off.
+
+        >>> text_type(b'hello\\n')
+        'ASCII text'
+        >>> text_type(u'h\\xe4llo\\r\\n'.encode('utf-8'))
+        'UTF-8 Unicode text, with CRLF line terminators'
+        >>> text_type(u'h\\xe4llo'.encode('utf-8')[:2], complete=False)
+        'UTF-8 Unicode text'
+        >>> text_type(b'\\x00\\x01')
+    """
+    for bom, name in BOMS:
+        if head.startswith(bom):
+            return name
+    if b'\x00' in head:
+        return None
+
+    try:
+        head.decode('ascii')
+        name = 'ASCII text'
+    except UnicodeDecodeError:
+        name = None
+        for cut in range(1 if complete else 4):
+            try:
+                head[:len(head) - cut].decode('utf-8')
+                name = 'UTF-8 Unicode text'
+                break
+            except UnicodeDecodeError:
+                pass
+    if name is None:
+        return None
+    if b'\r\n' in head:
+        name += ', with CRLF line terminators'
+    return name
+
+
+def classify(head, executable=False, complete=True):
+    """ Classify the head of a file, return None if unknown.
+
+        >>> classify(b'')
+        'empty'
+        >>> classify(b'\\x89PNG\\r\\n\\x1a\\n...')
+        'PNG image data'
+        >>> classify(b'#!/bin/bash\\necho\\n', executable=True)
+        'Bourne-Again shell script, ASCII text executable'
+        >>> classify(b'\\xca\\xfe\\xba\\xbe\\x00')
+    """
+    if not head:
+        return 'empty'
+
+    if head.startswith(b'\x7fELF'):
+        return elf_type(head)
+
+    for offset, magic, name in SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return name
+
+    text = text_type(head, complete=complete)
+    if text is None:
+        return None
+
+    if head.startswith(b'#!'):
+        name = interpreter(head.split(b'\n', 1)[0])
+        if name:
+            text = '%s, %s' % (script_type(name), text)
+
+    if executable:
+        text += ' executable'
+    return text
+
+
+def sniff_type(filename, block_size=BLOCK_SIZE):
+    """ Read the head of a file and classify it (None if unknown). """
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        info = os.fstat(fd)
+        if stat.S_ISDIR(info.st_mode):
+            return 'directory'
+        head = os.read(fd, block_size)
+    finally:
+        os.close(fd)
+    executable = bool(info.st_mode & stat.S_IXUSR)
+    return classify(head, executable=executable, complete=info.st_size <= len(head))
+
+
+def describe_files(filenames):
+    """ Describe files with one run of `file -b -f -`,
+        return a list of the descriptions (in order).
+
+        >>> describe_files([])
+        []
+        >>> describe_files(['/bin/ls'])[0].startswith('ELF')
+        True
+    """
+    filenames = list(filenames)
+    if not filenames:
+        return []
+    result = run_command(['file', '-b', '-f', '-'], input='\n'.join(filenames) + '\n')
+    descriptions = result.stdout.splitlines()
+    if len(descriptions) != len(filenames):
+        descriptions = ['data'] * len(filenames)
+    return [d.strip() for d in descriptions]
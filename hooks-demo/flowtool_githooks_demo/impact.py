@@ -0,0 +1,222 @@
+""" Test impact analysis for the pytest hooks.
+
+    The coverage hook records which tests touched which files (using the
+    dynamic contexts of coverage.py), and stores that as a compact map in
+    the git dir. The impact hook then selects only the tests that touch
+    the files of a commit (or push).
+
+    The index holds one entry per component (directory of a pytest.ini or
+    tox.ini, relative to the repo root), each with a list of test ids and
+    a mapping from (repo relative) file names to indices into that list:
+
+    >>> index = {}
+    >>> update_component(index, 'base', 'stamp', {
+    ...     'base/flowtool/files.py': ['tests/test_files.py::test_cd|run'],
+    ...     'base/flowtool/ui.py': ['tests/test_ui.py::test_abort|run', ''],
+    ... })
+    >>> index['base']['tests']
+    ['tests/test_files.py::test_cd', 'tests/test_ui.py::test_abort']
+    >>> select_tests(index, 'base', 'stamp', ['base/flowtool/ui.py', 'README'])
+    ['tests/test_ui.py::test_abort']
+
+    A stale map (or a change in the test configuration) selects everything:
+
+    >>> select_tests(index, 'base', 'other_stamp', ['base/flowtool/ui.py']) is None
+    True
+    >>> select_tests(index, 'base', 'stamp', ['base/tests/conftest.py']) is None
+    True
+"""
+import os
+import json
+import hashlib
+
+from flowtool_git.common import local_repo
+
+INDEX_FILE = 'flowtool-test-impact.json'
+INDEX_VERSION = 1
+
+CONFIG_FILES = frozenset([
+    'pytest.ini', 'tox.ini', 'setup.cfg', 'setup.py', 'conftest.py', 'requirements.txt',
+])
+
+CONTEXT_PHASES = ('|setup', '|run', '|teardown')
+
+
+def index_path(repo=None):
+    """ The location of the impact index (inside the git dir).
+
+        >>> index_path().endswith(INDEX_FILE)
+        True
+    """
+    return os.path.join(local_repo(repo).git_dir, INDEX_FILE)
+
+
+def load_index(path=None):
+    """ Load the impact index. A missing, broken or outdated index
+        gives an empty one.
+
+        >>> load_index('/_not_/_there_')
+        {}
+    """
+    if path is None:
+        path = index_path()
+    try:
+        with open(path, 'r') as fh:
+            data = json.load(fh)
+    except (IOError, OSError, ValueError):
+        return {}
+    if data.get('version') != INDEX_VERSION:
+        return {}
+    return data.get('components', {})
+
+
+def save_index(index, path=None):
+    """ Save the impact index, replacing the old one atomically.
+
+        >>> save_index({'x': {'stamp': 's', 'tests': [], 'files': {}}}, '/tmp/_impact_test.json')
+        >>> load_index('/tmp/_impact_test.json')['x']['stamp']
+        's'
+        >>> os.unlink('/tmp/_impact_test.json')
+    """
+    if path is None:
+        path = index_path()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(
+            dict(version=INDEX_VERSION, components=index),
+            fh, separators=(',', ':'), sort_keys=True,
+        )
+    os.rename(tmp_path, path)
+
+
+def context_test_id(context):
+    """ Extract the pytest node id from a coverage context.
+
+        >>> context_test_id('tests/test_ui.py::test_abort|run')
+        'tests/test_ui.py::test_abort'
+        >>> context_test_id('')
+    """
+    for phase in CONTEXT_PHASES:
+        if context.endswith(phase):
+            context = context[:-len(phase)]
+            break
+    return context or None
+
+
+def config_stamp(component_dir, config_dir=None):
+    """ A checksum over the test configuration files of a component
+        (in the component dir, its tests dir and the dir of the
+        pytest configuration, if that is another one).
+
+        >>> config_stamp('/_not_/_there_') == config_stamp('/_not_/_there_either_')
+        True
+    """
+    locations = [component_dir, os.path.join(component_dir, 'tests')]
+    if config_dir is not None and config_dir != component_dir:
+        locations.insert(0, config_dir)
+
+    digest = hashlib.sha1()
+    for loc in locations:
+        for name in sorted(CONFIG_FILES):
+            filename = os.path.join(loc, name)
+            if os.path.isfile(filename):
+                digest.update(os.path.relpath(filename, component_dir).encode('utf-8'))
+                with open(filename, 'rb') as fh:
+                    digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def update_component(index, component, stamp, contexts_by_file):
+    """ Store the map for one component in the index.
+        contexts_by_file maps repo relative file names
+        to the coverage contexts that touched them.
+    """
+    tests = set()
+    files = {}
+    for filename, contexts in contexts_by_file.items():
+        ids = set(filter(None, map(context_test_id, contexts)))
+        if ids:
+            files[filename] = ids
+            tests.update(ids)
+
+    ordered = sorted(tests)
+    position = {name: idx for idx, name in enumerate(ordered)}
+    index[component] = dict(
+        stamp=stamp,
+        tests=ordered,
+        files={f: sorted(position[t] for t in ids) for f, ids in files.items()},
+    )
+
+
+def read_coverage_contexts(data_file, root):
+    """ Read the per file contexts from a coverage data file, with
+        file names relative to root. Requires coverage>=5 and a
+        run with dynamic contexts (i.e. pytest --cov-context=test).
+    """
+    from coverage import CoverageData
+
+    data = CoverageData(basename=data_file)
+    data.read()
+
+    result = {}
+    for filename in data.measured_files():
+        relative = os.path.relpath(filename, root)
+        if relative.startswith(os.pardir):
+            continue
+        contexts = set()
+        for line_contexts in data.contexts_by_lineno(filename).values():
+            contexts.update(line_contexts)
+        result[relative] = contexts
+    return result
+
+
+def is_config_file(filename):
+    """ Does a change of this file invalidate the test selection?
+
+        >>> is_config_file('base/tests/conftest.py')
+        True
+        >>> is_config_file('base/flowtool/files.py')
+        False
+    """
+    return os.path.basename(filename) in CONFIG_FILES
+
+
+def in_component(filename, component):
+    """ Check if a repo relative file name belongs to a component.
+
+        >>> in_component('base/flowtool/files.py', 'base')
+        True
+        >>> in_component('base/flowtool/files.py', '.')
+        True
+        >>> in_component('basement/x.py', 'base')
+        False
+    """
+    return component in ('', os.curdir) or filename.startswith(component + os.sep)
+
+
+def select_tests(index, component, stamp, changed_files):
+    """ Select the tests of a component, that are affected by changed_files.
+        Returns None if all tests have to run, because the map is missing
+        or stale, the test configuration changed, or a changed python file
+        of the component is not in the map at all.
+    """
+    entry = index.get(component)
+    if not entry or entry.get('stamp') != stamp:
+        return None
+
+    known = set()
+    for other in index.values():
+        known.update(other['files'])
+
+    selected = set()
+    for filename in changed_files:
+        mine = in_component(filename, component)
+        if mine and is_config_file(filename):
+            return None
+        if filename in entry['files']:
+            selected.update(entry['files'][filename])
+        elif mine and filename.endswith('.py') and filename not in known:
+            return None
+
+    tests = entry['tests']
+    return sorted(tests[idx] for idx in selected)
@@ -0,0 +1,132 @@
+""" The pre-push guard for large and binary objects.
+"""
+from collections import namedtuple
+
+from flowtool.style import echo, colors
+from flowtool_git.common import GitCommandError
+from flowtool_git.objects import reachable_blobs, introducing_commits, NULL_OBJECT
+
+from flowtool_githooks.discovering import file_pattern_matcher
+from flowtool_githooks.managed_hooks.universal import ErroredCheck, CompletedCheck
+from flowtool_githooks.managed_hooks.universal import UniversalGithook
+
+
+PushedObject = namedtuple('PushedObject', ['path', 'object', 'size', 'reason', 'commit'])
+
+class PushedObjectsGuard(UniversalGithook):
+    """ A pre-push hook that looks at every blob in the pushed commits,
+        including those added and deleted again in intermediate commits,
+        and fails on blobs bigger than SIZE_LIMIT or matching one of the
+        BINARY_PATTERNS. For each of them, the commit that introduced it
+        is reported.
+
+        The objects are streamed from `git rev-list --objects` through
+        `git cat-file --batch-check`, so only the findings are kept in
+        memory. In standalone mode, the commits not on any remote are checked.
+
+        >>> tst = PushedObjectsGuard()
+        >>> tst.stdin = 'refs/heads/x %s refs/heads/x %s\\n' % ('a' * 40, NULL_OBJECT)
+        >>> tst.run_mode = 'pre-push'
+        >>> tst.generate_checks()[0].args
+        ('refs/heads/x', 'aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa', '--not', '--remotes')
+    """
+
+    NAME = 'object_guard_hook'
+    SIZE_LIMIT = 1024 * 1024  # bytes
+    BINARY_PATTERNS = (
+        '*.exe', '*.dll', '*.so', '*.dylib', '*.a', '*.o', '*.pyc', '*.class',
+        '*.jar', '*.war', '*.whl', '*.egg', '*.zip', '*.tar', '*.gz', '*.tgz',
+        '*.bz2', '*.xz', '*.7z', '*.rar', '*.iso', '*.dmg', '*.bin',
+    )
+    CONTINUES = 1000
+
+    def push_ranges(self):
+        """ A (name, revisions...) tuple per pushed ref (from stdin). """
+        if self.run_mode != 'pre-push':
+            return [('HEAD', 'HEAD', '--not', '--remotes')]
+
+        ranges = []
+        for line in (self.stdin or '').splitlines():
+            fields = line.split()
+            if len(fields) != 4:
+                continue
+            local_ref, local_sha, remote_ref, remote_sha = fields
+            if local_sha == NULL_OBJECT:
+                continue  # a deletion
+            if remote_sha == NULL_OBJECT or not self._has_object(remote_sha):
+                ranges.append((local_ref, local_sha, '--not', '--remotes'))
+            else:
+                ranges.append((local_ref, local_sha, '^' + remote_sha))
+        return ranges
+
+    def _has_object(self, sha):
+        try:
+            self.repo.git.cat_file('-e', sha)
+            return True
+        except GitCommandError:
+            return False
+
+    def generate_checks(self):
+        return [self.make_check(*r) for r in self.push_ranges()]
+
+    def flag(self, info, matches=None):
+        """ Why a blob is flagged (or None).
+
+            >>> from flowtool_git.objects import ObjectInfo
+            >>> PushedObjectsGuard().flag(ObjectInfo('x', 'blob', 10, 'dist/tool.exe'))
+            'binary'
+            >>> PushedObjectsGuard().flag(ObjectInfo('x', 'blob', 10, 'README'))
+        """
+        if matches is None:
+            matches = file_pattern_matcher(self.BINARY_PATTERNS)
+        if info.size > self.SIZE_LIMIT:
+            return 'size'
+        if info.rest and matches(info.rest):
+            return 'binary'
+
+    def check_func(self, name, *revisions):
+        """ Check the blobs reachable from revisions, return the findings. """
+        matches = file_pattern_matcher(self.BINARY_PATTERNS)
+        findings = {}
+        for info in reachable_blobs(revisions, repo=self.repo):
+            reason = self.flag(info, matches)
+            if reason and info.object not in findings:
+                findings[info.object] = PushedObject(info.rest, info.object, info.size, reason, None)
+
+        commits = introducing_commits(findings, revisions, repo=self.repo)
+        return sorted(
+            f._replace(commit=commits.get(f.object)) for f in findings.values()
+        )
+
+    def is_returncode(self, outcome):
+        if type(outcome) is CompletedCheck:
+            return 1 if outcome.result else 0
+        return super(PushedObjectsGuard, self).is_returncode(outcome)
+
+    def _fmt_finding(self, finding):
+        reason = 'binary' if finding.reason == 'binary' else 'too big'
+        commit = finding.commit[:10] if finding.commit else 'unknown commit'
+        return '{} ({}, {} bytes) from {}'.format(
+            colors.yellow(finding.path), reason, finding.size, colors.cyan(commit),
+        )
+
+    def _fmt_checked(self, outcome=None):
+        name = outcome.check.args[0]
+        if type(outcome) is CompletedCheck and outcome.result:
+            lines = ['== %s: %s objects rejected:' % (name, len(outcome.result))]
+            lines.extend('   ' + self._fmt_finding(f) for f in outcome.result)
+            return ('\n'.join(lines),)
+        elif type(outcome) is ErroredCheck:
+            return ('== errored:', colors.yellow(name), outcome.exc_info[1])
+        return ('==', colors.cyan(name), 'passed.')
+
+    def summarize(self, results=(), verbose=None):
+        returncode = 0
+        for outcome in results:
+            if self.is_returncode(outcome):
+                returncode = 1
+                if verbose:
+                    echo.yellow(*self._fmt_checked(outcome))
+        return returncode
+
+object_guard_hook = PushedObjectsGuard()
@@ -0,0 +1,92 @@
+""" The pylint hook.
+"""
+import os
+import sys
+
+from flowtool_githooks.managed_hooks.shellcommands import ShellCommandHook
+from flowtool_githooks.managed_hooks.shellcommands import capture_command
+
+
+minimal_pylint_checks = [
+    'access-member-before-definition',
+    'assert-on-tuple',
+    'bad-context-manager',
+    'bad-except-order',
+    'bad-indentation',
+    'bad-open-mode',
+    'bad-reversed-sequence',
+    'cyclic-import',
+    'dangerous-default-value',
+    'duplicate-argument-name',
+    'format-combined-specification',
+    'function-redefined',
+    'init-is-generator',
+    'invalid-sequence-index',
+    'invalid-slice-index',
+    'method-hidden',
+    'missing-format-argument-key',
+    'missing-format-attribute',
+    'missing-reversed-argument',
+    'mixed-indentation',
+    'no-method-argument',
+    'no-self-argument',
+    'no-value-for-parameter',
+    'nonexistent-operator',
+    'not-in-loop',
+    'pointless-statement',
+    'pointless-string-statement',
+    'redundant-keyword-arg',
+    'reimported',
+    'return-arg-in-generator',
+    'return-in-init',
+    'return-outside-function',
+    'super-init-not-called',
+    'syntax-error',
+    'too-few-format-args',
+    'too-many-format-args',
+    'too-many-function-args',
+    'undefined-variable',
+    'unexpected-keyword-arg',
+    'unused-format-string-argument',
+    'unused-variable',
+    'useless-else-on-loop',
+    'yield-outside-function',
+]
+
+PYLINT = os.path.join(os.path.dirname(sys.executable), 'pylint')
+
+def make_pylint_cfg(self=None):
+    """ Produce a pylint config as a string. """
+
+    config_content = capture_command(
+        PYLINT,
+        '--enable=%s' % ','.join(minimal_pylint_checks),
+        '--persistent=no',
+        '--reports=no',
+        '--generate-rcfile'
+    ).stdout
+    return config_content
+
+class PylintHook(ShellCommandHook):
+    """ An integration for pylint. """
+
+    NAME = 'pylint_hook'
+    CHECK_TOOL = (
+        PYLINT,
+        '--errors-only',
+        '--rcfile',
+        '>managed_config<',
+        '--output-format=json',
+    )
+    GITCONFIG_SECTION = 'pylint-minimal'
+    CONFIGFILE_GITCFGKEY = 'configfile'
+    CONFIGFILE = '.pylint-minimal.cfg'
+    DEFAULT_CONFIGFILE = make_pylint_cfg
+    FILE_PATTERNS = ('*.py',)
+    FINDINGS_FORMAT = 'pylint-json'
+    RETURNCODE_ON_STDOUT = 1
+    RETURNCODE_ON_STDERR = 2
+    CONTINUES = 4
+
+
+pylint_hook = PylintHook()
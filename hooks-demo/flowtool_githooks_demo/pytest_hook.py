@@ -0,0 +1,187 @@
+""" The pytest hook.
+"""
+import multiprocessing
+import os
+import sys
+
+from flowtool.execute import run_command
+from flowtool.style import echo, colors
+
+from flowtool_githooks.discovering import find_file_patterns_in_project
+from flowtool_githooks.managed_hooks.universal import ErroredCheck, CompletedCheck
+from flowtool_githooks.managed_hooks.universal import UniversalGithook
+
+
+def pytest_command(*args):
+    """ The command line to run pytest with the current python.
+
+        >>> pytest_command('-q')[1:]
+        ['-m', 'pytest', '-q']
+    """
+    return [sys.executable, '-m', 'pytest'] + list(args)
+
+
+def last_line(text):
+    """ The last non-empty line of a text (i.e. the pytest summary).
+
+        >>> last_line('== 1 passed ==\\n\\n')
+        '== 1 passed =='
+        >>> last_line('')
+        ''
+    """
+    lines = [l for l in text.splitlines() if l.strip()]
+    return lines[-1].strip() if lines else ''
+
+
+class PytestHook(UniversalGithook):
+    """ Run the tests of every component of the repo.
+
+        Components are the dirs with a setup.py below a pytest
+        configuration (pytest.ini or tox.ini), or the configuration
+        dirs themselves, if there are none. Every component is tested
+        in its own pytest process, started in the configuration dir
+        (like `py.test base` would be), so no module state can leak
+        between them. The processes run concurrently.
+
+        >>> tst = PytestHook()
+        >>> components = tst.find_components()
+        >>> repo_root = os.path.dirname(tst.repo.git_dir)
+        >>> os.path.join(repo_root, 'base') in components
+        True
+        >>> components[os.path.join(repo_root, 'base')] == repo_root
+        True
+    """
+
+    NAME = 'pytest_hook'
+    FILE_PATTERNS = ('pytest.ini', 'tox.ini')
+    COMPONENT_PATTERNS = ('setup.py',)
+    PYTEST_ARGS = ('--doctest-ignore-import-errors', '-p', 'no:cacheprovider')
+    PASSING_RETURNCODES = (0, 5)  # 5: no tests collected
+    WORKERS = multiprocessing.cpu_count()
+    CONTINUES = 1000
+
+    def find_components(self):
+        """ Map the component dirs to the dir of their pytest configuration. """
+        config_dirs = sorted(set(
+            os.path.dirname(f) for f in
+            find_file_patterns_in_project(self.FILE_PATTERNS, repo=self.repo)
+        ))
+        packages = sorted(set(
+            os.path.dirname(f) for f in
+            find_file_patterns_in_project(self.COMPONENT_PATTERNS, repo=self.repo)
+        ))
+
+        components = {}
+        for config_dir in config_dirs:
+            inside = [
+                p for p in packages
+                if p == config_dir or p.startswith(config_dir + os.sep)
+            ]
+            for component_dir in inside or [config_dir]:
+                components[component_dir] = config_dir
+        return components
+
+    def generate_checks(self):
+        """ One check per component (in standalone mode all of them,
+            otherwise those with a changed pytest configuration).
+        """
+        components = self.find_components()
+        if self.run_mode == 'standalone':
+            return [self.make_check(c, rootdir=r) for c, r in sorted(components.items())]
+
+        changed_configs = set(
+            os.path.dirname(c.args[0]) for c in
+            super(PytestHook, self).generate_checks()
+        )
+        return [
+            self.make_check(c, rootdir=r) for c, r in sorted(components.items())
+            if r in changed_configs
+        ]
+
+    def pytest_args(self, location, tests=None):
+        if tests is None:
+            return self.PYTEST_ARGS + (location,)
+        return self.PYTEST_ARGS + tuple(tests)
+
+    def pytest_env(self, location):
+        return dict(os.environ)
+
+    def check_func(self, location, rootdir=None, tests=None):
+        """ Run pytest on a component (or some of its tests)
+            in a subprocess, and return the CompletedCommand.
+            A pytest run that exceeds the TIMEOUT is killed.
+        """
+        return run_command(
+            pytest_command(*self.pytest_args(location, tests)),
+            cwd=rootdir or location,
+            env=self.pytest_env(location),
+            timeout=self.TIMEOUT,
+        )
+
+    def is_returncode(self, outcome):
+        """ Evaluate the outcome of a pytest run.
+
+            >>> tst = PytestHook()
+            >>> from flowtool.execute import CompletedCommand
+            >>> from flowtool_githooks.managed_hooks.universal import make_check
+            >>> tst.is_returncode(CompletedCheck(make_check(), CompletedCommand([], 5, '', '')))
+            0
+            >>> tst.is_returncode(CompletedCheck(make_check(), CompletedCommand([], 1, '', '')))
+            1
+        """
+        if type(outcome) is CompletedCheck:
+            returncode = outcome.result.returncode
+            return 0 if returncode in self.PASSING_RETURNCODES else returncode
+        return super(PytestHook, self).is_returncode(outcome)
+
+    def _component_name(self, location):
+        return os.path.relpath(location, os.path.dirname(self.repo.git_dir))
+
+    def _msg_simple_check_start(self, check=None, **kwd):
+        echo.white('== testing:', colors.cyan(self._component_name(check.args[0])), **kwd)
+
+    def _fmt_checked(self, outcome=None):
+        name = colors.cyan(self._component_name(outcome.check.args[0]))
+        if type(outcome) is ErroredCheck:
+            return ('== errored:', name, outcome.exc_info[0], outcome.exc_info[1])
+        result = outcome.result
+        if self.is_returncode(outcome):
+            msg = ('== failed:', name, '\n\n', result.stdout)
+            if result.stderr:
+                msg += ('\n', colors.yellow(result.stderr))
+            return msg
+        return ('==', name, 'passed:', last_line(result.stdout))
+
+    def summarize(self, results=(), verbose=None):
+        """ Show the failed runs (if verbose) and then one summary line per component.
+
+            >>> from flowtool.execute import CompletedCommand
+            >>> from flowtool_githooks.managed_hooks.universal import make_check
+            >>> tst = PytestHook()
+            >>> tst.summarize([CompletedCheck(make_check(None, '/comp'), CompletedCommand([], 0, '= 2 passed =', ''))])
+            <BLANKLINE>
+            -- pytest: 1 of 1 components passed --
+            ... = 2 passed =
+            0
+        """
+        returncode = 0
+        if verbose:
+            for outcome in results:
+                if self.is_returncode(outcome):
+                    echo.white(*self._fmt_checked(outcome))
+
+        passed = [o for o in results if not self.is_returncode(o)]
+        echo.bold(colors.yellow('\n-- pytest: %s of %s components passed --' % (len(passed), len(results))))
+        for outcome in results:
+            name = self._component_name(outcome.check.args[0])
+            if type(outcome) is ErroredCheck:
+                echo.yellow('{:>16}: errored ({})'.format(name, outcome.exc_info[1]))
+                returncode = 1
+            elif self.is_returncode(outcome):
+                echo.yellow('{:>16}: {}'.format(name, last_line(outcome.result.stdout)))
+                returncode = 1
+            else:
+                echo.white('{:>16}: {}'.format(name, last_line(outcome.result.stdout)))
+        return returncode
+
+pytest_hook = PytestHook()
@@ -0,0 +1,60 @@
+""" The pytest hook, that runs only the affected tests.
+"""
+import os
+
+from flowtool.style import debug
+
+from flowtool_githooks.discovering import find_added_file_patterns
+from flowtool_githooks.discovering import find_changed_file_patterns
+
+from flowtool_githooks_demo import impact
+from flowtool_githooks_demo.pytest_hook import PytestHook
+
+
+class PytestImpactHook(PytestHook):
+    """ Run only the tests that are affected by a commit (or push).
+
+        The affected tests are looked up in the test impact map, that is
+        recorded by the coverage hook. Components, for which the map is
+        missing or stale, or whose test configuration changed, are tested
+        completely. In standalone mode all tests are run.
+
+        >>> tst = PytestImpactHook()
+        >>> tst.run_mode = 'pre-push'
+        >>> checks = tst.generate_checks()
+        >>> all(c.func == tst.check_func for c in checks)
+        True
+    """
+
+    NAME = 'pytest_impact_hook'
+
+    def changed_files(self):
+        if self.run_mode in ('pre-commit', 'commit-msg'):
+            return find_added_file_patterns('*', repo=self.repo)
+        elif self.run_mode in ('pre-push',):
+            return find_changed_file_patterns('*', repo=self.repo)
+
+    def generate_checks(self):
+        changed = self.changed_files()
+        if changed is None:
+            return super(PytestImpactHook, self).generate_checks()
+
+        repo_root = os.path.dirname(self.repo.git_dir)
+        index = impact.load_index(impact.index_path(self.repo))
+
+        checks = []
+        for component_dir, rootdir in sorted(self.find_components().items()):
+            tests = impact.select_tests(
+                index,
+                os.path.relpath(component_dir, repo_root),
+                impact.config_stamp(component_dir, rootdir),
+                changed,
+            )
+            debug.cyan('impact:', component_dir, tests)
+            if tests is None:
+                checks.append(self.make_check(component_dir, rootdir=rootdir))
+            elif tests:
+                checks.append(self.make_check(component_dir, rootdir=rootdir, tests=tests))
+        return checks
+
+pytest_impact_hook = PytestImpactHook()
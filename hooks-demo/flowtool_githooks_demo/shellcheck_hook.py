@@ -0,0 +1,17 @@
+""" The shellcheck hook.
+"""
+from flowtool_githooks.managed_hooks.shellcommands import ShellCommandHook
+
+
+class ShellCheckHook(ShellCommandHook):
+    """ An integration for shellcheck. """
+
+    NAME = 'shellcheck_hook'
+    CHECK_TOOL = ('shellcheck', '--format=json1')
+    FILE_PATTERNS = ('*.sh',)
+    FINDINGS_FORMAT = 'shellcheck-json1'
+    RETURNCODE_ON_STDOUT = 1
+    RETURNCODE_ON_STDERR = 2
+    CONTINUES = 4
+
+shellcheck_hook = ShellCheckHook()
@@ -0,0 +1,95 @@
+""" The yamllint hook.
+"""
+import io
+import os
+import sys
+
+from flowtool.execute import CompletedCommand
+
+from flowtool_githooks.managed_hooks.shellcommands import ShellCommandHook
+
+
+YAMLLINT_DEFAULT_CONFIG = '''---
+
+extends: default
+
+rules:
+    line-length: disable
+    comments: disable
+'''
+
+class YAMLLintHook(ShellCommandHook):
+    """ A linter integration for yamllint.
+
+        If yamllint can be imported, the files are linted in-process, with
+        the config file parsed only once per run. Otherwise the yamllint
+        command is run for every file. Both give the parsable format.
+
+        >>> tst = YAMLLintHook()
+        >>> config = '/tmp/_yamllint_cfg_test.yaml'
+        >>> tst.create_configfile(config)
+        >>> tst.get_configfile = lambda do_setup=None: config
+        >>> outcome = tst.run_check(tst.make_check('/tmp/_yamllint_cfg_test.yaml'))
+        >>> tst.is_returncode(outcome)
+        0
+        >>> tst.cleanup_configfile(config)
+    """
+
+    NAME = 'yamllint_hook'
+    CHECK_TOOL = (
+        os.path.join(os.path.dirname(sys.executable), 'yamllint'),
+        '--format',
+        'parsable',
+        '--config-file',
+        '>managed_config<',
+    )
+    FILE_PATTERNS = ('*.yaml', '*.yml')
+    FINDINGS_FORMAT = 'yamllint-parsable'
+    RETURNCODE_ON_STDOUT = 1
+    RETURNCODE_ON_STDERR = 2
+    CONTINUES = 4
+    GITCONFIG_SECTION = 'yamllint-hook'
+    CONFIGFILE_GITCFGKEY = 'configfile'
+    CONFIGFILE = '.yamllint.yaml'
+    DEFAULT_CONFIGFILE = YAMLLINT_DEFAULT_CONFIG
+
+    def in_process_func(self):
+        try:
+            import yamllint.linter
+            import yamllint.config
+        except ImportError:
+            return None
+        return self.lint_in_process
+
+    def yamllint_config(self):
+        """ The parsed yamllint config, loaded once (per config file and mtime). """
+        from yamllint.config import YamlLintConfig
+
+        config_file = self.get_configfile(do_setup=True)
+        key = (config_file, os.stat(config_file).st_mtime)
+        if getattr(self, '_yamllint_config', (None, None))[0] != key:
+            self._yamllint_config = (key, YamlLintConfig(file=config_file))
+        return self._yamllint_config[1]
+
+    def lint_in_process(self, tool, *filenames):
+        """ Lint files like `yamllint --format parsable` would. """
+        from yamllint import linter
+
+        config = self.yamllint_config()
+        lines = []
+        returncode = 0
+        for filename in filenames:
+            if config.is_file_ignored(filename):
+                continue
+            with io.open(filename, newline='') as fh:
+                for problem in linter.run(fh, config, filename):
+                    lines.append('{}:{}:{}: [{}] {}'.format(
+                        filename, problem.line, problem.column,
+                        problem.level, problem.message,
+                    ))
+                    if problem.level == 'error':
+                        returncode = 1
+        stdout = ''.join(line + '\n' for line in lines)
+        return CompletedCommand([tool] + list(filenames), returncode, stdout, '')
+
+yamllint_hook = YAMLLintHook()
@@ -79,40 +79,49 @@ setup_args.update(
 setup_args.update(
     entry_points={
         'console_scripts': [
-            '_flowtool_githooks.pylint = flowtool_githooks_demo.hooks:pylint_hook.click_command',
-            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.hooks:shellcheck_hook.click_command',
-            '_flowtool_githooks.yamllint = flowtool_githooks_demo.hooks:yamllint_hook.click_command',
-
-            '_flowtool_githooks.pytest = flowtool_githooks_demo.hooks:pytest_hook.click_command',
-            '_flowtool_githooks.coverage = flowtool_githooks_demo.hooks:coverage_hook.click_command',
-            '_flowtool_githooks.file = flowtool_githooks_demo.hooks:file_hook.click_command',
-            '_flowtool_githooks.du = flowtool_githooks_demo.hooks:du_hook.click_command',
+            '_flowtool_githooks.pylint = flowtool_githooks_demo.pylint_hook:pylint_hook.click_command',
+            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.shellcheck_hook:shellcheck_hook.click_command',
+            '_flowtool_githooks.yamllint = flowtool_githooks_demo.yamllint_hook:yamllint_hook.click_command',
+
+            '_flowtool_githooks.pytest = flowtool_githooks_demo.pytest_hook:pytest_hook.click_command',
+            '_flowtool_githooks.pytest_impact = flowtool_githooks_demo.pytest_impact_hook:pytest_impact_hook.click_command',
+            '_flowtool_githooks.coverage = flowtool_githooks_demo.coverage_hook:coverage_hook.click_command',
+            '_flowtool_githooks.diff_coverage = flowtool_githooks_demo.diff_coverage_hook:diff_coverage_hook.click_command',
+            '_flowtool_githooks.file = flowtool_githooks_demo.file_hook:file_hook.click_command',
+            '_flowtool_githooks.du = flowtool_githooks_demo.du_hook:du_hook.click_command',
+            '_flowtool_githooks.object_guard = flowtool_githooks_demo.object_guard_hook:object_guard_hook.click_command',
         ],
         'flowtool_githooks.pre_commit': [
-            '_flowtool_githooks.pylint = flowtool_githooks_demo.hooks:pylint_hook.hook_setup',
-            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.hooks:shellcheck_hook.hook_setup',
-            '_flowtool_githooks.yamllint = flowtool_githooks_demo.hooks:yamllint_hook.hook_setup',
-
-            '_flowtool_githooks.pytest = flowtool_githooks_demo.hooks:pytest_hook.hook_setup',
-            '_flowtool_githooks.coverage = flowtool_githooks_demo.hooks:coverage_hook.hook_setup',
-            '_flowtool_githooks.file = flowtool_githooks_demo.hooks:file_hook.hook_setup',
-            '_flowtool_githooks.du = flowtool_githooks_demo.hooks:du_hook.hook_setup',
+            '_flowtool_githooks.pylint = flowtool_githooks_demo.pylint_hook:pylint_hook.hook_setup',
+            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.shellcheck_hook:shellcheck_hook.hook_setup',
+            '_flowtool_githooks.yamllint = flowtool_githooks_demo.yamllint_hook:yamllint_hook.hook_setup',
+
+            '_flowtool_githooks.pytest = flowtool_githooks_demo.pytest_hook:pytest_hook.hook_setup',
+            '_flowtool_githooks.pytest_impact = flowtool_githooks_demo.pytest_impact_hook:pytest_impact_hook.hook_setup',
+            '_flowtool_githooks.coverage = flowtool_githooks_demo.coverage_hook:coverage_hook.hook_setup',
+            '_flowtool_githooks.diff_coverage = flowtool_githooks_demo.diff_coverage_hook:diff_coverage_hook.hook_setup',
+            '_flowtool_githooks.file = flowtool_githooks_demo.file_hook:file_hook.hook_setup',
+            '_flowtool_githooks.du = flowtool_githooks_demo.du_hook:du_hook.hook_setup',
         ],
         'flowtool_githooks.commit_msg': [
-            '_flowtool_githooks.pylint = flowtool_githooks_demo.hooks:pylint_hook.hook_setup',
-            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.hooks:shellcheck_hook.hook_setup',
-            '_flowtool_githooks.yamllint = flowtool_githooks_demo.hooks:yamllint_hook.hook_setup',
+            '_flowtool_githooks.pylint = flowtool_githooks_demo.pylint_hook:pylint_hook.hook_setup',
+            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.shellcheck_hook:shellcheck_hook.hook_setup',
+            '_flowtool_githooks.yamllint = flowtool_githooks_demo.yamllint_hook:yamllint_hook.hook_setup',
 
-            '_flowtool_githooks.file = flowtool_githooks_demo.hooks:file_hook.hook_setup',
-            '_flowtool_githooks.du = flowtool_githooks_demo.hooks:du_hook.hook_setup',
+            '_flowtool_githooks.file = flowtool_githooks_demo.file_hook:file_hook.hook_setup',
+            '_flowtool_githooks.du = flowtool_githooks_demo.du_hook:du_hook.hook_setup',
         ],
         'flowtool_githooks.pre_push': [
-            '_flowtool_githooks.pylint = flowtool_githooks_demo.hooks:pylint_hook.hook_setup',
-            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.hooks:shellcheck_hook.hook_setup',
-            '_flowtool_githooks.yamllint = flowtool_githooks_demo.hooks:yamllint_hook.hook_setup',
+            '_flowtool_githooks.pytest_impact = flowtool_githooks_demo.pytest_impact_hook:pytest_impact_hook.hook_setup',
+            '_flowtool_githooks.diff_coverage = flowtool_githooks_demo.diff_coverage_hook:diff_coverage_hook.hook_setup',
 
-            '_flowtool_githooks.file = flowtool_githooks_demo.hooks:file_hook.hook_setup',
-            '_flowtool_githooks.du = flowtool_githooks_demo.hooks:du_hook.hook_setup',
+            '_flowtool_githooks.pylint = flowtool_githooks_demo.pylint_hook:pylint_hook.hook_setup',
+            '_flowtool_githooks.shellcheck = flowtool_githooks_demo.shellcheck_hook:shellcheck_hook.hook_setup',
+            '_flowtool_githooks.yamllint = flowtool_githooks_demo.yamllint_hook:yamllint_hook.hook_setup',
+
+            '_flowtool_githooks.file = flowtool_githooks_demo.file_hook:file_hook.hook_setup',
+            '_flowtool_githooks.du = flowtool_githooks_demo.du_hook:du_hook.hook_setup',
+            '_flowtool_githooks.object_guard = flowtool_githooks_demo.object_guard_hook:object_guard_hook.hook_setup',
         ],
     },
 )
@@ -0,0 +1,94 @@
+import os
+import pytest
+
+from flowtool_git.common import local_repo
+
+from flowtool_githooks_demo import diffcover
+from flowtool_githooks_demo import hooks
+
+
+MODULE = '''
+def covered(x):
+    return x + 1
+'''
+
+CHANGED_MODULE = '''
+def covered(x):
+    y = x + 1
+    return y
+
+def uncovered(x):
+    y = x - 1
+    return y
+'''
+
+TEST_MODULE = '''
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import mod
+
+def test_covered():
+    assert mod.covered(1) == 2
+'''
+
+
+def write(filename, content):
+    with open(filename, 'w') as fh:
+        fh.write(content)
+
+
+def test_parse_diff():
+    changed = diffcover.parse_unified_diff('\n'.join([
+        'diff --git a/a.py b/a.py',
+        '--- a/a.py',
+        '+++ b/a.py',
+        '@@ -3,2 +3,0 @@',
+        '@@ -7 +5,2 @@ def foo():',
+        'diff --git a/new.txt b/new.txt',
+        '--- /dev/null',
+        '+++ b/new.txt',
+        '@@ -0,0 +1,3 @@',
+        'diff --git a/gone.py b/gone.py',
+        '--- a/gone.py',
+        '+++ /dev/null',
+        '@@ -1,3 +0,0 @@',
+    ]))
+    assert changed == {'a.py': [5, 6], 'new.txt': [1, 2, 3]}
+
+
+@pytest.fixture
+def component_repo(fresh_repo):
+    root = os.path.dirname(fresh_repo.git_dir)
+    component = os.path.join(root, 'comp')
+    os.makedirs(os.path.join(component, 'tests'))
+    write(os.path.join(root, 'tox.ini'), '[pytest]\n')
+    write(os.path.join(component, 'setup.py'), '')
+    write(os.path.join(component, 'mod.py'), MODULE)
+    write(os.path.join(component, 'tests', 'test_mod.py'), TEST_MODULE)
+    fresh_repo.git.add('.')
+    fresh_repo.git.commit('-m', 'Add a component.')
+    return fresh_repo
+
+
+def test_diff_coverage(component_repo, capsys):
+    pytest.importorskip('pytest_cov')
+
+    root = os.path.dirname(component_repo.git_dir)
+    write(os.path.join(root, 'comp', 'mod.py'), CHANGED_MODULE)
+    component_repo.git.add('comp/mod.py')
+
+    githook = hooks.PytestDiffCoverageHook()
+    githook.repo = local_repo(root)
+    githook.run_mode = 'pre-commit'
+
+    assert githook.adaptive_execution() == 1
+    output = capsys.readouterr().out
+    assert '3 of 5 changed lines covered' in output
+    assert 'comp/mod.py: 7-8' in output
+
+    stamps = diffcover.load_stamps(os.path.join(diffcover.cache_dir(githook.repo), diffcover.STAMPS_FILE))
+    assert 'comp' in stamps
+
+    assert githook.generate_checks() == []
+    assert githook.reused == [os.path.join(root, 'comp')]
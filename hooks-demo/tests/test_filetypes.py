@@ -0,0 +1,43 @@
+import os
+import gzip
+
+from flowtool_githooks_demo import filetypes
+from flowtool_githooks_demo import hooks
+
+
+def test_sniff(tmpdir):
+
+    script = tmpdir.join('script')
+    script.write('#!/usr/bin/env python\nprint(1)\n')
+    os.chmod(str(script), 0o755)
+    assert filetypes.sniff_type(str(script)) == 'Python script, ASCII text executable'
+
+    archive = str(tmpdir.join('archive.gz'))
+    with gzip.open(archive, 'wb') as fh:
+        fh.write(b'zipped')
+    assert filetypes.sniff_type(archive) == 'gzip compressed data'
+
+    assert filetypes.sniff_type('/bin/ls').startswith('ELF')
+    assert filetypes.sniff_type(str(tmpdir)) == 'directory'
+
+
+def test_long_utf8(tmpdir):
+
+    text = tmpdir.join('text')
+    text.write_binary(u'\xe4'.encode('utf-8') * filetypes.BLOCK_SIZE)
+    assert filetypes.sniff_type(str(text)) == 'UTF-8 Unicode text'
+
+
+def test_summary_fallback(tmpdir, capsys):
+
+    latin = tmpdir.join('latin')
+    latin.write_binary(u'h\xe4llo w\xf6rld\n'.encode('latin-1'))
+    assert filetypes.sniff_type(str(latin)) is None
+
+    githook = hooks.FileContentSummary()
+    checks = [githook.make_check(str(latin)), githook.make_check('/bin/ls')]
+    githook.summarize([githook.run_check(c) for c in checks])
+
+    output = capsys.readouterr().out
+    assert 'ISO-8859 text' in output
+    assert 'ELF' in output
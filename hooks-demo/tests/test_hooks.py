@@ -1,4 +1,5 @@
 import os
+import json
 import sys
 import pytest
 
@@ -36,3 +37,152 @@ def test_pylint_cfg():
 def test_pylint():
 
     githook = hooks.PylintHook()
+
+
+def test_pytest_subprocess(tmpdir):
+
+    tmpdir.join('tox.ini').write('[pytest]\n')
+    tmpdir.join('test_one.py').write('def test_one():\n    assert True\n')
+    tmpdir.join('test_two.py').write('def test_two():\n    assert False\n')
+
+    githook = hooks.PytestHook()
+    location = str(tmpdir)
+
+    check = githook.make_check(location, rootdir=location)
+    outcome = githook.run_check(check)
+    assert githook.is_returncode(outcome)
+    assert '1 failed, 1 passed' in outcome.result.stdout
+
+    check = githook.make_check(location, rootdir=location, tests=['test_one.py'])
+    outcome = githook.run_check(check)
+    assert not githook.is_returncode(outcome)
+    assert '1 passed' in outcome.result.stdout
+
+
+def test_pytest_parallel(tmpdir):
+
+    githook = hooks.PytestHook()
+    githook.WORKERS = 2
+    checks = []
+    for name in ('one', 'two', 'three'):
+        component = tmpdir.mkdir(name)
+        component.join('test_%s.py' % name).write('def test_it():\n    pass\n')
+        checks.append(githook.make_check(str(component), rootdir=str(component)))
+
+    githook.generate_checks = lambda: checks
+    result = runner.invoke(githook.click_command, [])
+    assert result.exit_code == 0
+    assert '3 of 3 components passed' in result.output
+
+
+def test_du_staged_blobs(fresh_repo):
+    from flowtool_git.common import local_repo
+
+    filename = os.path.join(os.path.dirname(fresh_repo.git_dir), 'big_file')
+    with open(filename, 'w') as fh:
+        fh.write('x' * 2048)
+    fresh_repo.git.add('big_file')
+    with open(filename, 'w') as fh:
+        fh.write('small now')
+
+    githook = hooks.FileSizeCheck()
+    githook.repo = local_repo(os.path.dirname(fresh_repo.git_dir))
+    githook.run_mode = 'pre-commit'
+    githook.SIZE_LIMIT = 1024
+
+    checks = githook.generate_checks()
+    assert [c.args[0] for c in checks] == ['big_file']
+    assert checks[0].kwargs['size'] == 2048
+    assert githook.adaptive_execution(checks=checks) == 1
+
+
+def test_object_guard(fresh_repo):
+    from flowtool_git.common import local_repo
+
+    root = os.path.dirname(fresh_repo.git_dir)
+    initial = fresh_repo.head.commit.hexsha
+
+    with open(os.path.join(root, 'big.dat'), 'w') as fh:
+        fh.write('x' * 2048)
+    fresh_repo.git.add('big.dat')
+    fresh_repo.git.commit('-m', 'Add a big file.')
+    introduced = fresh_repo.head.commit.hexsha
+
+    fresh_repo.git.rm('big.dat')
+    with open(os.path.join(root, 'tool.exe'), 'w') as fh:
+        fh.write('MZ')
+    fresh_repo.git.add('tool.exe')
+    fresh_repo.git.commit('-m', 'Replace it with a binary.')
+    tip = fresh_repo.head.commit.hexsha
+
+    githook = hooks.PushedObjectsGuard()
+    githook.repo = local_repo(root)
+    githook.SIZE_LIMIT = 1024
+    githook.run_mode = 'pre-push'
+    githook.stdin = 'refs/heads/master %s refs/heads/master %s\n' % (tip, initial)
+
+    checks = githook.generate_checks()
+    assert len(checks) == 1
+    findings = githook.run_check(checks[0]).result
+    assert [(f.path, f.reason, f.commit) for f in findings] == [
+        ('big.dat', 'size', introduced),
+        ('tool.exe', 'binary', tip),
+    ]
+    assert githook.adaptive_execution(checks=checks) == 1
+
+    githook.stdin = 'refs/heads/master %s refs/heads/master %s\n' % (initial, initial)
+    assert githook.adaptive_execution() == 0
+
+
+def test_yamllint_in_process(tmpdir, monkeypatch):
+    yamllint_config = pytest.importorskip('yamllint.config')
+
+    parsed = []
+    class CountingConfig(yamllint_config.YamlLintConfig):
+        def __init__(self, *args, **kwd):
+            parsed.append(kwd.get('file'))
+            super(CountingConfig, self).__init__(*args, **kwd)
+    monkeypatch.setattr(yamllint_config, 'YamlLintConfig', CountingConfig)
+
+    config = str(tmpdir.join('config.yaml'))
+    githook = hooks.YAMLLintHook()
+    githook.create_configfile(config)
+    githook.get_configfile = lambda do_setup=None: config
+
+    good = tmpdir.join('good.yaml')
+    good.write('---\na: 1\n')
+    bad = tmpdir.join('bad.yaml')
+    bad.write('---\na: 1\na: 2\n')
+
+    checks = [githook.make_check(str(f)) for f in (good, bad, good)]
+    assert all(c.func == githook.lint_in_process for c in checks)
+
+    outcomes = [githook.run_check(c) for c in checks]
+    assert [githook.is_returncode(o) for o in outcomes] == [0, 1, 0]
+    assert outcomes[1].result.stdout.startswith('%s:3:1: [error]' % bad)
+    assert parsed.count(config) == 1
+
+
+def test_findings_report(tmpdir, monkeypatch):
+    pytest.importorskip('yamllint')
+
+    config = str(tmpdir.join('config.yaml'))
+    githook = hooks.YAMLLintHook()
+    githook.create_configfile(config)
+    githook.get_configfile = lambda do_setup=None: config
+
+    bad = tmpdir.join('bad.yaml')
+    bad.write('---\na: 1\na: 2\n')
+    outcomes = [githook.run_check(githook.make_check(str(bad)))]
+
+    found = githook.parse_findings(outcomes[0].result)
+    assert [(f.line, f.severity, f.rule) for f in found] == [(3, 'error', 'key-duplicates')]
+
+    report = tmpdir.join('{name}.sarif')
+    monkeypatch.setenv(githook.REPORT_ENVIRON, str(report))
+    assert githook.summarize(outcomes) == 1
+
+    log = json.load(tmpdir.join('yamllint_hook.sarif').open())
+    run, = log['runs']
+    assert run['tool']['driver']['name'] == 'yamllint'
+    assert run['results'][0]['ruleId'] == 'key-duplicates'
@@ -0,0 +1,72 @@
+import os
+import pytest
+
+from flowtool_githooks_demo import impact
+
+
+@pytest.fixture
+def index():
+    index = {}
+    impact.update_component(index, 'base', 'stamp', {
+        'base/flowtool/files.py': [
+            'tests/test_files.py::test_cd|setup',
+            'tests/test_files.py::test_cd|run',
+            'tests/test_main.py::test_noargs|run',
+        ],
+        'base/flowtool/ui.py': ['tests/test_ui.py::test_abort|run'],
+        'base/tests/test_ui.py': ['tests/test_ui.py::test_abort|run'],
+    })
+    impact.update_component(index, 'git', 'stamp', {
+        'base/flowtool/files.py': ['tests/test_common.py::test_short_status|run'],
+        'git/flowtool_git/common.py': ['tests/test_common.py::test_short_status|run'],
+    })
+    return index
+
+
+def test_compact_index(index):
+    entry = index['base']
+    assert len(entry['tests']) == 3
+    assert all(isinstance(i, int) for ids in entry['files'].values() for i in ids)
+
+
+def test_selection(index):
+
+    changed = ['base/flowtool/files.py']
+    assert impact.select_tests(index, 'base', 'stamp', changed) == [
+        'tests/test_files.py::test_cd',
+        'tests/test_main.py::test_noargs',
+    ]
+    assert impact.select_tests(index, 'git', 'stamp', changed) == [
+        'tests/test_common.py::test_short_status',
+    ]
+
+    changed = ['git/flowtool_git/common.py', 'doc/index.rst']
+    assert impact.select_tests(index, 'base', 'stamp', changed) == []
+
+    # unknown python files of other components do not matter
+    changed = ['git/flowtool_git/new.py']
+    assert impact.select_tests(index, 'base', 'stamp', changed) == []
+    assert impact.select_tests(index, 'git', 'stamp', changed) is None
+
+
+def test_full_runs(index):
+
+    assert impact.select_tests({}, 'base', 'stamp', []) is None
+    assert impact.select_tests(index, 'base', 'stale', []) is None
+    assert impact.select_tests(index, 'base', 'stamp', ['base/tox.ini']) is None
+    assert impact.select_tests(index, 'git', 'stamp', ['base/tox.ini']) == []
+
+
+def test_roundtrip(index, nogit):
+
+    path = os.path.join(nogit, 'index.json')
+    impact.save_index(index, path)
+    assert impact.load_index(path) == index
+
+
+def test_config_stamp(nogit):
+
+    before = impact.config_stamp(nogit)
+    with open(os.path.join(nogit, 'tox.ini'), 'w') as fh:
+        fh.write('[pytest]\n')
+    assert impact.config_stamp(nogit) != before
@@ -0,0 +1,78 @@
+""" Every hook entry point is imported in a fresh interpreter whenever git
+    runs the hook, so the hook modules must stay cheap to import: no heavy
+    third party modules, none of the other hooks, and no git calls.
+"""
+import os
+import sys
+import glob
+import json
+import pytest
+import subprocess
+
+import flowtool_githooks_demo
+
+BUDGET_SECONDS = 1.5
+
+HEAVY_MODULES = ('pytest', 'coverage', 'yamllint', 'pylint')
+
+HOOK_MODULES = sorted(
+    os.path.basename(name)[:-3] for name in glob.glob(
+        os.path.join(os.path.dirname(flowtool_githooks_demo.__file__), '*_hook.py')
+    )
+)
+
+PROBE = '''
+import sys, json
+import flowtool_githooks_demo.{module} as module
+hook = getattr(module, {module!r})
+hook.click_command
+print(json.dumps(dict(
+    modules=sorted(sys.modules),
+    repo_resolved=hook._repo is not None,
+)))
+'''
+
+
+def cumulative_import_time(stderr, module):
+    """ The cumulative import time (in seconds) of a module, as
+        reported by `python -X importtime`.
+    """
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and line.split('|')[-1].strip() == module:
+            return int(line.split('|')[1]) / 1e6
+
+
+def test_found_hook_modules():
+    assert 'yamllint_hook' in HOOK_MODULES
+    assert 'pytest_hook' in HOOK_MODULES
+
+
+@pytest.mark.parametrize('module', HOOK_MODULES)
+def test_import_budget(module):
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+
+    probe = json.loads(stdout.splitlines()[-1])
+    assert not probe['repo_resolved']
+
+    imported = set(name.split('.')[0] for name in probe['modules'])
+    assert not imported.intersection(HEAVY_MODULES)
+
+    other_hooks = set(
+        'flowtool_githooks_demo.%s' % name for name in HOOK_MODULES
+    ).intersection(probe['modules'])
+    assert other_hooks <= set(
+        'flowtool_githooks_demo.%s' % name for name in (
+            module, 'pytest_hook', 'coverage_hook'  # base classes
+        )
+    )
+
+    seconds = cumulative_import_time(stderr, 'flowtool_githooks_demo.%s' % module)
+    assert seconds is not None
+    assert seconds < BUDGET_SECONDS
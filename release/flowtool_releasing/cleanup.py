@@ -12,103 +12,19 @@
 """
 
 import os
-import re
-import sys
 import click
+import multiprocessing
+from collections import OrderedDict
 from flowtool.ui import abort
 from flowtool.style import colors, echo
 from flowtool.files import find_parent_containing
 from flowtool.files import find_subdirs_containing
 from flowtool.python import get_configparser
+from flowtool.python import unique, PrefixMatcher
 from flowtool_git.common import local_repo
-from flowtool_git.tags import local_tags, delete_local_tags
-
-pep440_regex = re.compile('^((?P<epoch>[0-9]*)!)?(?P<release>[0-9][0-9]*(\.[0-9][0-9]*)*)\.?((?P<pre_stage>a|b|rc)?(?P<pre_ver>[0-9]*))((\.post(?P<post>[0-9]*)))?((\.dev(?P<dev>[0-9]*)))?$')
-
-def parse_pep440(version_string):
-    """ PEP440 versions look like this:
-
-        [N!]N(.N)*[{a|b|rc}N][.postN][.devN]
-
-        Epoch segment: N!
-        Release segment: N(.N)*
-        Pre-release segment: {a|b|rc}N
-        Post-release segment: .postN
-        Development release segment: .devN
-
-        >>> parse_pep440('invalid')
-        >>> parse_pep440('1.2.3.4')['release']
-        (1, 2, 3, 4)
-        >>> v = parse_pep440('0!1.2.3.4.b5.post6.dev7')
-        >>> v['release']
-        (1, 2, 3, 4)
-        >>> v['pre_release']
-        ('b', 5)
-        >>> v['post_release']
-        6
-        >>> v['dev_release']
-        7
-        >>> v['epoch']
-        '0'
-    """
-
-    try:
-        match = pep440_regex.fullmatch(version_string)
-    except AttributeError:
-        match = pep440_regex.match(version_string)
-
-    if match is None:
-        return None
-
-    parsed = match.group
-    result = dict(
-        version=version_string,
-    )
-    release = parsed('release')
-    result.update(
-        release=tuple(int(v) for v in release.split('.')),
-    )
-
-    if parsed('pre_stage'):
-        pre_ver = 0 if not parsed('pre_ver') else int(parsed('pre_ver'))
-        result['pre_release'] = (parsed('pre_stage'), pre_ver)
-
-    if parsed('post'):
-        result['post_release'] = 0 if not parsed('post') else int(parsed('post'))
-
-    if parsed('dev'):
-        result['dev_release'] = 0 if not parsed('dev') else int(parsed('dev'))
-
-    if parsed('epoch'):
-        result['epoch'] = parsed('epoch')
-
-    result['normalized'] = normalize_pep440(**result)
-    result['sort_tuple'] = sort_tuple(**result)
-
-    return result
-
-def sort_tuple(**kwd):
-    return (
-        kwd.get('epoch', ''),
-        kwd['release'],
-        kwd.get('pre_release', ('x',))[0],
-        -kwd.get('pre_release', ('', -1))[1],
-        kwd.get('post_release', -1),
-        kwd.get('dev_release', -1),
-    )
-
-def normalize_pep440(**kwd):
-    normalized = '.'.join(map(str, kwd['release']))
-    if 'pre_release' in kwd:
-        normalized += '%s%s' % kwd['pre_release']
-    if 'post_release' in kwd:
-        normalized += '.post' + str(kwd['post_release'])
-    if 'dev_release' in kwd:
-        normalized += '.dev' + str(kwd['dev_release'])
-    if 'epoch' in kwd:
-        normalized = '{}!{}'.format(kwd['epoch'], normalized)
-    return normalized
-
+from flowtool_git.tags import local_tags, delete_local_tags, delete_remote_tags
+from flowtool_versioning.pep440 import parse_version
+from flowtool_versioning.pep440 import parse_pep440, normalize_pep440  # formerly defined here
 
 def get_confed_prefix(path=None):
     """ Get the tag_prefix from setup.cfg
@@ -122,13 +38,56 @@ def get_confed_prefix(path=None):
     parser.read(os.path.join(setup_dir, 'setup.cfg'))
     return parser.get('versioning', 'tag_prefix')
 
+def partition_tags(tags, prefixes):
+    """ Partition tags by prefixes (in one pass), into a dict from
+        prefix to a list of (Version, tag) pairs. A tag belongs to
+        the longest of the prefixes, after which it has a valid version.
+        Tags without one are not in the result.
+
+        >>> parts = partition_tags(['a-1.0', 'a-b-2.0', 'a-x', 'c-1'], ['a-', 'a-b-'])
+        >>> parts['a-'], parts['a-b-']
+        ([(Version('1.0'), 'a-1.0')], [(Version('2.0'), 'a-b-2.0')])
+    """
+    prefixes = unique(prefixes)
+    matcher = PrefixMatcher(prefixes)
+    result = OrderedDict((prefix, []) for prefix in prefixes)
+    for tag in tags:
+        for prefix in sorted(matcher.matches(tag), key=len, reverse=True):
+            version = parse_version(tag[len(prefix):])
+            if version is not None:
+                result[prefix].append((version, tag))
+                break
+    return result
+
+
+def plan_cleanup(tags, prefixes, n):
+    """ Decide which tags to keep and which to delete for every prefix:
+        the n highest versions are kept. Returns a dict from prefix to
+        a pair of lists (keep, delete), both sorted by version (descending).
+
+        >>> plan = plan_cleanup(['p-0.9', 'p-0.10', 'p-0.8', 'q-1'], ['p-', 'q-'], 1)
+        >>> plan['p-']
+        (['p-0.10'], ['p-0.9', 'p-0.8'])
+        >>> plan['q-']
+        (['q-1'], [])
+    """
+    plan = OrderedDict()
+    for prefix, versions in partition_tags(tags, prefixes).items():
+        versions.sort(key=lambda pair: pair[0].key, reverse=True)
+        versions = [tag for _, tag in versions]
+        plan[prefix] = (versions[:n], versions[n:])
+    return plan
+
+
 @click.command()
 @click.option('-a', '--all', is_flag=True, help='Clean all tags found in setup.cfgs in this repo.')
 @click.option('-p', '--prefix', type=str, default=None, help='Specify prefix for tags (else uses setup.cfg).')
 @click.option('-y', '--yes', is_flag=True, help='Assume yes on all safety questions.')
 @click.option('-n', '--noop', is_flag=True, help='Do not actually delete tags.')
+@click.option('-r', '--remote', type=str, default=None, help='Also delete the tags from this remote (i.e. origin).')
+@click.option('--atomic', is_flag=True, help='Delete the tags from the remote atomically (locally they always are).')
 @click.argument('n', type=int, default=3)
-def local_tag_cleanup(n=3, prefix=None, yes=None, all=None, noop=None):
+def local_tag_cleanup(n=3, prefix=None, yes=None, all=None, noop=None, remote=None, atomic=None):
     """ Delete all but the last n version tags. """
 
     if n < 0:
@@ -138,17 +97,20 @@ def local_tag_cleanup(n=3, prefix=None, yes=None, all=None, noop=None):
 
     if all:
         git_root = os.path.dirname(local_repo().git_dir)
+        prefixes = []
         for cfgdir in find_subdirs_containing(
                 'setup.cfg',
                 path=git_root,
                 check='isfile',
                 not_found=(),
+                gitignore=True,
+                workers=multiprocessing.cpu_count(),
             ):
             echo.white('setup.cfg from', colors.cyan(cfgdir))
             parser = get_configparser()
             parser.read(os.path.join(cfgdir, 'setup.cfg'))
-            prefix = parser.get('versioning', 'tag_prefix')
-            noop or clean_tag_prefix(prefix, n, yes)
+            prefixes.append(parser.get('versioning', 'tag_prefix'))
+        noop or clean_tag_prefixes(prefixes, n, yes, remote=remote, atomic=atomic)
 
     else:
         if prefix is None:
@@ -158,24 +120,11 @@ def local_tag_cleanup(n=3, prefix=None, yes=None, all=None, noop=None):
                     abort('No tag prefix found or specified.')
                 prefix = click.prompt('No config found. Enter prefix manually')
 
-        noop or clean_tag_prefix(prefix, n, yes)
-
-
-def clean_tag_prefix(prefix, n, yes):
-    """ Clean one tag prefix as requested. """
-
-    echo.white(
-        'Cleanup:', prefix,
-        'n =', n,
-        'yes =', yes,
-    )
+        noop or clean_tag_prefix(prefix, n, yes, remote=remote, atomic=atomic)
 
-    tags = local_tags(prefix=prefix)
-    def version_sort(tag):
-        return parse_pep440(tag[len(prefix):])['sort_tuple']
 
-    versions = sorted(tags, key=version_sort, reverse=True)
-    keep = versions[:n]
+def echo_plan(prefix, n, keep, to_delete):
+    """ Show what will happen to the tags of one prefix. """
 
     echo.white(
         'Keeping %s tags with prefix %s: %s' % (
@@ -185,7 +134,6 @@ def clean_tag_prefix(prefix, n, yes):
         )
     )
 
-    to_delete = versions[n:]
     echo.red('tags to be removed:', colors.bold(str(len(to_delete))))
     if len(to_delete) <= 3:
         for tag in to_delete:
@@ -196,7 +144,39 @@ def clean_tag_prefix(prefix, n, yes):
         echo.yellow('->', to_delete[0])
 
 
+def clean_tag_prefixes(prefixes, n, yes, remote=None, atomic=False):
+    """ Clean the tags of several prefixes at once: the tags are listed
+        once, and all that are to be deleted are deleted in one ref
+        transaction (and from the remote too, if one is given).
+    """
+
+    echo.white(
+        'Cleanup:', ', '.join(prefixes),
+        'n =', n,
+        'yes =', yes,
+    )
+
+    plan = plan_cleanup(local_tags(), prefixes, n)
+    to_delete = []
+    for prefix, (keep, delete) in plan.items():
+        echo_plan(prefix, n, keep, delete)
+        to_delete.extend(delete)
+
+    if not to_delete:
+        return
+
     if yes or click.confirm('Delete these tags locally?', default=n):
-        echo.green(delete_local_tags(to_delete))
+        deleted = delete_local_tags(to_delete, chunk_size=None)
+        echo.green('Deleted %s tags locally.' % deleted)
     else:
         echo.cyan('Not deleting any of these.')
+        return
+
+    if remote and (yes or click.confirm('Delete these tags from %s?' % remote, default=n)):
+        deleted = delete_remote_tags(to_delete, remote=remote, atomic=atomic)
+        echo.green('Deleted %s tags from %s.' % (deleted, remote))
+
+
+def clean_tag_prefix(prefix, n, yes, remote=None, atomic=False):
+    """ Clean one tag prefix as requested. """
+    return clean_tag_prefixes([prefix], n, yes, remote=remote, atomic=atomic)
@@ -1,9 +1,11 @@
 import os, sys
 
 import pytest
+from git import Repo
+from flowtool_git import common
 from click.testing import CliRunner
 
-from flowtool_releasing.cleanup import local_tag_cleanup
+from flowtool_releasing.cleanup import local_tag_cleanup, clean_tag_prefixes
 from flowtool_versioning.deploy import init_versioning
 
 runner = CliRunner()
@@ -56,6 +58,44 @@ def test_no_versioning(nogit):
     assert 'Invalid value for ' in result.output
 
 
+def test_remote_cleanup(fresh_repo, nogit, monkeypatch):
+    remote = Repo.init(nogit, bare=True)
+    fresh_repo.git.remote('add', 'origin', remote.git_dir)
+    for version in ('0.1.0', '0.2.0', '0.10.0', '1.0.0rc1', '1.0.0'):
+        fresh_repo.git.tag('pkg-' + version)
+    fresh_repo.git.push('origin', '--tags')
+
+    monkeypatch.chdir(os.path.dirname(fresh_repo.git_dir))
+    monkeypatch.setattr(common, '_cache', {})  # local_repo() of the old cwd
+    result = runner.invoke(
+        local_tag_cleanup,
+        ['--yes', '--prefix', 'pkg-', '--remote', 'origin', '--atomic', '2'],
+    )
+    assert result.exit_code == 0, result.output
+    assert 'Deleted 3 tags from origin.' in result.output
+    assert fresh_repo.git.tag().split() == ['pkg-1.0.0', 'pkg-1.0.0rc1']
+    assert remote.git.tag().split() == ['pkg-1.0.0', 'pkg-1.0.0rc1']
+
+
+def test_clean_tag_prefixes(fresh_repo, monkeypatch, capsys):
+    for prefix, versions in (
+            ('pkg-', ('0.1.0', '0.2.0', '0.10.0')),
+            ('pkg-sub-', ('1.0', '1.1', '2.0rc1', '2.0')),
+            ('other-', ('5',))):
+        for version in versions:
+            fresh_repo.git.tag(prefix + version)
+    fresh_repo.git.tag('pkg-not-a-version')
+
+    monkeypatch.chdir(os.path.dirname(fresh_repo.git_dir))
+    monkeypatch.setattr(common, '_cache', {})
+    clean_tag_prefixes(['pkg-', 'pkg-sub-'], 1, yes=True)
+    out, err = capsys.readouterr()
+    assert 'Deleted 5 tags locally.' in out
+    assert fresh_repo.git.tag().split() == [
+        'other-5', 'pkg-0.10.0', 'pkg-not-a-version', 'pkg-sub-2.0',
+    ]
+
+
 def test_including_deploy(used_project):
 
     repo_root = os.path.dirname(used_project.git_dir)
@@ -0,0 +1,80 @@
+""" Benchmark sorting version strings: the former dict based parse_pep440
+    (as the sort key) against flowtool_versioning.pep440.sort_versions,
+    with a cold and a warm parse cache.
+
+    $ python benchmarks/version_sort.py [versions]
+"""
+import re
+import sys
+import time
+import random
+
+from flowtool_versioning import pep440
+
+
+old_regex = re.compile(r'^((?P<epoch>[0-9]*)!)?(?P<release>[0-9][0-9]*(\.[0-9][0-9]*)*)\.?((?P<pre_stage>a|b|rc)?(?P<pre_ver>[0-9]*))((\.post(?P<post>[0-9]*)))?((\.dev(?P<dev>[0-9]*)))?$')
+
+def old_parse_pep440(version_string):
+    match = old_regex.fullmatch(version_string)
+    if match is None:
+        return None
+    parsed = match.group
+    result = dict(version=version_string)
+    result.update(release=tuple(int(v) for v in parsed('release').split('.')))
+    if parsed('pre_stage'):
+        result['pre_release'] = (parsed('pre_stage'), int(parsed('pre_ver') or 0))
+    if parsed('post'):
+        result['post_release'] = int(parsed('post'))
+    if parsed('dev'):
+        result['dev_release'] = int(parsed('dev'))
+    if parsed('epoch'):
+        result['epoch'] = parsed('epoch')
+    result['normalized'] = pep440.normalize_pep440(**result)
+    result['sort_tuple'] = (
+        result.get('epoch', ''),
+        result['release'],
+        result.get('pre_release', ('x',))[0],
+        -result.get('pre_release', ('', -1))[1],
+        result.get('post_release', -1),
+        result.get('dev_release', -1),
+    )
+    return result
+
+def old_sort(versions):
+    return sorted(versions, key=lambda v: old_parse_pep440(v)['sort_tuple'])
+
+
+def random_version(rnd):
+    version = '.'.join(str(rnd.randint(0, 20)) for _ in range(rnd.randint(1, 4)))
+    if rnd.random() < 0.2:
+        version += rnd.choice(['a', 'b', 'rc']) + str(rnd.randint(0, 5))
+    if rnd.random() < 0.1:
+        version += '.post%s' % rnd.randint(0, 3)
+    if rnd.random() < 0.3:
+        version += '.dev%s' % rnd.randint(0, 300)
+    return version
+
+
+def timed(func, *args):
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 100000
+    rnd = random.Random(42)
+    versions = [random_version(rnd) for _ in range(count)]
+    unique = len(set(versions))
+
+    old_time, old_result = timed(old_sort, versions)
+    cold_time, result = timed(pep440.sort_versions, versions)
+    warm_time, result = timed(pep440.sort_versions, versions)
+    assert sorted(old_result) == sorted(result)
+
+    print('{} versions ({} unique): {:8.4f}s before, {:8.4f}s after (cold cache), {:8.4f}s (warm cache)'.format(
+        count, unique, old_time, cold_time, warm_time,
+    ))
+
+if __name__ == '__main__':
+    main(sys.argv)
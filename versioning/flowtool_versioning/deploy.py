@@ -60,7 +60,7 @@ def init_versioning(path=os.getcwd(), yes=None, noop=None):
 
     # deploy _version.py
     versionfile = None
-    modules = find_subdirs_containing('__init__.py', setup_dir)
+    modules = find_subdirs_containing('__init__.py', setup_dir, gitignore=True)
     if modules:
         if (yes and len(modules) == 1) or noop:
             chosen = modules[0]
@@ -0,0 +1,292 @@
+""" Parsing, comparing and bumping PEP440 versions.
+
+    PEP440 versions look like this:
+
+        [N!]N(.N)*[{a|b|rc}N][.postN][.devN]
+
+    A parsed Version is small (it has __slots__), and carries a precomputed
+    comparison key, so sorting many of them costs no more than sorting
+    tuples. Parsing is memoized, since the same version strings (from tags)
+    tend to be parsed over and over again.
+
+    Like the drop-in files, this module only uses the standard library.
+    The drop-ins keep their own (dict based) parse_pep440 though, since
+    they are copied into other source trees on their own.
+
+    >>> v = parse_version('0!1.2.3.4.b5.post6.dev7')
+    >>> v
+    Version('0!1.2.3.4b5.post6.dev7')
+    >>> v.release, v.pre_release, v.post_release, v.dev_release, v.epoch
+    ((1, 2, 3, 4), ('b', 5), 6, 7, 0)
+    >>> parse_version('no_version')
+    >>> sort_versions(['1.0', '1.0.dev1', '1.0rc1', '1.0.post1', '0.9', 'x'])
+    ['0.9', '1.0.dev1', '1.0rc1', '1.0', '1.0.post1']
+"""
+import re
+import sys
+
+from operator import itemgetter
+
+try:
+    from functools import lru_cache
+except ImportError:  # Python 2
+    from functools import wraps
+
+    def lru_cache(maxsize=128):
+        """ A stand-in, that forgets everything when full. """
+        def decorator(func):
+            cache = {}
+            @wraps(func)
+            def cached(arg):
+                try:
+                    return cache[arg]
+                except KeyError:
+                    if len(cache) >= maxsize:
+                        cache.clear()
+                    result = cache[arg] = func(arg)
+                    return result
+            return cached
+        return decorator
+
+intern = getattr(sys, 'intern', None) or intern
+
+PARSE_CACHE_SIZE = 1 << 16
+
+pep440_regex = re.compile(
+    r'^((?P<epoch>[0-9]*)!)?(?P<release>[0-9][0-9]*(\.[0-9][0-9]*)*)\.?'
+    r'((?P<pre_stage>a|b|rc)?(?P<pre_ver>[0-9]*))((\.post(?P<post>[0-9]*)))?'
+    r'((\.dev(?P<dev>[0-9]*)))?$'
+)
+
+PRE_STAGES = {'a': 0, 'b': 1, 'rc': 2}
+# pre-release part of the key for: dev releases (of no pre or post release),
+# and releases without a pre-release segment
+DEV_ONLY, NO_PRE = (-1, 0), (len(PRE_STAGES), 0)
+NO_DEV = sys.maxsize
+
+
+class Version(object):
+    """ A PEP440 version. Versions compare (and hash) by their key,
+        so '1.0' and '1.0.0' are equal, like they are in PEP440.
+
+        >>> Version((1, 0)) == parse_version('1.0.0'), Version((1, 0)) < Version((1, 0, 1))
+        (True, True)
+        >>> str(Version((1, 2), pre_release=('rc', 1), epoch=2))
+        '2!1.2rc1'
+    """
+
+    __slots__ = ('release', 'pre_release', 'post_release', 'dev_release', 'epoch', 'key', '_normalized')
+
+    def __init__(self, release, pre_release=None, post_release=None, dev_release=None, epoch=None):
+        self.release = release = tuple(release)
+        self.pre_release = pre_release
+        self.post_release = post_release
+        self.dev_release = dev_release
+        self.epoch = epoch
+        self._normalized = None
+
+        while not release[-1] and len(release) > 1:
+            release = release[:-1]
+        if pre_release is not None:
+            pre_key = (PRE_STAGES[pre_release[0]], pre_release[1])
+        elif dev_release is not None and post_release is None:
+            pre_key = DEV_ONLY
+        else:
+            pre_key = NO_PRE
+        # one flat tuple of ints compares much faster than nested ones,
+        # the release ends with -1, so that 1.2 sorts before 1.2.3
+        self.key = (epoch or 0,) + release + (-1,) + pre_key + (
+            -1 if post_release is None else post_release,
+            NO_DEV if dev_release is None else dev_release,
+        )
+
+    @property
+    def normalized(self):
+        """ The normalized version string (rendered on first use, and interned). """
+        if self._normalized is None:
+            self._normalized = intern(normalize_pep440(**self.as_dict()))
+        return self._normalized
+
+    def as_dict(self):
+        """ The version as a dict, like the drop-in files handle them.
+
+            >>> parse_version('1.2rc3').as_dict()
+            {'release': (1, 2), 'pre_release': ('rc', 3)}
+        """
+        result = dict(release=self.release)
+        for name in ('pre_release', 'post_release', 'dev_release', 'epoch'):
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+    def bump(self):
+        """ The next version: the smallest version component plus one.
+
+            >>> [str(parse_version(v).bump()) for v in ('8.1', '8.1.post0', '8.1a0.dev4', '8.1b0')]
+            ['8.2', '8.1.post1', '8.1a0.dev5', '8.1b1']
+        """
+        if self.dev_release is not None:
+            return self.replace(dev_release=self.dev_release + 1)
+        elif self.post_release is not None:
+            return self.replace(post_release=self.post_release + 1)
+        elif self.pre_release is not None:
+            stage, number = self.pre_release
+            return self.replace(pre_release=(stage, number + 1))
+        return self.replace(release=self.release[:-1] + (self.release[-1] + 1,))
+
+    def replace(self, **kwd):
+        """ A new Version, with some parts replaced. """
+        parts = self.as_dict()
+        parts.update(kwd)
+        return Version(**parts)
+
+    def __repr__(self):
+        return 'Version(%r)' % self.normalized
+
+    def __str__(self):
+        return self.normalized
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, Version) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key < other.key
+
+    def __le__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key <= other.key
+
+    def __gt__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key > other.key
+
+    def __ge__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.key >= other.key
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_version(version_string):
+    """ Parse a version string into a Version (None if it is invalid).
+        The results are cached, the same Version is returned for the
+        same string.
+
+        >>> parse_version('1.2') is parse_version('1.2')
+        True
+        >>> parse_version('1.2.3.4.rc5.post.dev')
+        Version('1.2.3.4rc5.post0.dev0')
+    """
+    if version_string[-1:].isdigit() and version_string.replace('.', '').isdigit():
+        # a final release (most tags), the regex would only slow down
+        release = version_string.split('.')
+        if '' not in release:
+            return Version(tuple(map(int, release)))
+
+    match = pep440_regex.match(version_string)
+    if match is None:
+        return None
+
+    pre_stage, pre_ver, post, dev, epoch = match.group('pre_stage', 'pre_ver', 'post', 'dev', 'epoch')
+    return Version(
+        tuple(map(int, match.group('release').split('.'))),
+        pre_release=(pre_stage, int(pre_ver or 0)) if pre_stage else None,
+        post_release=None if post is None else int(post or 0),
+        dev_release=None if dev is None else int(dev or 0),
+        epoch=int(epoch) if epoch else None,
+    )
+
+
+def parse_many(strings, prefix=''):
+    """ Parse many (prefixed) version strings, into a list of (Version,
+        string) pairs. Strings without a valid version are left out.
+
+        >>> parse_many(['v1.0', 'v1.0b1', 'x1.1', 'vx'], prefix='v')
+        [(Version('1.0'), 'v1.0'), (Version('1.0b1'), 'v1.0b1')]
+    """
+    cut = len(prefix)
+    parse = parse_version
+    result = []
+    for string in strings:
+        if string.startswith(prefix):
+            version = parse(string[cut:])
+            if version is not None:
+                result.append((version, string))
+    return result
+
+
+def sort_versions(strings, prefix='', reverse=False):
+    """ Sort (prefixed) version strings by their versions. Strings
+        without a valid version are left out. The sort is stable.
+
+        >>> sort_versions(['p-0.10', 'p-0.9', 'p-0.9.0'], prefix='p-', reverse=True)
+        ['p-0.10', 'p-0.9', 'p-0.9.0']
+    """
+    keyed = [(version.key, string) for version, string in parse_many(strings, prefix=prefix)]
+    keyed.sort(key=itemgetter(0), reverse=reverse)
+    return [string for _, string in keyed]
+
+
+def latest_version(strings, prefix=''):
+    """ The (prefixed) version string with the highest version, or None.
+
+        >>> latest_version(['v1.9', 'v1.10rc1', 'v1.10.dev3', 'vx'], prefix='v')
+        'v1.10rc1'
+        >>> latest_version([])
+    """
+    keyed = [(version.key, string) for version, string in parse_many(strings, prefix=prefix)]
+    if keyed:
+        return max(keyed, key=itemgetter(0))[1]
+
+
+def parse_pep440(version_string):
+    """ Parse a version string into a dict (None if it is invalid),
+        in the format used by the drop-in files. The key 'sort_tuple'
+        holds the comparison key.
+
+        >>> parse_pep440('invalid')
+        >>> v = parse_pep440('0!1.2.3.4.b5.post6.dev7')
+        >>> v['release'], v['pre_release'], v['post_release'], v['dev_release']
+        ((1, 2, 3, 4), ('b', 5), 6, 7)
+        >>> v['normalized']
+        '0!1.2.3.4b5.post6.dev7'
+    """
+    version = parse_version(version_string)
+    if version is None:
+        return None
+    result = version.as_dict()
+    result.update(
+        version=version_string,
+        normalized=version.normalized,
+        sort_tuple=version.key,
+    )
+    return result
+
+
+def normalize_pep440(**kwd):
+    """ Render the parts of a version (as in a dict of parse_pep440).
+
+        >>> normalize_pep440(release=(1, 2, 3, 4), pre_release=('a', 5), post_release=6, dev_release=7, epoch=0)
+        '0!1.2.3.4a5.post6.dev7'
+    """
+    normalized = '.'.join(map(str, kwd['release']))
+    if kwd.get('pre_release') is not None:
+        normalized += '%s%s' % kwd['pre_release']
+    if kwd.get('post_release') is not None:
+        normalized += '.post' + str(kwd['post_release'])
+    if kwd.get('dev_release') is not None:
+        normalized += '.dev' + str(kwd['dev_release'])
+    if kwd.get('epoch') is not None:
+        normalized = '{}!{}'.format(kwd['epoch'], normalized)
+    return normalized
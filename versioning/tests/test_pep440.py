@@ -0,0 +1,73 @@
+import sys
+import random
+import pytest
+
+from flowtool_versioning import pep440
+
+# in ascending order, as in the examples of PEP440
+ORDERED = [
+    '1.0.dev456',
+    '1.0a1',
+    '1.0a2.dev456',
+    '1.0a12.dev456',
+    '1.0a12',
+    '1.0b1.dev456',
+    '1.0b2',
+    '1.0b2.post345.dev456',
+    '1.0b2.post345',
+    '1.0rc1.dev456',
+    '1.0rc1',
+    '1.0',
+    '1.0.post456.dev34',
+    '1.0.post456',
+    '1.1.dev1',
+    '1.1',
+    '1.1.0.1',
+    '1.2',
+    '1.10',
+    '1!0.1',
+]
+
+
+def test_ordering():
+    shuffled = list(ORDERED)
+    random.Random(4).shuffle(shuffled)
+    assert pep440.sort_versions(shuffled) == ORDERED
+    assert pep440.sort_versions(shuffled, reverse=True) == ORDERED[::-1]
+    assert pep440.latest_version(shuffled) == '1!0.1'
+
+    parsed = [pep440.parse_version(v) for v in ORDERED]
+    assert all(a < b for a, b in zip(parsed, parsed[1:]))
+
+
+def test_equality():
+    assert pep440.parse_version('1.0') == pep440.parse_version('1.0.0.0')
+    assert pep440.parse_version('1.0') != pep440.parse_version('1.0.post0')
+    assert len(set(pep440.parse_many(['1', '1.0', '1.0.0']))) == 3
+    assert len(set(v for v, _ in pep440.parse_many(['1', '1.0', '1.0.0']))) == 1
+
+
+@pytest.mark.skipif(sys.version_info < (3,), reason='python2 orders anything')
+def test_compare_other_types():
+    version = pep440.parse_version('1.0')
+    assert version != '1.0'
+    for other in ('1.1', None, 1):
+        with pytest.raises(TypeError):
+            version < other
+        with pytest.raises(TypeError):
+            version >= other
+    with pytest.raises(TypeError):
+        sorted([version, '0.9'])
+
+
+def test_normalized_and_dict():
+    version = pep440.parse_version('2!1.2.b3.post.dev4')
+    assert version.normalized == '2!1.2b3.post0.dev4'
+    assert version.normalized is pep440.parse_version('2!1.2b3.post0.dev4').normalized
+    assert pep440.parse_pep440('2!1.2.b3.post.dev4')['sort_tuple'] == version.key
+    assert pep440.normalize_pep440(**version.as_dict()) == version.normalized
+
+
+def test_bump():
+    assert str(pep440.parse_version('0.9').bump()) == '0.10'
+    assert pep440.parse_version('1.0rc1').bump() > pep440.parse_version('1.0rc1')